@@ -0,0 +1,181 @@
+"""
+Микробенчмарк поиска хендлера callback_query: роутеры category и tasks с пустыми
+хендлерами, propagate_event одного нажатия.
+
+    python -m benchmarks.bench_indexed_router
+
+legacy — прежние фильтры F.data/lambda в прежнем порядке регистрации (обычный
+Router перебирает handler.check по очереди); indexed — схемы из
+src.keyboards.callbacks в IndexedRouter, как в src/routes.
+"""
+import asyncio
+import time
+from typing import Any, Callable, List, Sequence, Tuple, Type
+
+from aiogram import F, Router
+from aiogram.types import CallbackQuery, User
+
+from src.keyboards import callbacks as cb
+from src.routes.indexed_router import IndexedRouter
+
+# Фильтры до перехода на схемы, в порядке регистрации.
+LEGACY_CATEGORY: List[Any] = [
+    F.data == "cat:new",
+    F.data == "category_refresh",
+    F.data.startswith("category_page:"),
+    F.data.startswith("category_back:"),
+    F.data.startswith("category_open:"),
+    lambda c: c.data and c.data.startswith("category_delete:"),
+    lambda c: c.data and c.data.startswith("category_update:"),
+]
+LEGACY_TASKS: List[Any] = [
+    F.data == "tl:refresh",
+    F.data.startswith("tl:page:"),
+    F.data.startswith("tl:grp:"),
+    F.data.startswith("tl:grp:info:"),
+    F.data == "tl:back_to_list",
+    F.data.startswith("tl:open:"),
+    F.data == "tl:view:toggle",
+    F.data == "tl:filters",
+    F.data == "tl:back",
+    F.data == "tl:reset",
+    F.data == "tl:home",
+    F.data == "task:new",
+    F.data.in_({"tl:f:urgent", "tl:f:overdue", "tl:f:today"}),
+    F.data == "tl:f:prio",
+    F.data.startswith("tl:f:prio:toggle:"),
+    F.data == "tl:f:prio:clear",
+    F.data == "tl:f:prio:apply",
+    F.data == "tl:f:status",
+    F.data.startswith("tl:f:st:toggle:"),
+    F.data == "tl:f:st:clear",
+    F.data == "tl:f:st:apply",
+    F.data == "tl:f:cat",
+    F.data.startswith("tl:f:cat:page:"),
+    F.data.startswith("tl:f:cat:set:") | (F.data == "tl:f:cat:none"),
+    F.data == "tl:sort",
+    F.data.startswith("tl:sort:set:"),
+    F.data == "tl:sort:dir",
+    F.data == "tl:search",
+    F.data.startswith("task_done:"),
+    F.data.startswith("task_reopen:"),
+    F.data.startswith("task_archive:"),
+    F.data.startswith("task_restore:"),
+    F.data.startswith("task_delete:"),
+    F.data.startswith("task_update:") | F.data.startswith("task:edit:menu:"),
+    F.data.startswith("task:edit:prio:set:"),
+    F.data.startswith("task:edit:prio:"),
+    F.data.startswith("task:edit:cat:set:"),
+    F.data.startswith("task:edit:cat"),
+    F.data.startswith("task:edit:cat:page:"),
+    F.data.startswith("task:edit:title:") | F.data.startswith("task:edit:desc:") | F.data.startswith("task:edit:due:"),
+    F.data.startswith("task:create:prio:"),
+    F.data.startswith("task:create:cat:page:"),
+    F.data.startswith("task:create:cat:set:"),
+    F.data == "task:create:cat:none",
+    F.data.startswith("task:create:due:"),
+]
+
+# Схемы тех же хендлеров, как они зарегистрированы в src/routes.
+Schemas = Tuple[Type[cb.CallbackSchema], ...]
+INDEXED_CATEGORY: List[Schemas] = [
+    (cb.CategoryNew,), (cb.CategoriesRefresh,), (cb.CategoriesPage,), (cb.CategoriesBack,),
+    (cb.CategoryOpen,), (cb.CategoryDelete,), (cb.CategoryRename,),
+]
+INDEXED_TASKS: List[Schemas] = [
+    (cb.ListRefresh,), (cb.ListPage,), (cb.GroupMore,), (cb.GroupInfo,), (cb.BackToList,), (cb.TaskOpen,),
+    (cb.ViewToggle,), (cb.FiltersOpen,), (cb.FiltersBack,), (cb.FiltersReset,), (cb.Home,), (cb.TaskNew,),
+    (cb.QuickFilter,), (cb.PriorityFilterOpen,), (cb.PriorityToggle,), (cb.PriorityClear,), (cb.PriorityApply,),
+    (cb.StatusFilterOpen,), (cb.StatusToggle,), (cb.StatusClear,), (cb.StatusApply,), (cb.CategoryFilterOpen,),
+    (cb.CategoryFilterPage,), (cb.CategoryFilterSet, cb.CategoryFilterNone), (cb.SortOpen,), (cb.SortSet,),
+    (cb.SortDirection,), (cb.SearchStart,), (cb.TaskDone,), (cb.TaskReopen,), (cb.TaskArchive,),
+    (cb.TaskRestore,), (cb.TaskDelete,), (cb.TaskUpdate, cb.TaskEditMenu), (cb.TaskEditPrioritySet,),
+    (cb.TaskEditPriorityMenu,), (cb.TaskEditCategorySet,), (cb.TaskEditCategoryMenu,),
+    (cb.TaskEditCategoryPage,), (cb.TaskEditField,), (cb.CreatePriority,), (cb.CreateCategoryPage,),
+    (cb.CreateCategorySet,), (cb.CreateCategoryNone,), (cb.CreateDue,),
+]
+
+PAYLOADS = [
+    "category_refresh",
+    "category_open:12:0",
+    "category_delete:12:1",
+    "tl:refresh",
+    "tl:open:345",
+    "tl:f:urgent",
+    "tl:f:prio:toggle:high",
+    "tl:sort:set:due_date",
+    "task_done:345",
+    "task:edit:prio:set:low:345",
+    "task:edit:due:345",
+    "task:create:due:+3",
+]
+
+
+async def _noop(*args: Any, **kwargs: Any) -> bool:
+    return True
+
+
+def _root(*routers: Router) -> Router:
+    root = Router()
+    for router in routers:
+        root.include_router(router)
+    return root
+
+
+def legacy() -> Router:
+    routers = []
+    for filters in (LEGACY_CATEGORY, LEGACY_TASKS):
+        router = Router()
+        for flt in filters:
+            router.callback_query.register(_noop, flt)
+        routers.append(router)
+    return _root(*routers)
+
+
+def indexed() -> Router:
+    routers = []
+    for schemas in (INDEXED_CATEGORY, INDEXED_TASKS):
+        router = IndexedRouter()
+        for group in schemas:
+            router.callback_query.register(_noop, *group)
+        routers.append(router)
+    return _root(*routers)
+
+
+def _callback(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=User(id=1, is_bot=False, first_name="u"), chat_instance="c", data=data)
+
+
+async def measure(router: Router, data: str, rounds: int = 5) -> float:
+    """Лучший из rounds средний, микросекунды на нажатие."""
+    event = _callback(data)
+    dispatch: Callable[[], Any] = lambda: router.propagate_event("callback_query", event)
+    assert await dispatch() is True, data
+    number = 50
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            await dispatch()
+        best = min(best, (time.perf_counter() - started) / number * 1e6)
+    return best
+
+
+async def run(payloads: Sequence[str]) -> None:
+    old, new = legacy(), indexed()
+    totals = [0.0, 0.0]
+    for data in payloads:
+        before, after = await measure(old, data), await measure(new, data)
+        totals[0] += before
+        totals[1] += after
+        print(f"  {data:<28} {before:9.1f} us -> {after:6.1f} us  (x{before / after:.0f})")
+    n = len(payloads)
+    print(f"  {'mean':<28} {totals[0] / n:9.1f} us -> {totals[1] / n:6.1f} us")
+
+
+def main() -> None:
+    asyncio.run(run(PAYLOADS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Микробенчмарк подготовки тела запроса к API: нормализация, строка для лога
+(INFO выключен) и кодирование.
+
+    python -m benchmarks.bench_json_codec
+
+legacy — прежний путь BotHttpClient (рекурсивный _to_jsonable, _safe_body_for_log,
+затем json= в httpx); codec — src.utils.json_codec.dumps и LazyBody.
+"""
+import json
+import timeit
+from dataclasses import asdict, dataclass, is_dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.json_codec import LazyBody, dumps, orjson
+
+MAX_LOG_BODY = 2000
+
+
+class Priority(str, Enum):
+    LOW = "low"
+    HIGH = "high"
+
+
+class Status(str, Enum):
+    TODO = "todo"
+    DONE = "done"
+
+
+@dataclass
+class Item:
+    title: str
+    priority: Priority
+    tags: List[str]
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Копия прежнего BotHttpClient._to_jsonable (до перехода на json_codec)."""
+    if isinstance(obj, Enum):
+        return obj.value
+    try:
+        from pydantic import BaseModel  # type: ignore
+        if isinstance(obj, BaseModel):  # noqa
+            return _to_jsonable(obj.model_dump())
+    except Exception:
+        pass
+    try:
+        if is_dataclass(obj):
+            return _to_jsonable(asdict(obj))
+    except Exception:
+        pass
+    if isinstance(obj, dict):
+        return {k: _to_jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_jsonable(v) for v in obj]
+    if isinstance(obj, set):
+        return [_to_jsonable(v) for v in obj]
+    return obj
+
+
+def _safe_body_for_log(data: Optional[Dict[str, Any]]) -> Any:
+    if data is None:
+        return None
+    try:
+        norm = _to_jsonable(data)
+        json.dumps(norm, ensure_ascii=False)
+        return norm
+    except Exception:
+        return "<unserializable>"
+
+
+def legacy(payload: Dict[str, Any]) -> bytes:
+    normalized = _to_jsonable(payload)
+    _safe_body_for_log(normalized)
+    # Так тело кодировал httpx для json=.
+    return json.dumps(normalized).encode()
+
+
+def codec(payload: Dict[str, Any]) -> bytes:
+    content = dumps(payload)
+    LazyBody(content, MAX_LOG_BODY)
+    return content
+
+
+PAYLOADS: Dict[str, Dict[str, Any]] = {
+    "patch  {status}": {"status": Status.DONE},
+    "create (7 fields, Enum)": {
+        "title": "Подготовить отчёт",
+        "description": "Квартальный отчёт для команды",
+        "priority": Priority.HIGH,
+        "status": Status.TODO,
+        "due_date": "2026-10-20",
+        "category_id": 12,
+        "is_archived": False,
+    },
+    "bulk   (50 nested items)": {
+        "items": [Item(f"task {i}", Priority.LOW, ["a", "b"]) for i in range(50)],
+    },
+}
+
+
+def measure(fn: Callable[[Dict[str, Any]], bytes], payload: Dict[str, Any]) -> float:
+    """Лучшее из 5 повторов, микросекунды на вызов."""
+    timer = timeit.Timer(lambda: fn(payload))
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number * 1e6
+
+
+def main() -> None:
+    print(f"encoder: {'orjson' if orjson is not None else 'stdlib json'}")
+    for name, payload in PAYLOADS.items():
+        before, after = measure(legacy, payload), measure(codec, payload)
+        print(f"  {name:<26} {before:9.1f} us -> {after:7.1f} us  (x{before / after:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,55 +3,91 @@ import logging
 from pathlib import Path
 
 from aiogram.fsm.storage.redis import RedisStorage, DefaultKeyBuilder
-from redis.asyncio import from_url
+from redis.asyncio import Redis
 
 from src.bot import create_bot, create_dispatcher
 from src.config import settings
 from src.database.redis_client import redis_client
+from src.database.redis_pool import create_redis_pool
+from src.middlewares import callback_tasks, setup_middlewares
 from src.routes import setup_handlers
+from src.services.http_client import client
+from src.services.render_coalescer import render_tasks
+from src.services.token_refresher import token_refresher
+from src.utils.log_setup import setup_logging, shutdown_logging
+from src.utils.metrics import metrics
+from src.update_stream import create_ingest_dispatcher, run_worker
+from src.webhook import run_webhook
 
 # ----------------- LOGGING -----------------
 LOG_DIR = Path(__file__).resolve().parent / "logs"
-LOG_DIR.mkdir(exist_ok=True)
-LOG_FILE = LOG_DIR / "bot.log"
-
-logging.basicConfig(
-    level=getattr(logging, settings.log_level, logging.INFO),
-    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-)
-
-file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
-file_handler.setLevel(getattr(logging, settings.log_level, logging.INFO))
-file_handler.setFormatter(logging.Formatter(
-    "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-))
-logging.getLogger().addHandler(file_handler)
+setup_logging(LOG_DIR)
 
 logger = logging.getLogger(__name__)
 
 # ----------------- BOT WIRES -----------------
 bot = create_bot(settings.bot_token)
-redis = from_url(settings.redis_url, decode_responses=True)
+redis_pool = create_redis_pool()
+redis = Redis(connection_pool=redis_pool)
 storage = RedisStorage(redis=redis, key_builder=DefaultKeyBuilder(with_bot_id=True))
 dp = create_dispatcher(storage=storage)
+setup_middlewares(dp)
 dp.include_router(setup_handlers())
+metrics_logger = None
 
 async def on_startup():
-    await redis_client.connect()
+    global metrics_logger
+    await redis_client.connect(redis_pool)
+    await client.start()
+    token_refresher.start(client.refresh_tokens)
+    # В webhook-режиме снимок отдаёт служебный сервер (/metrics); без него (polling, воркер) — пишем его в лог.
+    serves_metrics = settings.bot_mode == "webhook" and settings.bot_role != "worker"
+    if not serves_metrics and settings.metrics_log_interval > 0:
+        metrics_logger = asyncio.create_task(
+            metrics.log_periodically(settings.metrics_log_interval), name="metrics-logger"
+        )
 
 async def on_shutdown():
+    await callback_tasks.shutdown(settings.callback_task_timeout)
+    await render_tasks.shutdown(settings.render_max_delay_ms / 1000)
+    if metrics_logger is not None:
+        metrics_logger.cancel()
+    logger.info("Metrics on shutdown: %s", metrics.snapshot())
+    await token_refresher.stop()
+    await client.close()
     await redis_client.disconnect()
+    await storage.close()
+    await redis_pool.disconnect()
+
+async def ingest(bot):
+    """Ингестор: апдейты (polling или webhook) только складываются в Redis Stream для воркеров."""
+    ingest_dp = create_ingest_dispatcher(redis)
+    allowed_updates = dp.resolve_used_update_types()
+    # Публикуем последовательно и подтверждаем Telegram только после XADD:
+    # порядок апдейтов пользователя в партиции сохраняется, апдейт не теряется.
+    if settings.bot_mode == "webhook":
+        await run_webhook(ingest_dp, bot, allowed_updates=allowed_updates, handle_in_background=False)
+    else:
+        await ingest_dp.start_polling(bot, allowed_updates=allowed_updates, handle_as_tasks=False)
 
 async def main():
     try:
         logger.info("Starting Task Manager Bot...")
         await on_startup()
-        await dp.start_polling(bot)
+        if settings.bot_role == "worker":
+            await run_worker(dp, bot, redis)
+        elif settings.bot_role == "ingestor":
+            await ingest(bot)
+        elif settings.bot_mode == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            await dp.start_polling(bot)
     except Exception as e:
         logger.exception("Bot fatal error: %s", e)
     finally:
         await on_shutdown()
         await bot.session.close()
+        shutdown_logging()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -3,9 +3,11 @@ from aiogram.fsm.storage.base import BaseStorage
 from aiogram.client.default import DefaultBotProperties
 from typing import Optional
 
+from src.bot_session import RateLimitedSession
+
 
 def create_bot(token: str) -> Bot:
-    return Bot(token=token, default=DefaultBotProperties(parse_mode="HTML"))
+    return Bot(token=token, session=RateLimitedSession(), default=DefaultBotProperties(parse_mode="HTML"))
 
 
 def create_dispatcher(storage: Optional[BaseStorage] = None) -> Dispatcher:
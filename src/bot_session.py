@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Deque, Dict, Optional, Union
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+ChatId = Union[int, str]
+
+
+class SendPriority(IntEnum):
+    INTERACTIVE = 0  # правки сообщений в ответ на нажатия
+    NORMAL = 1       # отправки и прочие вызовы, адресованные чату
+
+
+class TokenBucket:
+    """Token bucket с паузой: после 429 бакет не выдаёт токены до paused_until."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "paused_until")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд бакет сможет выдать токен (0 — прямо сейчас)."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def idle(self, now: float) -> bool:
+        self.delay(now)
+        return self.paused_until <= now and self.tokens >= self.capacity
+
+
+class _Waiter:
+    __slots__ = ("chat_id", "future", "enqueued")
+
+    def __init__(self, chat_id: Optional[ChatId], future: "asyncio.Future[None]"):
+        self.chat_id = chat_id
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+class SendLimiter:
+    """
+    Выдаёт разрешения на вызовы Bot API в пределах глобального бюджета и бюджета
+    каждого чата (в группах он меньше). Правки в ответ на нажатия (INTERACTIVE)
+    в личных чатах берут токены из отдельного, более щедрого бюджета чата и не
+    ждут за отправками; пауза чата после retry_after действует и на них.
+    Ожидающие обслуживаются по приоритету, внутри приоритета — по очереди;
+    вызов, упёршийся в лимит своего чата, не задерживает вызовы в другие чаты.
+    """
+
+    def __init__(self):
+        self._global = TokenBucket(settings.tg_global_rate, settings.tg_global_rate)
+        self._chats: Dict[ChatId, TokenBucket] = {}
+        self._edits: Dict[ChatId, TokenBucket] = {}
+        self._queues: Dict[SendPriority, Deque[_Waiter]] = {p: deque() for p in SendPriority}
+        self._wakeup = asyncio.Event()
+        self._pump_task: Optional[asyncio.Task] = None
+        metrics.register("telegram_limiter", self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "queued": {p.name.lower(): len(q) for p, q in self._queues.items()},
+            "chats": len(self._chats),
+            "edit_budgets": len(self._edits),
+            "paused_chats": sum(1 for b in self._chats.values() if b.paused_until > now),
+        }
+
+    async def acquire(self, chat_id: Optional[ChatId], priority: SendPriority) -> None:
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump(), name="telegram-send-limiter")
+        waiter = _Waiter(chat_id, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(waiter)
+        self._wakeup.set()
+        await waiter.future
+        metrics.observe(f"telegram.queue_wait.{priority.name.lower()}", time.monotonic() - waiter.enqueued)
+
+    def pause(self, chat_id: Optional[ChatId], seconds: float) -> None:
+        """retry_after от Telegram: не отправлять в этот чат (или вообще, если чата нет) seconds секунд."""
+        bucket = self._global if chat_id is None else self._chat_bucket(chat_id)
+        bucket.paused_until = max(bucket.paused_until, time.monotonic() + seconds)
+
+    async def close(self) -> None:
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+            self._pump_task = None
+
+    @staticmethod
+    def _is_group(chat_id: ChatId) -> bool:
+        return isinstance(chat_id, str) or chat_id < 0
+
+    @staticmethod
+    def _bucket(buckets: Dict[ChatId, TokenBucket], chat_id: ChatId, rate: float, burst: int) -> TokenBucket:
+        bucket = buckets.get(chat_id)
+        if bucket is None:
+            if len(buckets) >= settings.tg_chat_buckets:
+                now = time.monotonic()
+                for key in [k for k, b in buckets.items() if b.idle(now)]:
+                    del buckets[key]
+            bucket = buckets[chat_id] = TokenBucket(rate, burst)
+        return bucket
+
+    def _chat_bucket(self, chat_id: ChatId) -> TokenBucket:
+        rate = settings.tg_group_rate if self._is_group(chat_id) else settings.tg_chat_rate
+        return self._bucket(self._chats, chat_id, rate, settings.tg_chat_burst)
+
+    def _budget(self, chat_id: ChatId, priority: SendPriority) -> TokenBucket:
+        """Бакет чата, из которого вызов берёт токен."""
+        if priority == SendPriority.INTERACTIVE and not self._is_group(chat_id):
+            return self._bucket(self._edits, chat_id, settings.tg_chat_edit_rate, settings.tg_chat_edit_burst)
+        return self._chat_bucket(chat_id)
+
+    def _chat_delay(self, chat_id: ChatId, priority: SendPriority, now: float) -> float:
+        bucket = self._budget(chat_id, priority)
+        wait = bucket.delay(now)
+        chat = self._chat_bucket(chat_id)
+        if chat is not bucket and chat.paused_until > now:
+            wait = max(wait, chat.paused_until - now)
+        return wait
+
+    def _grant(self) -> Optional[float]:
+        """Раздаёт разрешения, пока хватает бюджета; возвращает, через сколько секунд пробовать снова."""
+        now = time.monotonic()
+        retry_in: Optional[float] = None
+        for priority in SendPriority:
+            queue = self._queues[priority]
+            kept: Deque[_Waiter] = deque()
+            while queue:
+                waiter = queue.popleft()
+                if waiter.future.done():  # ожидающего отменили
+                    continue
+                wait = self._global.delay(now)
+                if wait == 0 and waiter.chat_id is not None:
+                    wait = self._chat_delay(waiter.chat_id, priority, now)
+                    if wait:
+                        kept.append(waiter)
+                        retry_in = wait if retry_in is None else min(retry_in, wait)
+                        continue
+                if wait:
+                    # Глобальный бюджет исчерпан: остальных не трогаем, порядок сохраняется.
+                    queue.appendleft(waiter)
+                    queue.extendleft(reversed(kept))
+                    return wait if retry_in is None else min(retry_in, wait)
+                self._global.take()
+                if waiter.chat_id is not None:
+                    self._budget(waiter.chat_id, priority).take()
+                waiter.future.set_result(None)
+            queue.extend(kept)
+        return retry_in
+
+    async def _pump(self) -> None:
+        while True:
+            self._wakeup.clear()
+            retry_in = self._grant()
+            if retry_in is None:
+                await self._wakeup.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=retry_in)
+            except asyncio.TimeoutError:
+                pass
+
+
+class RateLimitedSession(AiohttpSession):
+    """
+    Сессия Bot API с исходящими лимитами Telegram.
+
+    Вызовы, адресованные чату (send*/edit*/delete*), проходят через SendLimiter:
+    правки сообщений идут с приоритетом INTERACTIVE, прочие — NORMAL. Остальные методы
+    (getUpdates, answerCallbackQuery, setWebhook) не ограничиваются.
+    На TelegramRetryAfter чат ставится на паузу, вызов повторяется после неё.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.limiter = SendLimiter()
+
+    @staticmethod
+    def classify(method: TelegramMethod[Any]) -> SendPriority:
+        if method.__api_method__.startswith("edit"):
+            return SendPriority.INTERACTIVE
+        return SendPriority.NORMAL
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        if "chat_id" not in type(method).model_fields:
+            return await super().make_request(bot, method, timeout)
+
+        chat_id = getattr(method, "chat_id", None)
+        priority = self.classify(method)
+        attempt = 0
+        while True:
+            await self.limiter.acquire(chat_id, priority)
+            try:
+                return await super().make_request(bot, method, timeout)
+            except TelegramRetryAfter as e:
+                metrics.inc("telegram.retry_after")
+                self.limiter.pause(chat_id, e.retry_after)
+                attempt += 1
+                if attempt > settings.tg_retry_attempts or e.retry_after > settings.tg_retry_after_max:
+                    raise
+                logger.warning(
+                    "Telegram flood control | method=%s | chat=%s | retry_after=%ss | attempt=%s",
+                    method.__api_method__, chat_id, e.retry_after, attempt,
+                )
+
+    async def close(self) -> None:
+        await self.limiter.close()
+        await super().close()
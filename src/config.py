@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -8,18 +10,129 @@ class Settings(BaseSettings):
     # Bot settings
     bot_token: str = Field(..., description="Telegram Bot Token")
     log_level: str = Field("INFO", description="Level of logging")
+    bot_mode: str = Field("polling", description="Update ingestion: 'polling' or 'webhook'")
+    log_rotation: str = Field("size", description="Log file rotation: 'size' or 'time'")
+    log_max_bytes: int = Field(20 * 1024 * 1024, description="Rotate bot.log at this size (rotation=size), bytes")
+    log_rotate_when: str = Field("midnight", description="Rotation moment for rotation=time (TimedRotatingFileHandler 'when')")
+    log_backup_count: int = Field(7, description="Rotated log files kept")
+    log_queue_size: int = Field(10000, description="Queued log records past which records below WARNING are dropped")
+    metrics_log_interval: float = Field(
+        300.0, description="Metrics snapshot log period when no HTTP server serves /metrics, seconds; 0 disables"
+    )
+    log_sample_rates: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-logger share of sampled INFO lines (API →/←) that are written; empty - no sampling",
+    )
+
+    # Webhook settings (bot_mode=webhook)
+    webhook_url: str = Field("", description="Public HTTPS base URL Telegram sends updates to")
+    webhook_path: str = Field("/webhook", description="Webhook endpoint path")
+    webhook_secret: str = Field("", description="Secret checked in X-Telegram-Bot-Api-Secret-Token")
+    webhook_host: str = Field("0.0.0.0", description="Webhook server listen host")
+    webhook_port: int = Field(8080, description="Webhook server listen port")
+    webhook_internal_host: str = Field("127.0.0.1", description="Listen host of the internal health/metrics server")
+    webhook_internal_port: int = Field(8081, description="Listen port of the internal health/metrics server")
+    webhook_health_path: str = Field("/healthz", description="Health check endpoint path (internal server)")
+    webhook_metrics_path: str = Field("/metrics", description="Metrics snapshot endpoint path (internal server)")
+    webhook_max_connections: int = Field(40, description="Max simultaneous webhook connections from Telegram")
+    webhook_delete_on_shutdown: bool = Field(
+        False, description="Delete the webhook on shutdown; only for a single replica, others would stop receiving updates"
+    )
+
+    # Outbound Bot API limits
+    tg_global_rate: float = Field(30.0, description="Chat-bound Bot API calls per second across all chats")
+    tg_chat_rate: float = Field(1.0, description="Calls per second into one private chat")
+    tg_group_rate: float = Field(20 / 60, description="Calls per second into one group or channel")
+    tg_chat_burst: int = Field(3, description="Calls into one chat allowed back to back before its rate applies")
+    tg_chat_edit_rate: float = Field(5.0, description="Message edits per second into one private chat (replies to taps)")
+    tg_chat_edit_burst: int = Field(10, description="Message edits into one private chat allowed back to back")
+    tg_chat_buckets: int = Field(10000, description="Per-chat budgets kept before idle ones are pruned")
+    tg_retry_attempts: int = Field(2, description="Retries of a call rejected with retry_after")
+    tg_retry_after_max: float = Field(60.0, description="Longest retry_after still retried, seconds")
+
+    # Update scheduling
+    update_concurrency: int = Field(64, description="Updates handled at once across all users; one user's updates run in order")
+    render_debounce_ms: int = Field(300, description="Quiet period before a toggled/paged message is redrawn, ms")
+    render_max_delay_ms: int = Field(1200, description="Longest a redraw is postponed by continuous taps, ms")
+    render_cache_size: int = Field(10000, description="Messages whose last rendered text/keyboard hashes are kept, 0 disables")
+    callback_task_timeout: float = Field(30.0, description="Limit for a callback handler continued after the early answer, seconds")
+
+    # Update stream settings (bot_role=ingestor/worker)
+    bot_role: str = Field("all", description="'all' - ingest and handle; 'ingestor' - push to stream; 'worker' - handle from stream")
+    update_stream_prefix: str = Field("updates", description="Redis key prefix of update stream partitions")
+    update_stream_partitions: int = Field(16, description="Stream partitions; a user's updates always land in one")
+    update_stream_group: str = Field("workers", description="Consumer group of update workers")
+    update_stream_maxlen: int = Field(100000, description="Approximate max entries kept per partition")
+    update_stream_batch: int = Field(32, description="Entries of one partition handled at once (per XREADGROUP/XAUTOCLAIM call)")
+    update_stream_block_ms: int = Field(1000, description="XREADGROUP block time, ms (below redis_socket_timeout)")
+    update_stream_lease_ms: int = Field(15000, description="Partition lease TTL and worker heartbeat expiry, ms")
 
     # API settings
     api_base_url: str = Field(
         default="http://localhost:8000",
         description="Base URL for Task Manager API"
     )
+    api_timeout: float = Field(15.0, description="Task Manager API request timeout (upper bound), seconds")
+    api_timeout_min: float = Field(3.0, description="Lower bound for the adaptive API timeout, seconds")
+    api_timeout_percentile: float = Field(0.99, description="Latency percentile the adaptive timeout is based on")
+    api_timeout_multiplier: float = Field(3.0, description="Adaptive timeout = latency percentile * multiplier")
+    api_latency_window: int = Field(200, description="Latency samples kept per endpoint")
+    api_breaker_failures: int = Field(5, description="Consecutive failures that open an endpoint's circuit")
+    api_breaker_open_seconds: float = Field(30.0, description="How long an open circuit rejects calls, seconds")
+    api_retry_attempts: int = Field(2, description="Extra attempts for failed idempotent GETs")
+    api_retry_backoff: float = Field(0.2, description="Base for jittered exponential retry backoff, seconds")
+    api_retry_backoff_max: float = Field(2.0, description="Retry backoff cap, seconds")
+
+    # HTTP connection pool settings
+    http_max_connections: int = Field(100, description="Max open connections to the API")
+    http_max_keepalive: int = Field(20, description="Max idle keep-alive connections")
+    http_keepalive_expiry: float = Field(30.0, description="Idle keep-alive connection expiry, seconds")
+    http2_enabled: bool = Field(False, description="Use HTTP/2 multiplexing (requires h2)")
+    http_prewarm_connections: int = Field(2, description="Connections opened on startup, 0 disables")
+    http_validator_cache_size: int = Field(2000, description="Cached ETag/Last-Modified GET responses, 0 disables")
+    http_validator_max_body: int = Field(
+        1024 * 1024, description="Largest response body kept for conditional GETs, bytes"
+    )
+
+    # Auth settings
+    token_refresh_lock_ttl: float = Field(
+        10.0, description="Cross-replica token refresh lock TTL, seconds"
+    )
+    token_refresh_margin: float = Field(
+        60.0, description="Refresh access token this many seconds before exp"
+    )
+    token_refresh_active_window: float = Field(
+        900.0, description="Pre-refresh only users active within this window, seconds"
+    )
 
     # Redis settings
     redis_url: str = Field(
         default="redis://localhost:6379/0",
         description="Redis connection URL"
     )
+    redis_max_connections: int = Field(50, description="Shared Redis pool size")
+    redis_pool_timeout: float = Field(5.0, description="Wait for a free pooled connection, seconds")
+    redis_health_check_interval: int = Field(30, description="Redis connection health check interval, seconds")
+    redis_socket_timeout: float = Field(5.0, description="Redis socket read/write timeout, seconds")
+    redis_socket_connect_timeout: float = Field(5.0, description="Redis connect timeout, seconds")
+    redis_reconnect_max_delay: float = Field(30.0, description="Max Redis reconnect backoff, seconds")
+    redis_fallback_size: int = Field(
+        10000, description="In-memory token fallback size used while Redis is down"
+    )
+    token_cache_size: int = Field(10000, description="In-process token cache size, 0 disables")
+    token_cache_ttl: float = Field(60.0, description="In-process token cache TTL, seconds")
+    token_default_ttl: int = Field(
+        30 * 24 * 3600,
+        description="Tokens hash TTL when refresh token has no exp claim, seconds (0 - no TTL)",
+    )
+    categories_cache_ttl: int = Field(300, description="Per-user categories cache TTL, seconds")
+
+    # Task list cache
+    task_list_fresh_ttl: float = Field(10.0, description="Task list page age served without revalidation, seconds")
+    task_list_max_age: float = Field(600.0, description="Oldest task list page still served from cache, seconds")
+    task_list_stale_hint: float = Field(60.0, description="Page age after which the list header shows a staleness hint, seconds")
+    task_list_cache_pages: int = Field(16, description="Cached task list pages per user")
+    task_list_cache_users: int = Field(1000, description="Users kept in the task list cache")
 
     class Config:
         env_file = ".env"
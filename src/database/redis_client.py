@@ -1,117 +1,699 @@
+import asyncio
+import json
 import logging
-from typing import Optional, Tuple
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
 
 from ..config import settings
+from ..utils.jwt import decode_exp
+from ..utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# (user_id, access) — access=None, если токены пользователя удалены.
+TokenListener = Callable[[int, Optional[str]], None]
+# (user_id) — user_id=None: сбросить всё, сообщения могли потеряться без подписки.
+InvalidationListener = Callable[[Optional[int]], None]
+
+# Снимаем лок только если он всё ещё наш (не истёк и не перехвачен другой репликой).
+_RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Перенос legacy-пары в хэш: только если хэша ещё нет и legacy-ключи не изменились
+# с момента чтения. Иначе пару уже записал set_user_tokens — её не трогаем.
+# ARGV: access, refresh, ttl (0 — без TTL). Возвращает 1, если перенос выполнен.
+_MIGRATE_TOKENS_LUA = """
+if redis.call('exists', KEYS[1]) == 1 then
+    redis.call('del', KEYS[2], KEYS[3])
+    return 0
+end
+if redis.call('get', KEYS[2]) ~= ARGV[1] or redis.call('get', KEYS[3]) ~= ARGV[2] then
+    return 0
+end
+redis.call('hset', KEYS[1], 'access', ARGV[1], 'refresh', ARGV[2])
+if tonumber(ARGV[3]) > 0 then
+    redis.call('expire', KEYS[1], ARGV[3])
+end
+redis.call('del', KEYS[2], KEYS[3])
+return 1
+"""
+
+# Заполнение кэша категорий: только если поколение не менялось с момента, когда
+# список начали загружать из API (иначе между чтением и записью была мутация).
+# ARGV: поколение, TTL, затем пары поле/значение хэша. Возвращает 1, если записано.
+_SET_CATEGORIES_LUA = """
+if (redis.call('get', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('del', KEYS[1])
+redis.call('hset', KEYS[1], unpack(ARGV, 3))
+redis.call('expire', KEYS[1], ARGV[2])
+return 1
+"""
+
+TokenPair = Tuple[Optional[str], Optional[str]]
+
+INVALIDATION_RETRY_DELAY = 1.0
+RECONNECT_MIN_DELAY = 0.5
+# Сколько ждать фоновые задачи при disconnect (драйвер может проглотить отмену во время I/O).
+SHUTDOWN_WAIT = 1.0
+# Ошибки, после которых считаем Redis недоступным и уходим в degraded mode.
+_UNAVAILABLE_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError)
+# Ждём сообщения pub/sub порциями: блокирующее чтение упёрлось бы в socket_timeout пула.
+INVALIDATION_POLL_TIMEOUT = 1.0
+MIGRATION_SCAN_COUNT = 500
+# Запас к TTL хэша сверх exp refresh-токена: на рассинхрон часов бота и API.
+TOKENS_TTL_GRACE = 60
+# Поле хэша категорий с полным списком; остальные поля — id категории.
+CATEGORIES_ALL_FIELD = "__all__"
+
+
+class TokenCache:
+    """
+    Ограниченный LRU-кэш пар (access, refresh) с TTL.
+    Кэшируются и отрицательные ответы (None, None), чтобы is_authenticated
+    для неавторизованных тоже не ходил в Redis.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[int, Tuple[float, TokenPair]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: int) -> Optional[TokenPair]:
+        item = self._data.get(user_id)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[user_id]
+            self.misses += 1
+            return None
+        self._data.move_to_end(user_id)
+        self.hits += 1
+        return item[1]
+
+    def put(self, user_id: int, tokens: TokenPair) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[user_id] = (time.monotonic() + self.ttl, tokens)
+        self._data.move_to_end(user_id)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "evictions": self.evictions,
+        }
+
 
 class RedisClient:
-    """Redis client: хранение access/refresh токенов пользователя."""
+    """
+    Redis client: хранение access/refresh токенов пользователя.
+
+    Перед Redis стоит in-process TokenCache. Любая запись/удаление токенов
+    публикуется в канал инвалидации, чтобы другие реплики сбросили свою копию.
+    Тем же каналом пользуются другие in-process кэши (publish_invalidation /
+    add_invalidation_listener).
+
+    Доступность Redis отслеживает фоновый supervisor: при сбое клиент уходит
+    в degraded mode и переподключается с экспоненциальной задержкой. Пока Redis
+    недоступен, токены читаются из write-through fallback в памяти, а записи
+    копятся в self._dirty и сбрасываются в Redis после восстановления.
+    """
 
     def __init__(self):
         self.redis: Optional[redis.Redis] = None
         self._ns = "user"
+        self._token_listeners: List[TokenListener] = []
+        self._invalidation_listeners: Dict[str, List[InvalidationListener]] = {}
+        self._cache = TokenCache(settings.token_cache_size, settings.token_cache_ttl)
+        self._fallback = TokenCache(settings.redis_fallback_size, float("inf"))
+        self._dirty: Dict[int, TokenPair] = {}
+        self._instance_id = uuid.uuid4().hex
+        self._up = asyncio.Event()
+        self._check_now = asyncio.Event()
+        self._supervisor_task: Optional[asyncio.Task] = None
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._migration_task: Optional[asyncio.Task] = None
+        self._reconnects = 0
+        self._closing = False
+        metrics.register("token_cache", self._cache.stats)
+        metrics.register("redis_health", self.health)
 
-    async def connect(self):
-        try:
+    async def connect(self, pool: Optional[redis.ConnectionPool] = None):
+        """pool — общий пул приложения; без него создаётся собственное подключение."""
+        if pool is not None:
+            self.redis = redis.Redis(connection_pool=pool)
+        else:
             self.redis = redis.from_url(settings.redis_url, decode_responses=True)
+        try:
             await self.redis.ping()
             logger.info("Connected to Redis")
+            self._on_up()
         except Exception as e:
-            logger.error(f"Failed to connect to Redis: {e}")
-            self.redis = None
+            logger.error(f"Failed to connect to Redis, running in degraded mode: {e}")
+        self._supervisor_task = asyncio.create_task(self._supervise(), name="redis-supervisor")
 
     async def disconnect(self):
+        self._closing = True
+        tasks = [t for t in (self._supervisor_task, self._invalidation_task, self._migration_task) if t]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=SHUTDOWN_WAIT)
+        self._supervisor_task = self._invalidation_task = self._migration_task = None
+        if self.available and self._dirty:
+            await self._flush_fallback()
+        if self._dirty:
+            logger.warning("Redis unavailable on shutdown, lost %s pending token writes", len(self._dirty))
         if self.redis:
             await self.redis.close()
             logger.info("Disconnected from Redis")
 
+    # health
+    @property
+    def available(self) -> bool:
+        return self.redis is not None and self._up.is_set()
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "state": "up" if self.available else "degraded",
+            "reconnects": self._reconnects,
+            "pending_writes": len(self._dirty),
+            "fallback": self._fallback.stats(),
+        }
+
+    def _on_up(self) -> None:
+        self._up.set()
+        if self._invalidation_task is None:
+            self._invalidation_task = asyncio.create_task(
+                self._listen_invalidations(), name="token-cache-invalidation"
+            )
+        if self._migration_task is None:
+            self._migration_task = asyncio.create_task(
+                self.migrate_legacy_tokens(), name="tokens-migration"
+            )
+
+    def _handle_error(self, action: str, e: Exception) -> None:
+        logger.error(f"Redis {action} error: {e}")
+        if isinstance(e, _UNAVAILABLE_ERRORS) and self._up.is_set():
+            logger.error("Redis marked unavailable, switching to degraded mode")
+            self._up.clear()
+            self._check_now.set()
+
+    async def _supervise(self) -> None:
+        delay = RECONNECT_MIN_DELAY
+        while not self._closing:
+            if self._up.is_set():
+                self._check_now.clear()
+                try:
+                    await asyncio.wait_for(self._check_now.wait(), timeout=settings.redis_health_check_interval)
+                except asyncio.TimeoutError:
+                    pass
+                if not self._up.is_set():
+                    continue
+                try:
+                    await self.redis.ping()
+                except Exception as e:
+                    self._handle_error("health check", e)
+                continue
+
+            try:
+                await self.redis.ping()
+            except Exception as e:
+                logger.warning(f"Redis reconnect failed, next attempt in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                delay = min(delay * 2, settings.redis_reconnect_max_delay)
+                continue
+
+            delay = RECONNECT_MIN_DELAY
+            self._reconnects += 1
+            logger.info("Redis connection restored")
+            self._on_up()
+            await self._flush_fallback()
+
+    async def _flush_fallback(self) -> None:
+        """Переносит накопленные в degraded mode записи токенов обратно в Redis."""
+        flushed = 0
+        for user_id, (access, refresh) in list(self._dirty.items()):
+            if access is None and refresh is None:
+                ok = await self._delete_tokens(user_id)
+            elif access and refresh:
+                ok = await self._store_tokens(user_id, access, refresh)
+            else:
+                ok = await self._store_fields(user_id, {"access": access, "refresh": refresh})
+            if not ok:
+                break
+            if self._dirty.get(user_id) == (access, refresh):
+                del self._dirty[user_id]
+            flushed += 1
+        if flushed:
+            logger.info("Flushed %s pending token writes to Redis", flushed)
+
+    # cache invalidation
+    @property
+    def _invalidation_channel(self) -> str:
+        return f"{self._ns}:tokens:invalidate"
+
+    async def _publish_invalidation(self, user_id: int, scope: Optional[str] = None) -> None:
+        # Сообщение токенов — "<instance>:<user_id>", других кэшей — с суффиксом ":<scope>".
+        message = f"{self._instance_id}:{user_id}" + (f":{scope}" if scope else "")
+        try:
+            await self.redis.publish(self._invalidation_channel, message)
+        except Exception as e:
+            self._handle_error("publish invalidation", e)
+
+    async def publish_invalidation(self, scope: str, user_id: int) -> None:
+        """Сообщить другим репликам, что их in-process данные scope для пользователя устарели."""
+        if self.available:
+            await self._publish_invalidation(user_id, scope)
+
+    def add_invalidation_listener(self, scope: str, listener: InvalidationListener) -> None:
+        """Подписка на инвалидации scope от других реплик (через канал инвалидации токенов)."""
+        listeners = self._invalidation_listeners.setdefault(scope, [])
+        if listener not in listeners:
+            listeners.append(listener)
+
+    def _invalidate_local(self, user_id: Optional[int], scope: Optional[str] = None) -> None:
+        """scope=None — токены; user_id=None — сбросить всё во всех кэшах."""
+        if user_id is None:
+            self._cache.clear()
+        elif scope is None:
+            self._cache.invalidate(user_id)
+        for name, listeners in self._invalidation_listeners.items():
+            if user_id is not None and name != scope:
+                continue
+            for listener in listeners:
+                try:
+                    listener(user_id)
+                except Exception as e:
+                    logger.error(f"Invalidation listener error: {e}")
+
+    async def _listen_invalidations(self) -> None:
+        """
+        Слушает инвалидации от других реплик. Пока подписки нет, сообщения
+        могли потеряться, поэтому при каждой (пере)подписке кэш очищается.
+        """
+        while not self._closing:
+            await self._up.wait()
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self._invalidation_channel)
+                self._invalidate_local(None)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=INVALIDATION_POLL_TIMEOUT
+                    )
+                    if message is None:
+                        continue
+                    origin, _, rest = str(message.get("data", "")).partition(":")
+                    raw_user_id, _, scope = rest.partition(":")
+                    if origin != self._instance_id and raw_user_id.isdigit():
+                        self._invalidate_local(int(raw_user_id), scope or None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._handle_error("invalidation listener", e)
+                self._invalidate_local(None)
+                await asyncio.sleep(INVALIDATION_RETRY_DELAY)
+            finally:
+                await pubsub.aclose()
+
+    # listeners
+    def add_token_listener(self, listener: TokenListener) -> None:
+        """Подписка на запись/удаление токенов (например, для отслеживания exp)."""
+        if listener not in self._token_listeners:
+            self._token_listeners.append(listener)
+
+    def _notify_tokens(self, user_id: int, access: Optional[str]) -> None:
+        for listener in self._token_listeners:
+            try:
+                listener(user_id, access)
+            except Exception as e:
+                logger.error(f"Token listener error: {e}")
+
     # keys
+    def _key_tokens(self, user_id: int) -> str:
+        return f"{self._ns}:{user_id}:tokens"
+
     def _key_access(self, user_id: int) -> str:
+        """Legacy-ключ (до перехода на хэш), читается только для миграции."""
         return f"{self._ns}:{user_id}:access_token"
 
     def _key_refresh(self, user_id: int) -> str:
+        """Legacy-ключ (до перехода на хэш), читается только для миграции."""
         return f"{self._ns}:{user_id}:refresh_token"
 
+    def _key_refresh_lock(self, user_id: int) -> str:
+        return f"{self._ns}:{user_id}:refresh_lock"
+
+    def _key_categories(self, user_id: int) -> str:
+        return f"{self._ns}:{user_id}:categories"
+
+    def _key_categories_generation(self, user_id: int) -> str:
+        return f"{self._ns}:{user_id}:categories_gen"
+
+    @staticmethod
+    def _tokens_ttl(refresh: Optional[str]) -> Optional[int]:
+        """TTL хэша в секундах: до exp refresh-токена, иначе значение из настроек (0 — без TTL)."""
+        exp = decode_exp(refresh)
+        if exp is not None:
+            return max(1, int(exp - time.time()) + TOKENS_TTL_GRACE)
+        return settings.token_default_ttl or None
+
+    def _queue_store_tokens(self, pipe: Any, user_id: int, access: str, refresh: str) -> None:
+        key = self._key_tokens(user_id)
+        pipe.hset(key, mapping={"access": access, "refresh": refresh})
+        ttl = self._tokens_ttl(refresh)
+        if ttl:
+            pipe.expire(key, ttl)
+        else:
+            pipe.persist(key)
+        pipe.delete(self._key_access(user_id), self._key_refresh(user_id))
+
     # tokens
-    async def set_user_tokens(self, user_id: int, access: str, refresh: str) -> bool:
-        if not self.redis:
+    def _remember(self, user_id: int, tokens: TokenPair, dirty: bool) -> None:
+        self._cache.put(user_id, tokens)
+        self._fallback.put(user_id, tokens)
+        if dirty:
+            self._dirty[user_id] = tokens
+
+    def _known_tokens(self, user_id: int) -> TokenPair:
+        """Последние известные токены без похода в Redis (degraded mode)."""
+        if user_id in self._dirty:
+            return self._dirty[user_id]
+        return self._fallback.get(user_id) or (None, None)
+
+    async def _store_tokens(self, user_id: int, access: str, refresh: str) -> bool:
+        """Атомарная ротация пары токенов (MULTI/EXEC): хэш, его TTL и удаление legacy-ключей."""
+        if not self.available:
             return False
         try:
-            pipe = self.redis.pipeline()
-            pipe.set(self._key_access(user_id), access)
-            pipe.set(self._key_refresh(user_id), refresh)
+            pipe = self.redis.pipeline(transaction=True)
+            self._queue_store_tokens(pipe, user_id, access, refresh)
             await pipe.execute()
-            return True
         except Exception as e:
-            logger.error(f"Redis set tokens error: {e}")
+            self._handle_error("set tokens", e)
             return False
+        await self._publish_invalidation(user_id)
+        return True
 
-    async def set_user_access_token(self, user_id: int, token: str) -> bool:
-        if not self.redis:
+    async def _store_fields(self, user_id: int, fields: Dict[str, Optional[str]]) -> bool:
+        if not self.available:
             return False
+        key = self._key_tokens(user_id)
         try:
-            await self.redis.set(self._key_access(user_id), token)
-            return True
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hset(key, mapping={k: v for k, v in fields.items() if v is not None})
+            ttl = self._tokens_ttl(fields.get("refresh")) if fields.get("refresh") else None
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+        except Exception as e:
+            self._handle_error("set token fields", e)
+            return False
+        await self._publish_invalidation(user_id)
+        return True
+
+    async def _delete_tokens(self, user_id: int) -> bool:
+        if not self.available:
+            return False
+        try:
+            await self.redis.delete(
+                self._key_tokens(user_id), self._key_access(user_id), self._key_refresh(user_id)
+            )
         except Exception as e:
-            logger.error(f"Redis set access token error: {e}")
+            self._handle_error("delete tokens", e)
             return False
+        await self._publish_invalidation(user_id)
+        return True
+
+    async def set_user_tokens(self, user_id: int, access: str, refresh: str) -> bool:
+        """
+        True — пара записана в Redis. False — Redis недоступен (degraded mode):
+        пара видна этой реплике и будет записана в Redis после восстановления.
+        """
+        stored = await self._store_tokens(user_id, access, refresh)
+        self._remember(user_id, (access, refresh), dirty=not stored)
+        self._notify_tokens(user_id, access)
+        return stored
+
+    async def set_user_access_token(self, user_id: int, token: str) -> bool:
+        stored = await self._store_fields(user_id, {"access": token})
+        _, refresh = await self.get_user_tokens(user_id) if stored else self._known_tokens(user_id)
+        self._remember(user_id, (token, refresh), dirty=not stored)
+        self._notify_tokens(user_id, token)
+        return stored
 
     async def set_user_refresh_token(self, user_id: int, token: str) -> bool:
-        if not self.redis:
+        stored = await self._store_fields(user_id, {"refresh": token})
+        access, _ = await self.get_user_tokens(user_id) if stored else self._known_tokens(user_id)
+        self._remember(user_id, (access, token), dirty=not stored)
+        return stored
+
+    async def get_user_access_token(self, user_id: int, use_cache: bool = True) -> Optional[str]:
+        access, _ = await self.get_user_tokens(user_id, use_cache=use_cache)
+        return access
+
+    async def get_user_refresh_token(self, user_id: int, use_cache: bool = True) -> Optional[str]:
+        _, refresh = await self.get_user_tokens(user_id, use_cache=use_cache)
+        return refresh
+
+    async def get_user_tokens(self, user_id: int, use_cache: bool = True) -> TokenPair:
+        """Оба токена одним HMGET; для ещё не мигрированных пользователей — fallback на legacy-ключи."""
+        if use_cache:
+            cached = self._cache.get(user_id)
+            if cached is not None:
+                return cached
+        if not self.available:
+            return self._known_tokens(user_id)
+        try:
+            access, refresh = await self.redis.hmget(self._key_tokens(user_id), "access", "refresh")
+            if access is None and refresh is None:
+                access, refresh = await self._migrate_user(user_id)
+        except Exception as e:
+            self._handle_error("get tokens", e)
+            return self._known_tokens(user_id)
+        self._remember(user_id, (access, refresh), dirty=False)
+        return access, refresh
+
+    async def delete_user_tokens(self, user_id: int) -> bool:
+        """Как set_user_tokens: False — удаление отложено до восстановления Redis."""
+        deleted = await self._delete_tokens(user_id)
+        self._remember(user_id, (None, None), dirty=not deleted)
+        self._notify_tokens(user_id, None)
+        return deleted
+
+    async def is_authenticated(self, user_id: int) -> bool:
+        """Пользователь считается авторизованным, если у него есть refresh-токен."""
+        refresh = await self.get_user_refresh_token(user_id)
+        return bool(refresh)
+
+    # migration
+    async def _migrate_user(self, user_id: int) -> TokenPair:
+        """
+        Переносит legacy-ключи пользователя в хэш (если они есть). Запись идёт
+        Lua-скриптом с проверкой «хэша нет, legacy не изменились», поэтому
+        параллельный set_user_tokens не будет перезаписан устаревшей парой.
+        """
+        access, refresh = await self.redis.mget(self._key_access(user_id), self._key_refresh(user_id))
+        if access is None and refresh is None:
+            return None, None
+        if not (access and refresh):
+            return access, refresh
+        migrated = await self.redis.eval(
+            _MIGRATE_TOKENS_LUA,
+            3,
+            self._key_tokens(user_id),
+            self._key_access(user_id),
+            self._key_refresh(user_id),
+            access,
+            refresh,
+            self._tokens_ttl(refresh) or 0,
+        )
+        if not migrated:
+            # Пару успели записать в хэш — актуальна она, а не legacy.
+            metrics.inc("redis.tokens.migration_skipped")
+            access, refresh = await self.redis.hmget(self._key_tokens(user_id), "access", "refresh")
+            return access, refresh
+        metrics.inc("redis.tokens.migrated")
+        await self._publish_invalidation(user_id)
+        return access, refresh
+
+    async def migrate_legacy_tokens(self) -> int:
+        """
+        Онлайн-миграция всех legacy-пар в хэши: SCAN по *:refresh_token батчами.
+        Безопасно запускать на живом боте параллельно с чтениями — каждый
+        перенос атомарен, а get_user_tokens сам мигрирует тех, до кого SCAN ещё не дошёл.
+        """
+        if not self.available:
+            return 0
+        migrated = 0
+        prefix, suffix = f"{self._ns}:", ":refresh_token"
+        try:
+            async for key in self.redis.scan_iter(match=f"{prefix}*{suffix}", count=MIGRATION_SCAN_COUNT):
+                raw_user_id = key[len(prefix):-len(suffix)]
+                if not raw_user_id.isdigit():
+                    continue
+                access, refresh = await self._migrate_user(int(raw_user_id))
+                if access and refresh:
+                    migrated += 1
+                    self._cache.invalidate(int(raw_user_id))
+        except Exception as e:
+            self._handle_error("legacy tokens migration", e)
+        logger.info("Legacy tokens migration finished | migrated=%s", migrated)
+        return migrated
+
+    # refresh lock
+    async def acquire_refresh_lock(self, user_id: int, ttl: float) -> Optional[str]:
+        """
+        Короткий межрепликовый лок на обновление токенов.
+        Возвращает токен владельца или None, если лок держит другая реплика.
+        Без Redis (degraded mode) лок не нужен — отдаём локальный токен.
+        """
+        token = uuid.uuid4().hex
+        if not self.available:
+            return token
+        try:
+            acquired = await self.redis.set(
+                self._key_refresh_lock(user_id), token, nx=True, px=int(ttl * 1000)
+            )
+            return token if acquired else None
+        except Exception as e:
+            self._handle_error("acquire refresh lock", e)
+            return token
+
+    async def release_refresh_lock(self, user_id: int, token: str) -> None:
+        if not self.available:
+            return
+        try:
+            await self.redis.eval(_RELEASE_LOCK_LUA, 1, self._key_refresh_lock(user_id), token)
+        except Exception as e:
+            self._handle_error("release refresh lock", e)
+
+    async def is_refresh_locked(self, user_id: int) -> bool:
+        if not self.available:
             return False
         try:
-            await self.redis.set(self._key_refresh(user_id), token)
-            return True
+            return bool(await self.redis.exists(self._key_refresh_lock(user_id)))
         except Exception as e:
-            logger.error(f"Redis set refresh token error: {e}")
+            self._handle_error("refresh lock check", e)
             return False
 
-    async def get_user_access_token(self, user_id: int) -> Optional[str]:
-        if not self.redis:
+    # categories cache
+    async def get_user_categories(self, user_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Список категорий из кэша; None — кэша нет (истёк, инвалидирован или Redis недоступен)."""
+        if not self.available:
             return None
         try:
-            return await self.redis.get(self._key_access(user_id))
+            raw = await self.redis.hget(self._key_categories(user_id), CATEGORIES_ALL_FIELD)
+            return json.loads(raw) if raw is not None else None
         except Exception as e:
-            logger.error(f"Redis get access token error: {e}")
+            self._handle_error("get categories", e)
             return None
 
-    async def get_user_refresh_token(self, user_id: int) -> Optional[str]:
-        if not self.redis:
+    async def get_user_category(self, user_id: int, category_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Одна категория по индексу id.
+        Возвращает (cached, category): cached=False — кэша нет, нужно идти в API;
+        cached=True и category=None — такой категории у пользователя нет.
+        """
+        if not self.available:
+            return False, None
+        try:
+            marker, raw = await self.redis.hmget(
+                self._key_categories(user_id), CATEGORIES_ALL_FIELD, str(category_id)
+            )
+        except Exception as e:
+            self._handle_error("get category", e)
+            return False, None
+        if marker is None:
+            return False, None
+        return True, json.loads(raw) if raw is not None else None
+
+    async def get_categories_generation(self, user_id: int) -> Optional[str]:
+        """
+        Поколение кэша категорий: читается до запроса списка в API и передаётся
+        в set_user_categories. None — Redis недоступен, заполнять кэш не нужно.
+        """
+        if not self.available:
             return None
         try:
-            return await self.redis.get(self._key_refresh(user_id))
+            return await self.redis.get(self._key_categories_generation(user_id)) or "0"
         except Exception as e:
-            logger.error(f"Redis get refresh token error: {e}")
+            self._handle_error("get categories generation", e)
             return None
 
-    async def get_user_tokens(self, user_id: int) -> Tuple[Optional[str], Optional[str]]:
-        access = await self.get_user_access_token(user_id)
-        refresh = await self.get_user_refresh_token(user_id)
-        return access, refresh
-
-    async def delete_user_tokens(self, user_id: int) -> bool:
-        if not self.redis:
+    async def set_user_categories(self, user_id: int, categories: List[Dict[str, Any]], generation: str) -> bool:
+        """
+        Полный список и индекс по id пишутся одним скриптом, чтобы они не расходились,
+        и только если с чтения generation кэш не инвалидировали: иначе список,
+        загруженный до мутации, перезаписал бы её. False — ничего не записано.
+        """
+        if not self.available:
             return False
+        fields: List[str] = [CATEGORIES_ALL_FIELD, json.dumps(categories, ensure_ascii=False)]
+        for item in categories:
+            if item.get("id") is not None:
+                fields += [str(item["id"]), json.dumps(item, ensure_ascii=False)]
         try:
-            await self.redis.delete(self._key_access(user_id), self._key_refresh(user_id))
-            return True
+            stored = await self.redis.eval(
+                _SET_CATEGORIES_LUA,
+                2,
+                self._key_categories(user_id),
+                self._key_categories_generation(user_id),
+                generation,
+                settings.categories_cache_ttl,
+                *fields,
+            )
         except Exception as e:
-            logger.error(f"Redis delete tokens error: {e}")
+            self._handle_error("set categories", e)
             return False
+        if not stored:
+            metrics.inc("categories.cache.stale_fill")
+        return bool(stored)
 
-    async def is_authenticated(self, user_id: int) -> bool:
-        """Пользователь считается авторизованным, если у него есть refresh-токен."""
-        if not self.redis:
+    async def delete_user_categories(self, user_id: int) -> bool:
+        """Сбрасывает кэш и сдвигает поколение — заполнения, начатые раньше, будут отклонены."""
+        if not self.available:
             return False
+        generation_key = self._key_categories_generation(user_id)
         try:
-            refresh = await self.redis.get(self._key_refresh(user_id))
-            return bool(refresh)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.incr(generation_key)
+                # Поколение нужно, пока жив кэш, который могло бы перезаписать опоздавшее заполнение.
+                pipe.expire(generation_key, settings.categories_cache_ttl)
+                pipe.delete(self._key_categories(user_id))
+                await pipe.execute()
+            return True
         except Exception as e:
-            logger.error(f"Redis is_authenticated error: {e}")
+            self._handle_error("delete categories", e)
             return False
 
 
@@ -0,0 +1,65 @@
+import logging
+import time
+from typing import Any, Dict
+
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from ..config import settings
+from ..utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedConnectionPool(redis.BlockingConnectionPool):
+    """
+    Блокирующий пул соединений Redis со статистикой.
+    При исчерпании пула запрос ждёт свободное соединение до timeout секунд —
+    такие ожидания и таймауты считаются, чтобы исчерпание было видно в метриках.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_timeouts = 0
+        self.wait_time_total = 0.0
+
+    async def get_connection(self, command_name, *keys, **options):
+        if self.can_get_connection():
+            return await super().get_connection(command_name, *keys, **options)
+
+        self.waits += 1
+        started = time.monotonic()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        except RedisConnectionError:
+            self.wait_timeouts += 1
+            raise
+        finally:
+            self.wait_time_total += time.monotonic() - started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            "waits": self.waits,
+            "wait_timeouts": self.wait_timeouts,
+            "avg_wait_ms": round(self.wait_time_total / self.waits * 1000, 2) if self.waits else 0.0,
+        }
+
+
+def create_redis_pool() -> InstrumentedConnectionPool:
+    """Общий пул для FSM storage и RedisClient; владелец — жизненный цикл приложения (main.py)."""
+    pool = InstrumentedConnectionPool.from_url(
+        settings.redis_url,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        timeout=settings.redis_pool_timeout,
+        health_check_interval=settings.redis_health_check_interval,
+        socket_timeout=settings.redis_socket_timeout,
+        socket_connect_timeout=settings.redis_socket_connect_timeout,
+    )
+    metrics.register("redis_pool", pool.stats)
+    logger.info("Redis pool created | max_connections=%s", settings.redis_max_connections)
+    return pool
@@ -0,0 +1,417 @@
+"""
+Типизированные схемы callback_data инлайн-кнопок.
+
+Схема — frozen dataclass с шаблоном строки: литеральные сегменты и поля в {},
+разделитель «:». pack() собирает строку для кнопки, unpack() разбирает её
+обратно с приведением типов. Формат строк совпадает с прежним, поэтому кнопки
+в уже отправленных сообщениях продолжают работать.
+"""
+import dataclasses
+import typing
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, List, Literal, Optional, Sequence, Tuple, Type, TypeVar
+
+SEPARATOR = ":"
+NONE_VALUE = "none"
+
+T = TypeVar("T", bound="CallbackSchema")
+
+
+def _converter(annotation: Any):
+    """Функция «сегмент -> значение» для типа поля; ValueError — сегмент не подходит."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is Literal:
+        allowed = {str(a): a for a in args}
+
+        def convert_literal(raw: str) -> Any:
+            if raw not in allowed:
+                raise ValueError(raw)
+            return allowed[raw]
+
+        return convert_literal
+    if origin is typing.Union and type(None) in args:
+        inner = _converter(next(a for a in args if a is not type(None)))
+        return lambda raw: None if raw == NONE_VALUE else inner(raw)
+    if annotation is int:
+        return int
+    if annotation is str:
+        def convert_str(raw: str) -> str:
+            if not raw:
+                raise ValueError(raw)
+            return raw
+
+        return convert_str
+    raise TypeError(f"Unsupported callback field type: {annotation!r}")
+
+
+class CallbackSchema:
+    """
+    Базовый класс схем:
+
+        @dataclass(frozen=True)
+        class TaskOpen(CallbackSchema, pattern="tl:open:{task_id}"):
+            task_id: int
+
+    Поля с значением по умолчанию в конце шаблона можно опускать в строке
+    (старые кнопки без номера страницы).
+    """
+
+    __pattern__: ClassVar[str]
+    # Вычисляются лениво, после применения @dataclass.
+    __compiled__: ClassVar[Optional[Tuple[Tuple[Tuple[Optional[str], Any], ...], int]]] = None
+
+    def __init_subclass__(cls, pattern: str, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls.__pattern__ = pattern
+        cls.__compiled__ = None
+
+    @classmethod
+    def segments(cls) -> Tuple[Tuple[Optional[str], Any], ...]:
+        """Сегменты шаблона: (литерал, None) или (None, (имя поля, конвертер))."""
+        return cls._compile()[0]
+
+    @classmethod
+    def _compile(cls):
+        if cls.__compiled__ is None:
+            hints = typing.get_type_hints(cls)
+            defaults = {f.name for f in dataclasses.fields(cls) if f.default is not dataclasses.MISSING}
+            segments: List[Tuple[Optional[str], Any]] = []
+            for part in cls.__pattern__.split(SEPARATOR):
+                if part.startswith("{") and part.endswith("}"):
+                    name = part[1:-1]
+                    segments.append((None, (name, _converter(hints[name]))))
+                else:
+                    segments.append((part, None))
+            required = len(segments)
+            while required and segments[required - 1][0] is None and segments[required - 1][1][0] in defaults:
+                required -= 1
+            cls.__compiled__ = (tuple(segments), required)
+        return cls.__compiled__
+
+    @classmethod
+    def shapes(cls) -> List[Tuple[Optional[str], ...]]:
+        """Все допустимые формы строки (с опущенными хвостовыми полями) — для индекса роутера."""
+        segments, required = cls._compile()
+        literals = tuple(literal for literal, _ in segments)
+        return [literals[:n] for n in range(required, len(segments) + 1)]
+
+    @classmethod
+    def from_parts(cls: Type[T], parts: Sequence[str]) -> Optional[T]:
+        segments, required = cls._compile()
+        if not required <= len(parts) <= len(segments):
+            return None
+        values: Dict[str, Any] = {}
+        for raw, (literal, field) in zip(parts, segments):
+            if literal is not None:
+                if raw != literal:
+                    return None
+                continue
+            name, convert = field
+            try:
+                values[name] = convert(raw)
+            except ValueError:
+                return None
+        return cls(**values)
+
+    @classmethod
+    def unpack(cls: Type[T], data: str) -> Optional[T]:
+        return cls.from_parts(data.split(SEPARATOR))
+
+    def pack(self) -> str:
+        parts: List[str] = []
+        for literal, field in self.segments():
+            if literal is not None:
+                parts.append(literal)
+                continue
+            value = getattr(self, field[0])
+            parts.append(NONE_VALUE if value is None else str(value))
+        return SEPARATOR.join(parts)
+
+
+@dataclass(frozen=True)
+class Cancel(CallbackSchema, pattern="cancel"):
+    pass
+
+
+# ----------------- список задач -----------------
+@dataclass(frozen=True)
+class ListRefresh(CallbackSchema, pattern="tl:refresh"):
+    pass
+
+
+@dataclass(frozen=True)
+class ListPage(CallbackSchema, pattern="tl:page:{direction}"):
+    direction: Literal["prev", "next"]
+
+
+@dataclass(frozen=True)
+class GroupMore(CallbackSchema, pattern="tl:grp:{group}:more"):
+    group: str
+
+
+@dataclass(frozen=True)
+class GroupInfo(CallbackSchema, pattern="tl:grp:info:{group}"):
+    group: str
+
+
+@dataclass(frozen=True)
+class BackToList(CallbackSchema, pattern="tl:back_to_list"):
+    pass
+
+
+@dataclass(frozen=True)
+class TaskOpen(CallbackSchema, pattern="tl:open:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class ViewToggle(CallbackSchema, pattern="tl:view:toggle"):
+    pass
+
+
+@dataclass(frozen=True)
+class Home(CallbackSchema, pattern="tl:home"):
+    pass
+
+
+@dataclass(frozen=True)
+class TaskNew(CallbackSchema, pattern="task:new"):
+    pass
+
+
+@dataclass(frozen=True)
+class SearchStart(CallbackSchema, pattern="tl:search"):
+    pass
+
+
+# ----------------- фильтры и сортировка -----------------
+@dataclass(frozen=True)
+class FiltersOpen(CallbackSchema, pattern="tl:filters"):
+    pass
+
+
+@dataclass(frozen=True)
+class FiltersBack(CallbackSchema, pattern="tl:back"):
+    pass
+
+
+@dataclass(frozen=True)
+class FiltersReset(CallbackSchema, pattern="tl:reset"):
+    pass
+
+
+@dataclass(frozen=True)
+class QuickFilter(CallbackSchema, pattern="tl:f:{flag}"):
+    flag: Literal["urgent", "overdue", "today"]
+
+
+@dataclass(frozen=True)
+class PriorityFilterOpen(CallbackSchema, pattern="tl:f:prio"):
+    pass
+
+
+@dataclass(frozen=True)
+class PriorityToggle(CallbackSchema, pattern="tl:f:prio:toggle:{priority}"):
+    priority: str
+
+
+@dataclass(frozen=True)
+class PriorityClear(CallbackSchema, pattern="tl:f:prio:clear"):
+    pass
+
+
+@dataclass(frozen=True)
+class PriorityApply(CallbackSchema, pattern="tl:f:prio:apply"):
+    pass
+
+
+@dataclass(frozen=True)
+class StatusFilterOpen(CallbackSchema, pattern="tl:f:status"):
+    pass
+
+
+@dataclass(frozen=True)
+class StatusToggle(CallbackSchema, pattern="tl:f:st:toggle:{status}"):
+    status: str
+
+
+@dataclass(frozen=True)
+class StatusClear(CallbackSchema, pattern="tl:f:st:clear"):
+    pass
+
+
+@dataclass(frozen=True)
+class StatusApply(CallbackSchema, pattern="tl:f:st:apply"):
+    pass
+
+
+@dataclass(frozen=True)
+class CategoryFilterOpen(CallbackSchema, pattern="tl:f:cat"):
+    pass
+
+
+@dataclass(frozen=True)
+class CategoryFilterPage(CallbackSchema, pattern="tl:f:cat:page:{page}"):
+    page: int
+
+
+@dataclass(frozen=True)
+class CategoryFilterSet(CallbackSchema, pattern="tl:f:cat:set:{category_id}"):
+    category_id: int
+
+
+@dataclass(frozen=True)
+class CategoryFilterNone(CallbackSchema, pattern="tl:f:cat:none"):
+    pass
+
+
+@dataclass(frozen=True)
+class SortOpen(CallbackSchema, pattern="tl:sort"):
+    pass
+
+
+@dataclass(frozen=True)
+class SortSet(CallbackSchema, pattern="tl:sort:set:{field}"):
+    field: str
+
+
+@dataclass(frozen=True)
+class SortDirection(CallbackSchema, pattern="tl:sort:dir"):
+    pass
+
+
+# ----------------- действия с задачей -----------------
+@dataclass(frozen=True)
+class TaskDone(CallbackSchema, pattern="task_done:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskReopen(CallbackSchema, pattern="task_reopen:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskArchive(CallbackSchema, pattern="task_archive:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskRestore(CallbackSchema, pattern="task_restore:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskDelete(CallbackSchema, pattern="task_delete:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskUpdate(CallbackSchema, pattern="task_update:{task_id}"):
+    task_id: int
+
+
+# ----------------- редактирование задачи -----------------
+@dataclass(frozen=True)
+class TaskEditMenu(CallbackSchema, pattern="task:edit:menu:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskEditField(CallbackSchema, pattern="task:edit:{field}:{task_id}"):
+    field: Literal["title", "desc", "due"]
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskEditPriorityMenu(CallbackSchema, pattern="task:edit:prio:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskEditPrioritySet(CallbackSchema, pattern="task:edit:prio:set:{priority}:{task_id}"):
+    priority: str
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskEditCategoryMenu(CallbackSchema, pattern="task:edit:cat:{task_id}"):
+    task_id: int
+
+
+@dataclass(frozen=True)
+class TaskEditCategoryPage(CallbackSchema, pattern="task:edit:cat:page:{task_id}:{page}"):
+    task_id: int
+    page: int
+
+
+@dataclass(frozen=True)
+class TaskEditCategorySet(CallbackSchema, pattern="task:edit:cat:set:{task_id}:{category_id}"):
+    task_id: int
+    category_id: Optional[int]
+
+
+# ----------------- создание задачи -----------------
+@dataclass(frozen=True)
+class CreatePriority(CallbackSchema, pattern="task:create:prio:{value}"):
+    value: str
+
+
+@dataclass(frozen=True)
+class CreateCategoryPage(CallbackSchema, pattern="task:create:cat:page:{page}"):
+    page: int
+
+
+@dataclass(frozen=True)
+class CreateCategorySet(CallbackSchema, pattern="task:create:cat:set:{category_id}"):
+    category_id: int
+
+
+@dataclass(frozen=True)
+class CreateCategoryNone(CallbackSchema, pattern="task:create:cat:none"):
+    pass
+
+
+@dataclass(frozen=True)
+class CreateDue(CallbackSchema, pattern="task:create:due:{value}"):
+    value: str
+
+
+# ----------------- категории -----------------
+@dataclass(frozen=True)
+class CategoryNew(CallbackSchema, pattern="cat:new"):
+    pass
+
+
+@dataclass(frozen=True)
+class CategoriesRefresh(CallbackSchema, pattern="category_refresh"):
+    pass
+
+
+@dataclass(frozen=True)
+class CategoriesPage(CallbackSchema, pattern="category_page:{page}"):
+    page: int
+
+
+@dataclass(frozen=True)
+class CategoriesBack(CallbackSchema, pattern="category_back:{page}"):
+    page: int
+
+
+@dataclass(frozen=True)
+class CategoryOpen(CallbackSchema, pattern="category_open:{category_id}:{page}"):
+    category_id: int
+    page: int = 0
+
+
+@dataclass(frozen=True)
+class CategoryRename(CallbackSchema, pattern="category_update:{category_id}:{page}"):
+    category_id: int
+    page: int = 0
+
+
+@dataclass(frozen=True)
+class CategoryDelete(CallbackSchema, pattern="category_delete:{category_id}:{page}"):
+    category_id: int
+    page: int = 0
@@ -2,6 +2,18 @@ from typing import Dict, List
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.keyboards.callbacks import (
+    CategoriesBack,
+    CategoriesPage,
+    CategoriesRefresh,
+    CategoryDelete,
+    CategoryFilterSet,
+    CategoryNew,
+    CategoryOpen,
+    CategoryRename,
+    Home,
+)
+
 DEFAULT_PAGE_SIZE = 8
 
 
@@ -21,23 +33,23 @@ def categories_board(
         rows.append([
             InlineKeyboardButton(
                 text=f"📁 {name}",
-                callback_data=f"category_open:{cat.get('id')}:{page}",
+                callback_data=CategoryOpen(cat.get("id"), page).pack(),
             )
         ])
 
     nav: List[InlineKeyboardButton] = []
     if page > 0:
-        nav.append(InlineKeyboardButton(text="⬅️", callback_data=f"category_page:{page-1}"))
+        nav.append(InlineKeyboardButton(text="⬅️", callback_data=CategoriesPage(page - 1).pack()))
     if start + page_size < len(categories):
-        nav.append(InlineKeyboardButton(text="➡️", callback_data=f"category_page:{page+1}"))
+        nav.append(InlineKeyboardButton(text="➡️", callback_data=CategoriesPage(page + 1).pack()))
     if nav:
         rows.append(nav)
 
     rows.append(
         [
-            InlineKeyboardButton(text="➕ Категория", callback_data="cat:new"),
-            InlineKeyboardButton(text="🔄", callback_data="category_refresh"),
-            InlineKeyboardButton(text="🏠", callback_data="tl:home"),
+            InlineKeyboardButton(text="➕ Категория", callback_data=CategoryNew().pack()),
+            InlineKeyboardButton(text="🔄", callback_data=CategoriesRefresh().pack()),
+            InlineKeyboardButton(text="🏠", callback_data=Home().pack()),
         ]
     )
 
@@ -47,9 +59,9 @@ def categories_board(
 def category_detail_keyboard(category_id: int, page: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="📋 Задачи", callback_data=f"tl:f:cat:set:{category_id}")],
-            [InlineKeyboardButton(text="✏️ Переименовать", callback_data=f"category_update:{category_id}:{page}")],
-            [InlineKeyboardButton(text="🗑 Удалить", callback_data=f"category_delete:{category_id}:{page}")],
-            [InlineKeyboardButton(text="↩️ Назад", callback_data=f"category_back:{page}")],
+            [InlineKeyboardButton(text="📋 Задачи", callback_data=CategoryFilterSet(category_id).pack())],
+            [InlineKeyboardButton(text="✏️ Переименовать", callback_data=CategoryRename(category_id, page).pack())],
+            [InlineKeyboardButton(text="🗑 Удалить", callback_data=CategoryDelete(category_id, page).pack())],
+            [InlineKeyboardButton(text="↩️ Назад", callback_data=CategoriesBack(page).pack())],
         ]
     )
@@ -1,10 +1,13 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 
+from src.keyboards.callbacks import Cancel
+from src.keyboards.main_menu import CANCEL_BUTTON
+
 
 def cancel_keyboard() -> ReplyKeyboardMarkup:
     """Reply-клавиатура с кнопкой Отмена для FSM."""
     return ReplyKeyboardMarkup(
-        keyboard=[[KeyboardButton(text="Отмена")]],
+        keyboard=[[KeyboardButton(text=CANCEL_BUTTON)]],
         resize_keyboard=True,
         one_time_keyboard=True,
         input_field_placeholder="Введите данные или нажмите «Отмена»",
@@ -19,7 +22,7 @@ def auth_retry_keyboard() -> InlineKeyboardMarkup:
                 InlineKeyboardButton(text="🔁 Повторить пароль", callback_data="auth:retry_pwd"),
                 InlineKeyboardButton(text="✉️ Изменить email", callback_data="auth:change_email"),
             ],
-            [InlineKeyboardButton(text="❌ Отмена", callback_data="cancel")],
+            [InlineKeyboardButton(text="❌ Отмена", callback_data=Cancel().pack())],
         ]
     )
 
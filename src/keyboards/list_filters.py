@@ -2,24 +2,44 @@ from typing import Dict, List
 
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from src.keyboards.callbacks import (
+    CategoryFilterNone,
+    CategoryFilterOpen,
+    CategoryFilterPage,
+    CategoryFilterSet,
+    FiltersBack,
+    FiltersOpen,
+    FiltersReset,
+    PriorityApply,
+    PriorityClear,
+    PriorityFilterOpen,
+    PriorityToggle,
+    QuickFilter,
+    SortDirection,
+    SortSet,
+    StatusApply,
+    StatusClear,
+    StatusFilterOpen,
+    StatusToggle,
+)
 from src.utils.translations import tr_priority, tr_status
 
 
 def filters_menu() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text="🔥 Срочные", callback_data="tl:f:urgent"),
-            InlineKeyboardButton(text="⏰ Просрочено", callback_data="tl:f:overdue"),
-            InlineKeyboardButton(text="🎯 Сегодня", callback_data="tl:f:today"),
+            InlineKeyboardButton(text="🔥 Срочные", callback_data=QuickFilter("urgent").pack()),
+            InlineKeyboardButton(text="⏰ Просрочено", callback_data=QuickFilter("overdue").pack()),
+            InlineKeyboardButton(text="🎯 Сегодня", callback_data=QuickFilter("today").pack()),
         ],
         [
-            InlineKeyboardButton(text="⚡ Приоритет", callback_data="tl:f:prio"),
-            InlineKeyboardButton(text="📌 Статус", callback_data="tl:f:status"),
-            InlineKeyboardButton(text="🗂 Категория", callback_data="tl:f:cat"),
+            InlineKeyboardButton(text="⚡ Приоритет", callback_data=PriorityFilterOpen().pack()),
+            InlineKeyboardButton(text="📌 Статус", callback_data=StatusFilterOpen().pack()),
+            InlineKeyboardButton(text="🗂 Категория", callback_data=CategoryFilterOpen().pack()),
         ],
         [
-            InlineKeyboardButton(text="🧹 Сброс", callback_data="tl:reset"),
-            InlineKeyboardButton(text="↩️ Назад", callback_data="tl:back"),
+            InlineKeyboardButton(text="🧹 Сброс", callback_data=FiltersReset().pack()),
+            InlineKeyboardButton(text="↩️ Назад", callback_data=FiltersBack().pack()),
         ],
     ])
 
@@ -31,17 +51,17 @@ def priorities_selector(selected: List[str]) -> InlineKeyboardMarkup:
 
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text=mark("low", tr_priority("low")), callback_data="tl:f:prio:toggle:low"),
-            InlineKeyboardButton(text=mark("medium", tr_priority("medium")), callback_data="tl:f:prio:toggle:medium"),
+            InlineKeyboardButton(text=mark("low", tr_priority("low")), callback_data=PriorityToggle("low").pack()),
+            InlineKeyboardButton(text=mark("medium", tr_priority("medium")), callback_data=PriorityToggle("medium").pack()),
         ],
         [
-            InlineKeyboardButton(text=mark("high", tr_priority("high")), callback_data="tl:f:prio:toggle:high"),
-            InlineKeyboardButton(text=mark("urgent", tr_priority("urgent")), callback_data="tl:f:prio:toggle:urgent"),
+            InlineKeyboardButton(text=mark("high", tr_priority("high")), callback_data=PriorityToggle("high").pack()),
+            InlineKeyboardButton(text=mark("urgent", tr_priority("urgent")), callback_data=PriorityToggle("urgent").pack()),
         ],
         [
-            InlineKeyboardButton(text="Применить", callback_data="tl:f:prio:apply"),
-            InlineKeyboardButton(text="Сброс", callback_data="tl:f:prio:clear"),
-            InlineKeyboardButton(text="↩️ Назад", callback_data="tl:filters"),
+            InlineKeyboardButton(text="Применить", callback_data=PriorityApply().pack()),
+            InlineKeyboardButton(text="Сброс", callback_data=PriorityClear().pack()),
+            InlineKeyboardButton(text="↩️ Назад", callback_data=FiltersOpen().pack()),
         ],
     ])
 
@@ -53,17 +73,17 @@ def statuses_selector(selected: List[str]) -> InlineKeyboardMarkup:
 
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text=mark("todo", tr_status("todo")), callback_data="tl:f:st:toggle:todo"),
-            InlineKeyboardButton(text=mark("in_progress", tr_status("in_progress")), callback_data="tl:f:st:toggle:in_progress"),
+            InlineKeyboardButton(text=mark("todo", tr_status("todo")), callback_data=StatusToggle("todo").pack()),
+            InlineKeyboardButton(text=mark("in_progress", tr_status("in_progress")), callback_data=StatusToggle("in_progress").pack()),
         ],
         [
-            InlineKeyboardButton(text=mark("done", tr_status("done")), callback_data="tl:f:st:toggle:done"),
-            InlineKeyboardButton(text=mark("archived", tr_status("archived")), callback_data="tl:f:st:toggle:archived"),
+            InlineKeyboardButton(text=mark("done", tr_status("done")), callback_data=StatusToggle("done").pack()),
+            InlineKeyboardButton(text=mark("archived", tr_status("archived")), callback_data=StatusToggle("archived").pack()),
         ],
         [
-            InlineKeyboardButton(text="Применить", callback_data="tl:f:st:apply"),
-            InlineKeyboardButton(text="Сброс", callback_data="tl:f:st:clear"),
-            InlineKeyboardButton(text="↩️ Назад", callback_data="tl:filters"),
+            InlineKeyboardButton(text="Применить", callback_data=StatusApply().pack()),
+            InlineKeyboardButton(text="Сброс", callback_data=StatusClear().pack()),
+            InlineKeyboardButton(text="↩️ Назад", callback_data=FiltersOpen().pack()),
         ],
     ])
 
@@ -73,21 +93,21 @@ def categories_selector(categories: List[dict], page: int = 0, page_size: int =
     chunk = categories[start: start + page_size]
 
     rows: List[List[InlineKeyboardButton]] = [
-        [InlineKeyboardButton(text=(c.get("name") or "—"), callback_data=f"tl:f:cat:set:{c.get('id')}")]
+        [InlineKeyboardButton(text=(c.get("name") or "—"), callback_data=CategoryFilterSet(c.get("id")).pack())]
         for c in chunk
     ]
 
     nav: List[InlineKeyboardButton] = []
     if page > 0:
-        nav.append(InlineKeyboardButton(text="⬅️ Пред", callback_data=f"tl:f:cat:page:{page-1}"))
+        nav.append(InlineKeyboardButton(text="⬅️ Пред", callback_data=CategoryFilterPage(page - 1).pack()))
     if start + page_size < len(categories):
-        nav.append(InlineKeyboardButton(text="➡️ След", callback_data=f"tl:f:cat:page:{page+1}"))
+        nav.append(InlineKeyboardButton(text="➡️ След", callback_data=CategoryFilterPage(page + 1).pack()))
     if nav:
         rows.append(nav)
 
     rows.append([
-        InlineKeyboardButton(text="Без категории", callback_data="tl:f:cat:none"),
-        InlineKeyboardButton(text="↩️ Назад", callback_data="tl:filters"),
+        InlineKeyboardButton(text="Без категории", callback_data=CategoryFilterNone().pack()),
+        InlineKeyboardButton(text="↩️ Назад", callback_data=FiltersOpen().pack()),
     ])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
@@ -95,15 +115,15 @@ def categories_selector(categories: List[dict], page: int = 0, page_size: int =
 def sort_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text="Дедлайн", callback_data="tl:sort:set:due_date"),
-            InlineKeyboardButton(text="Приоритет", callback_data="tl:sort:set:priority"),
+            InlineKeyboardButton(text="Дедлайн", callback_data=SortSet("due_date").pack()),
+            InlineKeyboardButton(text="Приоритет", callback_data=SortSet("priority").pack()),
         ],
         [
-            InlineKeyboardButton(text="Обновлено", callback_data="tl:sort:set:updated_at"),
-            InlineKeyboardButton(text="Название", callback_data="tl:sort:set:title"),
+            InlineKeyboardButton(text="Обновлено", callback_data=SortSet("updated_at").pack()),
+            InlineKeyboardButton(text="Название", callback_data=SortSet("title").pack()),
         ],
         [
-            InlineKeyboardButton(text="↕️ Направление", callback_data="tl:sort:dir"),
-            InlineKeyboardButton(text="↩️ Назад", callback_data="tl:back"),
+            InlineKeyboardButton(text="↕️ Направление", callback_data=SortDirection().pack()),
+            InlineKeyboardButton(text="↩️ Назад", callback_data=FiltersBack().pack()),
         ],
     ])
\ No newline at end of file
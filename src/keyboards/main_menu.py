@@ -1,3 +1,5 @@
+from typing import Optional
+
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup, ReplyKeyboardRemove
 
 TASKS_BUTTON = "📋 Мои задачи"
@@ -7,6 +9,32 @@ NEW_CATEGORY_BUTTON = "➕ Категория"
 HELP_BUTTON = "❓ Помощь"
 PROFILE_BUTTON = "⚙️ Профиль"
 REFRESH_BUTTON = "🔄 Обновить"
+CANCEL_BUTTON = "Отмена"
+
+# Тексты reply-кнопок, которые разбирает TextRouterMiddleware.
+MENU_BUTTONS = frozenset({
+    TASKS_BUTTON,
+    CATEGORIES_BUTTON,
+    NEW_TASK_BUTTON,
+    NEW_CATEGORY_BUTTON,
+    HELP_BUTTON,
+    PROFILE_BUTTON,
+    REFRESH_BUTTON,
+    CANCEL_BUTTON,
+})
+# Набранное вручную (после strip().lower()), равносильное кнопке.
+BUTTON_ALIASES = {
+    "отмена": CANCEL_BUTTON,
+}
+
+
+def resolve_button(text: Optional[str]) -> Optional[str]:
+    """Кнопка, которой соответствует текст сообщения, или None."""
+    if not text:
+        return None
+    if text in MENU_BUTTONS:
+        return text
+    return BUTTON_ALIASES.get(text.strip().lower())
 
 
 def main_menu_keyboard() -> ReplyKeyboardMarkup:
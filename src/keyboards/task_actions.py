@@ -1,31 +1,33 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from src.keyboards.callbacks import BackToList, TaskArchive, TaskDelete, TaskDone, TaskReopen, TaskRestore, TaskUpdate
+
 
 def task_actions_keyboard(task_id: int, status: str | None, archived: bool) -> InlineKeyboardMarkup:
     rows = [
         [
-            InlineKeyboardButton(text="✏️", callback_data=f"task_update:{task_id}"),
-            InlineKeyboardButton(text="🗑", callback_data=f"task_delete:{task_id}"),
+            InlineKeyboardButton(text="✏️", callback_data=TaskUpdate(task_id).pack()),
+            InlineKeyboardButton(text="🗑", callback_data=TaskDelete(task_id).pack()),
         ]
     ]
 
     st = (status or "").lower()
     if archived:
-        rows.append([InlineKeyboardButton(text="♻️", callback_data=f"task_restore:{task_id}")])
+        rows.append([InlineKeyboardButton(text="♻️", callback_data=TaskRestore(task_id).pack())])
     else:
         if st == "done":
             rows.append([
-                InlineKeyboardButton(text="↩️", callback_data=f"task_reopen:{task_id}"),
-                InlineKeyboardButton(text="📦", callback_data=f"task_archive:{task_id}"),
+                InlineKeyboardButton(text="↩️", callback_data=TaskReopen(task_id).pack()),
+                InlineKeyboardButton(text="📦", callback_data=TaskArchive(task_id).pack()),
             ])
         else:
-            rows.append([InlineKeyboardButton(text="✅", callback_data=f"task_done:{task_id}")])
+            rows.append([InlineKeyboardButton(text="✅", callback_data=TaskDone(task_id).pack())])
 
-    rows.append([InlineKeyboardButton(text="⬅️", callback_data="tl:back_to_list")])
+    rows.append([InlineKeyboardButton(text="⬅️", callback_data=BackToList().pack())])
     return InlineKeyboardMarkup(inline_keyboard=rows)
 
 
 def back_to_list_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="⬅️ К списку", callback_data="tl:back_to_list")]
+        [InlineKeyboardButton(text="⬅️ К списку", callback_data=BackToList().pack())]
     ])
@@ -2,11 +2,13 @@ from typing import Dict, List, Optional
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.keyboards.callbacks import CreateCategoryNone, CreateCategoryPage, CreateCategorySet, CreateDue, CreatePriority
+
 
 def creation_priority_keyboard(selected: Optional[str]) -> InlineKeyboardMarkup:
     def btn(value: str, label: str) -> InlineKeyboardButton:
         mark = "☑️" if selected == value else "⬜️"
-        return InlineKeyboardButton(text=f"{mark} {label}", callback_data=f"task:create:prio:{value}")
+        return InlineKeyboardButton(text=f"{mark} {label}", callback_data=CreatePriority(value).pack())
 
     return InlineKeyboardMarkup(inline_keyboard=[
         [
@@ -17,7 +19,7 @@ def creation_priority_keyboard(selected: Optional[str]) -> InlineKeyboardMarkup:
             btn("high", "3 ⬆️ Высокий"),
             btn("urgent", "4 🔥 Срочный"),
         ],
-        [InlineKeyboardButton(text="Без приоритета", callback_data="task:create:prio:skip")],
+        [InlineKeyboardButton(text="Без приоритета", callback_data=CreatePriority("skip").pack())],
     ])
 
 
@@ -36,20 +38,20 @@ def creation_category_keyboard(
         rows.append([
             InlineKeyboardButton(
                 text=f"{idx}. {name}",
-                callback_data=f"task:create:cat:set:{cat.get('id')}",
+                callback_data=CreateCategorySet(cat.get("id")).pack(),
             )
         ])
 
     nav: List[InlineKeyboardButton] = []
     if page > 0:
-        nav.append(InlineKeyboardButton(text="⬅️", callback_data=f"task:create:cat:page:{page-1}"))
+        nav.append(InlineKeyboardButton(text="⬅️", callback_data=CreateCategoryPage(page - 1).pack()))
     if start + page_size < len(categories):
-        nav.append(InlineKeyboardButton(text="➡️", callback_data=f"task:create:cat:page:{page+1}"))
+        nav.append(InlineKeyboardButton(text="➡️", callback_data=CreateCategoryPage(page + 1).pack()))
     if nav:
         rows.append(nav)
 
     rows.append([
-        InlineKeyboardButton(text="Без категории", callback_data="task:create:cat:none"),
+        InlineKeyboardButton(text="Без категории", callback_data=CreateCategoryNone().pack()),
     ])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -58,15 +60,15 @@ def creation_category_keyboard(
 def creation_due_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[
         [
-            InlineKeyboardButton(text="Сегодня", callback_data="task:create:due:today"),
-            InlineKeyboardButton(text="Завтра", callback_data="task:create:due:tomorrow"),
+            InlineKeyboardButton(text="Сегодня", callback_data=CreateDue("today").pack()),
+            InlineKeyboardButton(text="Завтра", callback_data=CreateDue("tomorrow").pack()),
         ],
         [
-            InlineKeyboardButton(text="+3 дня", callback_data="task:create:due:+3"),
-            InlineKeyboardButton(text="+7 дней", callback_data="task:create:due:+7"),
+            InlineKeyboardButton(text="+3 дня", callback_data=CreateDue("+3").pack()),
+            InlineKeyboardButton(text="+7 дней", callback_data=CreateDue("+7").pack()),
         ],
         [
-            InlineKeyboardButton(text="🗓 Ввести дату", callback_data="task:create:due:manual"),
-            InlineKeyboardButton(text="Без дедлайна", callback_data="task:create:due:skip"),
+            InlineKeyboardButton(text="🗓 Ввести дату", callback_data=CreateDue("manual").pack()),
+            InlineKeyboardButton(text="Без дедлайна", callback_data=CreateDue("skip").pack()),
         ],
     ])
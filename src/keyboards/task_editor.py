@@ -2,22 +2,34 @@ from typing import Any, Dict, List
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.keyboards.callbacks import (
+    BackToList,
+    TaskEditCategoryMenu,
+    TaskEditCategoryPage,
+    TaskEditCategorySet,
+    TaskEditField,
+    TaskEditMenu,
+    TaskEditPriorityMenu,
+    TaskEditPrioritySet,
+    TaskOpen,
+)
+
 
 def task_edit_menu(task_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="✏️ Заголовок", callback_data=f"task:edit:title:{task_id}"),
-                InlineKeyboardButton(text="📝 Описание", callback_data=f"task:edit:desc:{task_id}"),
+                InlineKeyboardButton(text="✏️ Заголовок", callback_data=TaskEditField("title", task_id).pack()),
+                InlineKeyboardButton(text="📝 Описание", callback_data=TaskEditField("desc", task_id).pack()),
             ],
             [
-                InlineKeyboardButton(text="⚡ Приоритет", callback_data=f"task:edit:prio:{task_id}"),
-                InlineKeyboardButton(text="📁 Категория", callback_data=f"task:edit:cat:{task_id}"),
+                InlineKeyboardButton(text="⚡ Приоритет", callback_data=TaskEditPriorityMenu(task_id).pack()),
+                InlineKeyboardButton(text="📁 Категория", callback_data=TaskEditCategoryMenu(task_id).pack()),
             ],
-            [InlineKeyboardButton(text="🎯 Дедлайн", callback_data=f"task:edit:due:{task_id}")],
+            [InlineKeyboardButton(text="🎯 Дедлайн", callback_data=TaskEditField("due", task_id).pack())],
             [
-                InlineKeyboardButton(text="⬅️ К задаче", callback_data=f"tl:open:{task_id}"),
-                InlineKeyboardButton(text="📋 К списку", callback_data="tl:back_to_list"),
+                InlineKeyboardButton(text="⬅️ К задаче", callback_data=TaskOpen(task_id).pack()),
+                InlineKeyboardButton(text="📋 К списку", callback_data=BackToList().pack()),
             ],
         ]
     )
@@ -27,14 +39,14 @@ def task_edit_priority(task_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="1 ⬇️", callback_data=f"task:edit:prio:set:low:{task_id}"),
-                InlineKeyboardButton(text="2 ⚖️", callback_data=f"task:edit:prio:set:medium:{task_id}"),
+                InlineKeyboardButton(text="1 ⬇️", callback_data=TaskEditPrioritySet("low", task_id).pack()),
+                InlineKeyboardButton(text="2 ⚖️", callback_data=TaskEditPrioritySet("medium", task_id).pack()),
             ],
             [
-                InlineKeyboardButton(text="3 ⬆️", callback_data=f"task:edit:prio:set:high:{task_id}"),
-                InlineKeyboardButton(text="4 🔥", callback_data=f"task:edit:prio:set:urgent:{task_id}"),
+                InlineKeyboardButton(text="3 ⬆️", callback_data=TaskEditPrioritySet("high", task_id).pack()),
+                InlineKeyboardButton(text="4 🔥", callback_data=TaskEditPrioritySet("urgent", task_id).pack()),
             ],
-            [InlineKeyboardButton(text="↩️ Назад", callback_data=f"task:edit:menu:{task_id}")],
+            [InlineKeyboardButton(text="↩️ Назад", callback_data=TaskEditMenu(task_id).pack())],
         ]
     )
 
@@ -53,7 +65,7 @@ def task_edit_categories(
         [
             InlineKeyboardButton(
                 text=(category.get("name") or "—"),
-                callback_data=f"task:edit:cat:set:{task_id}:{category.get('id')}",
+                callback_data=TaskEditCategorySet(task_id, category.get("id")).pack(),
             )
         ]
         for category in chunk
@@ -61,13 +73,13 @@ def task_edit_categories(
 
     nav: List[InlineKeyboardButton] = []
     if page > 0:
-        nav.append(InlineKeyboardButton(text="⬅️ Пред", callback_data=f"task:edit:cat:page:{task_id}:{page - 1}"))
+        nav.append(InlineKeyboardButton(text="⬅️ Пред", callback_data=TaskEditCategoryPage(task_id, page - 1).pack()))
     if start + page_size < len(categories):
-        nav.append(InlineKeyboardButton(text="➡️ След", callback_data=f"task:edit:cat:page:{task_id}:{page + 1}"))
+        nav.append(InlineKeyboardButton(text="➡️ След", callback_data=TaskEditCategoryPage(task_id, page + 1).pack()))
     if nav:
         rows.append(nav)
 
-    rows.append([InlineKeyboardButton(text="Без категории", callback_data=f"task:edit:cat:set:{task_id}:none")])
-    rows.append([InlineKeyboardButton(text="↩️ Назад", callback_data=f"task:edit:menu:{task_id}")])
+    rows.append([InlineKeyboardButton(text="Без категории", callback_data=TaskEditCategorySet(task_id, None).pack())])
+    rows.append([InlineKeyboardButton(text="↩️ Назад", callback_data=TaskEditMenu(task_id).pack())])
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
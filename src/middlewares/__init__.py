@@ -0,0 +1,43 @@
+from aiogram import Dispatcher
+
+from src.services.render_coalescer import render_coalescer
+
+from .callback_ack import AckedCallbackQuery, CallbackAckMiddleware, EarlyAckMiddleware, callback_ack, callback_tasks
+from .scheduler import UpdateSchedulerMiddleware, UpdateTicket
+from .session import AuthRequiredMiddleware, SessionMiddleware
+from .text_router import MenuButton, TextRouterMiddleware
+
+__all__ = [
+    "AckedCallbackQuery",
+    "AuthRequiredMiddleware",
+    "CallbackAckMiddleware",
+    "EarlyAckMiddleware",
+    "MenuButton",
+    "SessionMiddleware",
+    "TextRouterMiddleware",
+    "UpdateSchedulerMiddleware",
+    "UpdateTicket",
+    "callback_ack",
+    "callback_tasks",
+    "setup_middlewares",
+]
+
+
+def setup_middlewares(dp: Dispatcher) -> None:
+    """Connecting dispatcher-level middlewares."""
+    # Планировщик до FSMContextMiddleware (его Dispatcher регистрирует сам): порядок апдейтов
+    # пользователя фиксируется до любых await, а состояние FSM загружается уже внутри полосы.
+    fsm_registered = dp.fsm in dp.update.outer_middleware
+    if fsm_registered:
+        dp.update.outer_middleware.unregister(dp.fsm)
+    # Подтверждение нажатий — до полосы пользователя, чтобы не ждать его прошлых апдейтов.
+    dp.update.outer_middleware(EarlyAckMiddleware(callback_ack))
+    scheduler = UpdateSchedulerMiddleware()
+    dp.update.outer_middleware(scheduler)
+    # Отложенные перерисовки выполняются в той же полосе, что и апдейты пользователя.
+    render_coalescer.bind(scheduler.run)
+    if fsm_registered:
+        dp.update.outer_middleware(dp.fsm)
+    dp.update.outer_middleware(SessionMiddleware())
+    dp.message.outer_middleware(TextRouterMiddleware())
+    callback_ack.bind(dp)
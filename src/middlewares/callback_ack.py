@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware, Router
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.dispatcher.flags import get_flag
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, ErrorEvent, TelegramObject, Update
+from pydantic import PrivateAttr
+
+from src.config import settings
+from src.services.background import BackgroundTasks
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+FAILED_TEXT = "❌ Не удалось выполнить действие. Попробуйте ещё раз."
+
+callback_tasks = BackgroundTasks("callbacks")
+
+
+class AckedCallbackQuery(CallbackQuery):
+    """
+    CallbackQuery, на который уже ответили. Повторный answerCallbackQuery Telegram
+    не примет, поэтому answer() хендлера: всплывающее окно (show_alert) уходит
+    обычным сообщением в чат, пустой ответ и тост с тем же текстом, что при
+    подтверждении, отбрасываются. Другой тост показать уже нельзя — это ошибка
+    хендлера (результат надо показывать в сообщении), она попадает в лог.
+    """
+
+    _ack_text: Optional[str] = PrivateAttr(default=None)
+
+    @classmethod
+    def wrap(cls, callback: CallbackQuery, ack_text: Optional[str] = None) -> "AckedCallbackQuery":
+        acked = cls.model_construct(_fields_set=callback.model_fields_set, **dict(callback)).as_(callback.bot)
+        acked._ack_text = ack_text
+        return acked
+
+    async def answer(self, text: Optional[str] = None, show_alert: Optional[bool] = None, **kwargs: Any) -> bool:
+        if text and show_alert and self.message is not None:
+            await self.bot.send_message(self.message.chat.id, text)
+        elif text and text != self._ack_text:
+            metrics.inc("callbacks.toast_dropped")
+            logger.warning("Toast after early ack dropped | data=%s | text=%s", self.data, text)
+        return True
+
+
+def _ack_text(ack: Any) -> Optional[str]:
+    return ack if isinstance(ack, str) else None
+
+
+async def _answer_early(callback: CallbackQuery, ack: Any) -> None:
+    try:
+        await callback.answer(_ack_text(ack))
+    except TelegramBadRequest as e:
+        # Запрос устарел (долго ждал в очереди) — действие всё равно выполняем.
+        logger.warning("Callback ack failed: %s", e)
+    metrics.inc("callbacks.acked")
+
+
+class CallbackAckMiddleware(BaseMiddleware):
+    """
+    Inner middleware callback_query: хендлерам с флагом ack отвечает на нажатие
+    сразу, до похода в API, и продолжает хендлер фоновой задачей.
+
+        @router.callback_query(F.data == "...", flags={"ack": True})      # без текста
+        @router.callback_query(F.data == "...", flags={"ack": "Применено"})  # с тостом
+
+    Обычно на нажатие уже ответил EarlyAckMiddleware (событие — AckedCallbackQuery);
+    здесь отвечаем, только если хендлер нельзя было определить до маршрутизации.
+    Продолжение держит полосу пользователя (UpdateTicket) до своего завершения,
+    ограничено по времени callback_task_timeout, а ошибки уходят в errors-роутеры
+    как обычные; если их никто не обработал — пользователь получает сообщение о сбое.
+    """
+
+    def __init__(self):
+        self.errors_router: Optional[Router] = None
+
+    def bind(self, errors_router: Router) -> None:
+        """Роутер (обычно Dispatcher), через который разносятся ошибки фоновых продолжений."""
+        self.errors_router = errors_router
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        ack = get_flag(data, "ack")
+        if not ack or not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        if isinstance(event, AckedCallbackQuery):
+            acked = event
+        else:
+            await _answer_early(event, ack)
+            acked = AckedCallbackQuery.wrap(event, _ack_text(ack))
+        task = callback_tasks.spawn(self._continue(handler, acked, data), name=f"callback-{event.id}")
+        ticket = data.get("update_ticket")
+        if ticket is not None:
+            ticket.hand_off(task)
+        return None
+
+    def early_flag(self, data: str) -> Any:
+        """
+        Флаг ack хендлера, которому достанется нажатие с такой строкой, — если его
+        видно по индексам IndexedRouter без фильтров; иначе None.
+        """
+        if self.errors_router is None:
+            return None
+        for router in self.errors_router.chain_tail:
+            observer = router.callback_query
+            lookup = getattr(observer, "lookup", None)
+            if lookup is None:
+                if observer.handlers:
+                    return None
+                continue
+            handler = lookup(data)
+            if handler is not None:
+                return handler.flags.get("ack")
+            if observer.has_unindexed:
+                return None
+        return None
+
+    async def _continue(self, handler: Handler, event: AckedCallbackQuery, data: Dict[str, Any]) -> None:
+        try:
+            with metrics.timer("callbacks.background"):
+                await asyncio.wait_for(handler(event, data), timeout=settings.callback_task_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._report(event, data, e)
+
+    async def _report(self, event: AckedCallbackQuery, data: Dict[str, Any], error: Exception) -> None:
+        update = data.get("event_update")
+        if self.errors_router is not None and update is not None:
+            try:
+                handled = await self.errors_router.propagate_event(
+                    update_type="error", event=ErrorEvent(update=update, exception=error), **data
+                )
+                if handled is not UNHANDLED:
+                    return
+            except Exception as e:
+                logger.error("Error handler failed for background callback: %s", e)
+        metrics.inc("callbacks.background.failed")
+        logger.error("Background callback failed | data=%s", event.data, exc_info=error)
+        try:
+            await event.answer(FAILED_TEXT, show_alert=True)
+        except Exception as e:
+            logger.warning("Failed to report callback failure: %s", e)
+
+
+class EarlyAckMiddleware(BaseMiddleware):
+    """
+    Outer middleware апдейта, стоит перед планировщиком: нажатие, которое достанется
+    хендлеру с флагом ack, подтверждается сразу по приходу, а не когда освободится
+    полоса пользователя (её может держать фоновое продолжение прошлого нажатия).
+    Ответ уходит фоновой задачей — до очереди в полосу нет ни одного await, порядок
+    апдейтов сохраняется. Дальше по цепочке callback_query — уже AckedCallbackQuery.
+    """
+
+    def __init__(self, acks: CallbackAckMiddleware):
+        self.acks = acks
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        callback = event.callback_query if isinstance(event, Update) else None
+        if callback is not None and callback.data:
+            ack = self.acks.early_flag(callback.data)
+            if ack:
+                callback_tasks.spawn(_answer_early(callback, ack), name=f"callback-ack-{callback.id}")
+                acked = AckedCallbackQuery.wrap(callback, _ack_text(ack))
+                event = event.model_copy(update={"callback_query": acked})
+        return await handler(event, data)
+
+
+# Один экземпляр на все роутеры: setup_middlewares привязывает к нему Dispatcher.
+callback_ack = CallbackAckMiddleware()
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+
+class _Lane:
+    """Последовательная полоса одного пользователя: замок и число апдейтов в ней (включая текущий)."""
+
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.depth = 0
+
+
+class UpdateTicket:
+    """
+    Место апдейта в полосе (data["update_ticket"]). hand_off(task) оставляет полосу
+    и слот занятыми до конца task — так фоновое продолжение хендлера (CallbackAckMiddleware)
+    не пересекается со следующими апдейтами того же пользователя.
+    """
+
+    __slots__ = ("task",)
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+
+    def hand_off(self, task: asyncio.Task) -> None:
+        self.task = task
+
+
+class UpdateSchedulerMiddleware(BaseMiddleware):
+    """
+    Outer middleware апдейта: апдейты одного пользователя (или чата) выполняются
+    строго по очереди, апдейты разных пользователей — параллельно, но не более
+    update_concurrency одновременно.
+
+    Встаёт за UserContextMiddleware aiogram и EarlyAckMiddleware (нажатия
+    подтверждаются, не дожидаясь полосы) и перед FSMContextMiddleware
+    (см. setup_middlewares): до первого await апдейт успевает встать в очередь
+    полосы в том порядке, в котором dispatcher создал задачи, а raw_state и
+    get_data/update_data FSM читаются уже внутри полосы — после того, как
+    предыдущий апдейт пользователя (включая его фоновое продолжение) закончен.
+    Слот глобального лимита берётся только после своей очереди в полосе — ждущие
+    апдейты одного пользователя не занимают слоты других.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None):
+        self.concurrency = concurrency or settings.update_concurrency
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._lanes: Dict[int, _Lane] = {}
+        self._running = 0
+        metrics.register("update_scheduler", self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [lane.depth for lane in self._lanes.values()]
+        return {
+            "concurrency": self.concurrency,
+            "running": self._running,
+            "lanes": len(depths),
+            "queued": sum(depths) - len(depths),
+            "max_lane_depth": max(depths, default=0),
+        }
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        key = user.id if user is not None else (chat.id if chat is not None else None)
+        started = time.perf_counter()
+
+        lane = await self._acquire(key)
+        metrics.observe("updates.scheduler.wait", time.perf_counter() - started)
+        ticket = UpdateTicket()
+        data["update_ticket"] = ticket
+        try:
+            return await handler(event, data)
+        finally:
+            task = ticket.task
+            if task is None or task.done():
+                self._release(key, lane)
+            else:
+                task.add_done_callback(lambda _: self._release(key, lane))
+
+    async def run(self, key: Optional[int], work: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполняет work в полосе key вне апдейта — так работают отложенные перерисовки."""
+        lane = await self._acquire(key)
+        try:
+            return await work()
+        finally:
+            self._release(key, lane)
+
+    async def _acquire(self, key: Optional[int]) -> Optional[_Lane]:
+        lane = self._enter(key)
+        try:
+            if lane is not None:
+                await lane.lock.acquire()
+            try:
+                await self._slots.acquire()
+            except BaseException:
+                if lane is not None:
+                    lane.lock.release()
+                raise
+        except BaseException:
+            self._leave(key, lane)
+            raise
+        self._running += 1
+        return lane
+
+    def _enter(self, key: Optional[int]) -> Optional[_Lane]:
+        if key is None:
+            return None
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        lane.depth += 1
+        if lane.depth > 1:
+            metrics.inc("updates.scheduler.queued")
+        return lane
+
+    def _leave(self, key: Optional[int], lane: Optional[_Lane]) -> None:
+        if lane is None:
+            return
+        lane.depth -= 1
+        if not lane.depth:
+            self._lanes.pop(key, None)
+
+    def _release(self, key: Optional[int], lane: Optional[_Lane]) -> None:
+        self._running -= 1
+        self._slots.release()
+        if lane is not None:
+            lane.lock.release()
+        self._leave(key, lane)
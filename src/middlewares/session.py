@@ -0,0 +1,59 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from src.database.redis_client import redis_client
+from src.keyboards.main_menu import main_menu_keyboard
+from src.services.session import UserSession, current_session
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+
+class SessionMiddleware(BaseMiddleware):
+    """
+    Outer middleware апдейта: один раз читает токены пользователя и кладёт
+    сессию в data["session"] и в contextvar для BotHttpClient.
+    """
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        user = data.get("event_from_user")
+        if user is None:
+            return await handler(event, data)
+
+        access, refresh = await redis_client.get_user_tokens(user.id)
+        session = UserSession(user_id=user.id, access=access, refresh=refresh)
+        data["session"] = session
+        token = current_session.set(session)
+        try:
+            return await handler(event, data)
+        finally:
+            current_session.reset(token)
+
+
+class AuthRequiredMiddleware(BaseMiddleware):
+    """
+    Inner middleware защищённых роутеров: неавторизованным отвечает сразу,
+    не доходя до хендлера. Сбрасывает незаконченный FSM-сценарий.
+    """
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        session = data.get("session")
+        if session is None:
+            user = data.get("event_from_user")
+            authenticated = bool(user) and await redis_client.is_authenticated(user.id)
+        else:
+            authenticated = session.authenticated
+        if authenticated:
+            return await handler(event, data)
+
+        state: FSMContext | None = data.get("state")
+        if state is not None and data.get("raw_state"):
+            await state.set_state(None)
+
+        if isinstance(event, CallbackQuery):
+            await event.answer("⚠️ Сначала войдите через /login", show_alert=True)
+        elif isinstance(event, Message):
+            await event.answer("⚠️ Вы не авторизованы. Используйте /login", reply_markup=main_menu_keyboard())
+        return None
@@ -0,0 +1,42 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.filters import Filter
+from aiogram.types import Message, TelegramObject
+
+from src.keyboards.main_menu import resolve_button
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+
+class TextRouterMiddleware(BaseMiddleware):
+    """
+    Outer middleware сообщений: один раз на апдейт сопоставляет текст с кнопкой
+    главного меню или синонимом отмены (поиск по словарю) и кладёт результат в
+    data["menu_button"]. По нему IndexedRouter находит хендлеры MenuButton без
+    перебора фильтров.
+    """
+
+    async def __call__(self, handler: Handler, event: TelegramObject, data: Dict[str, Any]) -> Any:
+        data["menu_button"] = resolve_button(event.text) if isinstance(event, Message) else None
+        return await handler(event, data)
+
+
+class MenuButton(Filter):
+    """
+    Фильтр «нажата кнопка reply-клавиатуры»:
+
+        @router.message(MenuButton(TASKS_BUTTON))
+
+    Сравнивает с тем, что уже разобрал TextRouterMiddleware; в IndexedRouter
+    вместо проверки хендлер кладётся в словарь по тексту кнопки.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+
+    async def __call__(self, message: Message, menu_button: Optional[str] = None) -> bool:
+        return menu_button == self.label
+
+    def __str__(self) -> str:
+        return self._signature_to_string(self.label)
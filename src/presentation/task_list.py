@@ -1,9 +1,24 @@
 from datetime import date, datetime
 from textwrap import shorten
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
+from src.keyboards.callbacks import (
+    CategoryNew,
+    FiltersOpen,
+    GroupInfo,
+    GroupMore,
+    Home,
+    ListPage,
+    ListRefresh,
+    SearchStart,
+    SortOpen,
+    TaskNew,
+    TaskOpen,
+    ViewToggle,
+)
+
 GROUPS = ("urgent", "overdue", "today", "done", "rest", "archived")
 
 GROUP_LABELS = {
@@ -20,7 +35,7 @@ def _title_btn(task: Dict) -> InlineKeyboardButton:
     title = task.get("title") or "Без названия"
     task_id = task.get("id")
     label = f"• {shorten(title, width=34, placeholder='…')}"
-    return InlineKeyboardButton(text=label, callback_data=f"tl:open:{task_id}")
+    return InlineKeyboardButton(text=label, callback_data=TaskOpen(task_id).pack())
 
 
 def _as_date(raw: str | None) -> date | None:
@@ -80,7 +95,15 @@ def filters_active(profile: Dict) -> bool:
     )
 
 
-def build_header(profile: Dict, total: int, page: int, pages: int) -> str:
+def _format_age(age: float) -> str:
+    if age < 60:
+        return f"{int(age)} с"
+    if age < 3600:
+        return f"{int(age // 60)} мин"
+    return f"{int(age // 3600)} ч"
+
+
+def build_header(profile: Dict, total: int, page: int, pages: int, age: Optional[float] = None) -> str:
     chips: List[str] = []
     view = profile.get("view", "active")
     chips.append("📦 Архив" if view == "archived" else "📋 Активные")
@@ -115,6 +138,8 @@ def build_header(profile: Dict, total: int, page: int, pages: int) -> str:
     arrow = "↑" if profile.get("sort_order", "asc") == "asc" else "↓"
     chips.append(f"⇅{arrow}")
     chips.append(f"{page}/{pages} · {total}")
+    if age is not None:
+        chips.append(f"🕒 {_format_age(age)} назад")
 
     return " · ".join(chips)
 
@@ -134,7 +159,7 @@ def build_list_keyboard(
         items = groups.get(key, [])
         if not items:
             return
-        rows.append([InlineKeyboardButton(text=title, callback_data=f"tl:grp:info:{key}")])
+        rows.append([InlineKeyboardButton(text=title, callback_data=GroupInfo(key).pack())])
 
         start = int(offsets.get(key, 0))
         chunk = items[start : start + limit]
@@ -142,7 +167,7 @@ def build_list_keyboard(
             rows.append([_title_btn(task)])
 
         if start + limit < len(items):
-            rows.append([InlineKeyboardButton(text="Ещё…", callback_data=f"tl:grp:{key}:more")])
+            rows.append([InlineKeyboardButton(text="Ещё…", callback_data=GroupMore(key).pack())])
 
     for key in GROUPS:
         title = GROUP_LABELS.get(key)
@@ -155,27 +180,27 @@ def build_list_keyboard(
 
     rows.append(
         [
-            InlineKeyboardButton(text=filters_icon, callback_data="tl:filters"),
-            InlineKeyboardButton(text=view_icon, callback_data="tl:view:toggle"),
-            InlineKeyboardButton(text="⇅", callback_data="tl:sort"),
-            InlineKeyboardButton(text=search_icon, callback_data="tl:search"),
+            InlineKeyboardButton(text=filters_icon, callback_data=FiltersOpen().pack()),
+            InlineKeyboardButton(text=view_icon, callback_data=ViewToggle().pack()),
+            InlineKeyboardButton(text="⇅", callback_data=SortOpen().pack()),
+            InlineKeyboardButton(text=search_icon, callback_data=SearchStart().pack()),
         ]
     )
 
     rows.append(
         [
-            InlineKeyboardButton(text="➕ Задача", callback_data="task:new"),
-            InlineKeyboardButton(text="➕ Категория", callback_data="cat:new"),
-            InlineKeyboardButton(text="🏠", callback_data="tl:home"),
+            InlineKeyboardButton(text="➕ Задача", callback_data=TaskNew().pack()),
+            InlineKeyboardButton(text="➕ Категория", callback_data=CategoryNew().pack()),
+            InlineKeyboardButton(text="🏠", callback_data=Home().pack()),
         ]
     )
 
     nav_row: List[InlineKeyboardButton] = []
     if has_prev:
-        nav_row.append(InlineKeyboardButton(text="⬅️", callback_data="tl:page:prev"))
-    nav_row.append(InlineKeyboardButton(text="🔄", callback_data="tl:refresh"))
+        nav_row.append(InlineKeyboardButton(text="⬅️", callback_data=ListPage("prev").pack()))
+    nav_row.append(InlineKeyboardButton(text="🔄", callback_data=ListRefresh().pack()))
     if has_next:
-        nav_row.append(InlineKeyboardButton(text="➡️", callback_data="tl:page:next"))
+        nav_row.append(InlineKeyboardButton(text="➡️", callback_data=ListPage("next").pack()))
     rows.append(nav_row)
 
     return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -3,9 +3,10 @@ from aiogram import Router
 
 def setup_handlers() -> Router:
     """Connecting all routers."""
-    from . import auth, category, core, tasks
+    from . import auth, category, core, errors, tasks
 
     router = Router()
+    router.include_router(errors.router)
     router.include_router(core.router)
     router.include_router(auth.router)
     router.include_router(category.router)
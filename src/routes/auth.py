@@ -1,18 +1,19 @@
 import re
-import httpx
 
-from aiogram import Router
 from aiogram.types import Message
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
 from src.database.redis_client import redis_client
+from src.services.auth_api import AuthAPI
 from src.services.http_client import client
+from src.services.session import UserSession
+from src.services.task_list_cache import task_list_cache
+from .indexed_router import IndexedRouter
 from .states import AuthStates
 from src.keyboards.common import cancel_keyboard, auth_retry_keyboard
 
-router = Router()
-API_URL = "/api/v1"
+router = IndexedRouter()
 
 EMAIL_REGEX = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
 MIN_PASSWORD_LENGTH = 6
@@ -46,15 +47,11 @@ async def login_password(message: Message, state: FSMContext):
     data = await state.get_data()
     email = data.get("email")
 
-    async with httpx.AsyncClient(base_url=API_URL, timeout=15.0) as c:
-        resp = await c.post("/auth/login", json={"email": email, "password": pwd})
+    result = await AuthAPI.login(email, pwd)
 
-    if resp.status_code == 200:
-        body = resp.json()
-        access = body.get("access_token")
-        refresh = body.get("refresh_token")
-        if access and refresh:
-            await redis_client.set_user_tokens(message.from_user.id, access, refresh)
+    if result.status == 200:
+        if result.ok:
+            await redis_client.set_user_tokens(message.from_user.id, result.access, result.refresh)
             await message.answer("✅ Авторизация успешна!")
             await state.clear()
         else:
@@ -112,30 +109,18 @@ async def register_password_confirm(message: Message, state: FSMContext):
         await message.answer("❌ Пароли не совпадают. Попробуйте ещё раз:", reply_markup=cancel_keyboard())
         return
 
-    async with httpx.AsyncClient(base_url=API_URL, timeout=15.0) as c:
-        resp = await c.post(
-            "/auth/register",
-            json={"email": email, "first_name": message.from_user.first_name or "",
-                  "last_name": message.from_user.last_name or "", "password": pwd}
-        )
+    result = await AuthAPI.register_and_login(
+        email, pwd, message.from_user.first_name or "", message.from_user.last_name or ""
+    )
 
-    if resp.status_code != 201:
+    if result.status != 201:
         await message.answer("❌ Ошибка регистрации. Попробуйте позже.")
         await state.clear()
         return
 
-    async with httpx.AsyncClient(base_url=API_URL, timeout=15.0) as c:
-        login_resp = await c.post("/auth/login", json={"email": email, "password": pwd})
-
-    if login_resp.status_code == 200:
-        body = login_resp.json()
-        access = body.get("access_token")
-        refresh = body.get("refresh_token")
-        if access and refresh:
-            await redis_client.set_user_tokens(message.from_user.id, access, refresh)
-            await message.answer("🎉 Регистрация успешна и вы уже вошли в аккаунт. Добро пожаловать!")
-        else:
-            await message.answer("✅ Регистрация успешна! Но не удалось выполнить автологин. Используйте /login.")
+    if result.ok:
+        await redis_client.set_user_tokens(message.from_user.id, result.access, result.refresh)
+        await message.answer("🎉 Регистрация успешна и вы уже вошли в аккаунт. Добро пожаловать!")
     else:
         await message.answer("✅ Регистрация успешна! Теперь войдите через /login.")
 
@@ -161,20 +146,15 @@ async def me(message: Message):
 
 # ----------------- LOGOUT -----------------
 @router.message(Command("logout"))
-async def logout_handler(message: Message):
+async def logout_handler(message: Message, session: UserSession):
     user_id = message.from_user.id
-    access = await redis_client.get_user_access_token(user_id)
-    refresh = await redis_client.get_user_refresh_token(user_id)
+    access, refresh = session.access, session.refresh
     if not access and not refresh:
         await message.answer("Вы и так не авторизованы 🙂")
         return
 
-    async with httpx.AsyncClient(base_url=API_URL, timeout=15.0) as c:
-        await c.post(
-            "/auth/logout",
-            headers={"Authorization": f"Bearer {access}"} if access else {},
-            json={"refresh_token": refresh} if refresh else None
-        )
-
+    await AuthAPI.logout(access, refresh)
     await redis_client.delete_user_tokens(user_id)
+    await redis_client.delete_user_categories(user_id)
+    await task_list_cache.invalidate(user_id)
     await message.answer("👋 Вы вышли из аккаунта.")
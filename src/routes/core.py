@@ -1,15 +1,18 @@
-from aiogram import Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
+from src.keyboards.callbacks import Cancel
 from src.keyboards.main_menu import (
+    CANCEL_BUTTON,
     HELP_BUTTON,
     PROFILE_BUTTON,
     main_menu_keyboard,
 )
+from src.middlewares import MenuButton
+from src.routes.indexed_router import IndexedRouter
 
-router = Router()
+router = IndexedRouter()
 
 HELP_TEXT = (
     "👋 <b>TaskFlow</b> — телеграм-пульт к вашему таск-менеджеру.\n\n"
@@ -51,12 +54,12 @@ async def cmd_cancel(message: Message, state: FSMContext) -> None:
     await message.answer("✅ Действие отменено. Меню снова с вами.", reply_markup=main_menu_keyboard())
 
 
-@router.message(lambda m: (m.text or "").strip().lower() == "отмена")
+@router.message(MenuButton(CANCEL_BUTTON))
 async def msg_cancel(message: Message, state: FSMContext) -> None:
     await cmd_cancel(message, state)
 
 
-@router.callback_query(lambda c: c.data == "cancel")
+@router.callback_query(Cancel)
 async def cb_cancel(callback: CallbackQuery, state: FSMContext) -> None:
     await state.clear()
     await callback.message.answer(
@@ -66,12 +69,12 @@ async def cb_cancel(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer()
 
 
-@router.message(lambda m: m.text == HELP_BUTTON)
+@router.message(MenuButton(HELP_BUTTON))
 async def help_button(message: Message) -> None:
     await _send_help(message)
 
 
-@router.message(lambda m: m.text == PROFILE_BUTTON)
+@router.message(MenuButton(PROFILE_BUTTON))
 async def profile_button(message: Message) -> None:
     await message.answer(
         "📌 Доступные действия:\n"
@@ -82,7 +85,3 @@ async def profile_button(message: Message) -> None:
         reply_markup=main_menu_keyboard(),
     )
 
-
-@router.message(lambda m: m.text == "Отмена")
-async def russian_cancel_button(message: Message, state: FSMContext) -> None:
-    await cmd_cancel(message, state)
@@ -0,0 +1,42 @@
+import logging
+
+from aiogram import Router
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import ExceptionTypeFilter
+from aiogram.types import CallbackQuery, ErrorEvent
+
+from src.services.resilience import ApiUnavailableError
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+def _busy_text(error: ApiUnavailableError) -> str:
+    wait = max(1, round(error.retry_after)) if error.retry_after > 0 else 5
+    return f"⏳ Сервис задач сейчас перегружен. Попробуйте через {wait} с."
+
+
+@router.errors(ExceptionTypeFilter(ApiUnavailableError))
+async def api_unavailable(event: ErrorEvent) -> None:
+    """Мгновенный ответ «сервис занят» вместо повисшего callback и трейсбека в логах."""
+    error: ApiUnavailableError = event.exception
+    text = _busy_text(error)
+    update = event.update
+    try:
+        if update.callback_query is not None:
+            await _answer_callback(update.callback_query, text)
+        elif update.message is not None:
+            await update.message.answer(text)
+    except TelegramBadRequest as e:
+        logger.warning("Failed to send 'service busy' answer: %s", e)
+
+
+async def _answer_callback(callback: CallbackQuery, text: str) -> None:
+    """Нажатие уже могли подтвердить до похода в API (флаг ack) — тогда пишем в чат."""
+    try:
+        await callback.answer(text, show_alert=True)
+    except TelegramBadRequest:
+        if callback.message is None:
+            raise
+        await callback.bot.send_message(callback.message.chat.id, text)
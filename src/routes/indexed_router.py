@@ -0,0 +1,249 @@
+"""
+Router, который находит хендлеры по словарю, а не перебором фильтров.
+
+callback_query: хендлеры, зарегистрированные со схемой из src.keyboards.callbacks,
+попадают в префиксное дерево по сегментам строки (разделитель «:»): строки без
+полей ищутся в словаре, остальные — проходом по дереву, где литеральный сегмент
+проверяется раньше поля. Хендлер получает разобранные поля в callback_data:
+
+    @router.callback_query(TaskOpen, flags={"ack": True})
+    async def tl_open(callback: CallbackQuery, callback_data: TaskOpen) -> None: ...
+
+Несколько схем в одном декораторе — «любая из».
+
+message: хендлеры с фильтром MenuButton индексируются по тексту кнопки (его
+один раз на апдейт разбирает TextRouterMiddleware), хендлеры с состоянием FSM —
+по имени состояния (raw_state из FSMContextMiddleware). Кандидаты из обоих
+словарей и хендлеры без индекса проверяются в порядке регистрации, так что
+приоритет хендлеров внутри роутера прежний.
+
+Стоимость поиска не зависит от числа кнопок и состояний. Отобранных кандидатов
+перебирает обычный TelegramEventObserver.trigger, так что фильтры хендлера,
+middleware, флаги и SkipHandler работают как в aiogram.
+"""
+import heapq
+from contextvars import ContextVar
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from aiogram import Router
+from aiogram.dispatcher.event.handler import CallbackType, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.filters import Filter
+from aiogram.fsm.state import State
+from aiogram.types import CallbackQuery, TelegramObject
+
+from src.keyboards.callbacks import SEPARATOR, CallbackSchema
+from src.middlewares.text_router import MenuButton
+
+Route = Tuple[Type[CallbackSchema], HandlerObject]
+Indexed = Tuple[int, HandlerObject]
+
+
+class _Node:
+    __slots__ = ("literals", "param", "routes")
+
+    def __init__(self):
+        self.literals: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.routes: List[Route] = []
+
+
+class CallbackTrie:
+    """Индекс схем: строка callback_data -> подходящие (хендлер, разобранные данные)."""
+
+    def __init__(self):
+        self._exact: Dict[str, List[Route]] = {}
+        self._root = _Node()
+
+    def add(self, schema: Type[CallbackSchema], handler: HandlerObject) -> None:
+        for shape in schema.shapes():
+            if None not in shape:
+                self._exact.setdefault(SEPARATOR.join(shape), []).append((schema, handler))
+                continue
+            node = self._root
+            for literal in shape:
+                if literal is None:
+                    node.param = node.param or _Node()
+                    node = node.param
+                else:
+                    node = node.literals.setdefault(literal, _Node())
+            node.routes.append((schema, handler))
+
+    def resolve(self, data: str) -> Iterator[Tuple[HandlerObject, CallbackSchema]]:
+        """Кандидаты в порядке приоритета: точное совпадение, затем литералы раньше полей."""
+        for schema, handler in self._exact.get(data, ()):
+            yield handler, schema()
+        yield from self._walk(self._root, data.split(SEPARATOR), 0)
+
+    def _walk(self, node: _Node, parts: Sequence[str], index: int) -> Iterator[Tuple[HandlerObject, CallbackSchema]]:
+        if index == len(parts):
+            for schema, handler in node.routes:
+                parsed = schema.from_parts(parts)
+                if parsed is not None:
+                    yield handler, parsed
+            return
+        child = node.literals.get(parts[index])
+        if child is not None:
+            yield from self._walk(child, parts, index + 1)
+        if node.param is not None:
+            yield from self._walk(node.param, parts, index + 1)
+
+
+class SchemaFilter(Filter):
+    """
+    Фильтр хендлера со схемами: первая схема, которая разбирает строку, — в
+    callback_data. CallbackQueryObserver добавляет его сам; индекс только отбирает
+    хендлеры, которым он заведомо подойдёт.
+    """
+
+    def __init__(self, schemas: Sequence[Type[CallbackSchema]]):
+        self.schemas = tuple(schemas)
+
+    async def __call__(self, callback: CallbackQuery) -> Union[bool, Dict[str, Any]]:
+        if not callback.data:
+            return False
+        parts = callback.data.split(SEPARATOR)
+        for schema in self.schemas:
+            parsed = schema.from_parts(parts)
+            if parsed is not None:
+                return {"callback_data": parsed}
+        return False
+
+
+class _IndexedObserver(TelegramEventObserver):
+    """
+    Observer, у которого trigger перебирает не все хендлеры, а кандидатов из
+    индекса: на время вызова handlers подменяется их списком, и дальше работает
+    обычный TelegramEventObserver.trigger.
+    """
+
+    def __init__(self, router: Router, event_name: str):
+        self._registered: List[HandlerObject] = []
+        self._narrowed: ContextVar[Optional[List[HandlerObject]]] = ContextVar(f"{event_name}_candidates", default=None)
+        super().__init__(router=router, event_name=event_name)
+
+    @property
+    def handlers(self) -> List[HandlerObject]:
+        """Все хендлеры (по ним aiogram собирает allowed_updates), внутри trigger — только кандидаты."""
+        narrowed = self._narrowed.get()
+        return self._registered if narrowed is None else narrowed
+
+    @handlers.setter
+    def handlers(self, handlers: List[HandlerObject]) -> None:
+        self._registered = handlers
+
+    async def _trigger_among(self, candidates: List[HandlerObject], event: TelegramObject, kwargs: Dict[str, Any]) -> Any:
+        token = self._narrowed.set(candidates)
+        try:
+            return await super().trigger(event, **kwargs)
+        finally:
+            self._narrowed.reset(token)
+
+
+class CallbackQueryObserver(_IndexedObserver):
+    """Observer callback_query: сначала кандидаты из CallbackTrie, затем хендлеры без схемы."""
+
+    def __init__(self, router: Router, event_name: str = "callback_query"):
+        super().__init__(router=router, event_name=event_name)
+        self.trie = CallbackTrie()
+        self._filtered: List[HandlerObject] = []
+
+    def register(
+        self,
+        callback: CallbackType,
+        *filters: CallbackType,
+        flags: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> CallbackType:
+        schemas = [f for f in filters if isinstance(f, type) and issubclass(f, CallbackSchema)]
+        rest = [f for f in filters if f not in schemas]
+        if schemas:
+            rest.insert(0, SchemaFilter(schemas))
+        super().register(callback, *rest, flags=flags, **kwargs)
+        handler = self.handlers[-1]
+        if not schemas:
+            self._filtered.append(handler)
+        for schema in schemas:
+            self.trie.add(schema, handler)
+        return callback
+
+    def lookup(self, data: str) -> Optional[HandlerObject]:
+        """Первый хендлер из индекса для строки data (без фильтров и middleware)."""
+        for handler, _ in self.trie.resolve(data):
+            return handler
+        return None
+
+    @property
+    def has_unindexed(self) -> bool:
+        """Есть хендлеры без схемы: без их фильтров не сказать, кому достанется нажатие."""
+        return bool(self._filtered)
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        data = getattr(event, "data", None)
+        candidates: List[HandlerObject] = []
+        if data:
+            for handler, _ in self.trie.resolve(data):
+                # Хендлер с несколькими схемами может встретиться дважды.
+                if not any(handler is seen for seen in candidates):
+                    candidates.append(handler)
+        return await self._trigger_among(candidates + self._filtered, event, kwargs)
+
+
+class MessageObserver(_IndexedObserver):
+    """Observer message: кандидаты по кнопке и состоянию FSM из словарей плюс хендлеры без индекса."""
+
+    def __init__(self, router: Router, event_name: str = "message"):
+        super().__init__(router=router, event_name=event_name)
+        self._by_button: Dict[str, List[Indexed]] = {}
+        self._by_state: Dict[str, List[Indexed]] = {}
+        self._filtered: List[Indexed] = []
+
+    def register(
+        self,
+        callback: CallbackType,
+        *filters: CallbackType,
+        flags: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> CallbackType:
+        rest = list(filters)
+        index: Optional[Dict[str, List[Indexed]]] = None
+        key = None
+        for item in filters:
+            if isinstance(item, MenuButton):
+                index, key = self._by_button, item.label
+            elif isinstance(item, State) and item.state not in (None, "*"):
+                index, key = self._by_state, item.state
+            else:
+                continue
+            rest.remove(item)
+            break
+        super().register(callback, *rest, flags=flags, **kwargs)
+        entry = (len(self.handlers) - 1, self.handlers[-1])
+        if index is None:
+            self._filtered.append(entry)
+        else:
+            index.setdefault(key, []).append(entry)
+        return callback
+
+    async def trigger(self, event: TelegramObject, **kwargs: Any) -> Any:
+        groups = [self._filtered]
+        button = kwargs.get("menu_button")
+        if button is not None and button in self._by_button:
+            groups.append(self._by_button[button])
+        raw_state = kwargs.get("raw_state")
+        if raw_state is not None and raw_state in self._by_state:
+            groups.append(self._by_state[raw_state])
+        candidates = groups[0] if len(groups) == 1 else heapq.merge(*groups, key=itemgetter(0))
+        return await self._trigger_among([handler for _, handler in candidates], event, kwargs)
+
+
+class IndexedRouter(Router):
+    """Router, у которого callback_query и message диспетчеризуются через индексы."""
+
+    def __init__(self, *, name: Optional[str] = None):
+        super().__init__(name=name)
+        self.callback_query = CallbackQueryObserver(router=self)
+        self.message = MessageObserver(router=self)
+        self.observers["callback_query"] = self.callback_query
+        self.observers["message"] = self.message
@@ -1,14 +1,62 @@
 from dataclasses import dataclass, field, asdict
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-from aiogram import F, Router
 from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
-from src.database.redis_client import redis_client
+from src.config import settings
+from src.keyboards.callbacks import (
+    BackToList,
+    CategoryFilterNone,
+    CategoryFilterOpen,
+    CategoryFilterPage,
+    CategoryFilterSet,
+    CreateCategoryNone,
+    CreateCategoryPage,
+    CreateCategorySet,
+    CreateDue,
+    CreatePriority,
+    FiltersBack,
+    FiltersOpen,
+    FiltersReset,
+    GroupInfo,
+    GroupMore,
+    Home,
+    ListPage,
+    ListRefresh,
+    PriorityApply,
+    PriorityClear,
+    PriorityFilterOpen,
+    PriorityToggle,
+    QuickFilter,
+    SearchStart,
+    SortDirection,
+    SortOpen,
+    SortSet,
+    StatusApply,
+    StatusClear,
+    StatusFilterOpen,
+    StatusToggle,
+    TaskArchive,
+    TaskDelete,
+    TaskDone,
+    TaskEditCategoryMenu,
+    TaskEditCategoryPage,
+    TaskEditCategorySet,
+    TaskEditField,
+    TaskEditMenu,
+    TaskEditPriorityMenu,
+    TaskEditPrioritySet,
+    TaskNew,
+    TaskOpen,
+    TaskReopen,
+    TaskRestore,
+    TaskUpdate,
+    ViewToggle,
+)
 from src.keyboards.common import cancel_keyboard
 from src.keyboards.list_filters import (
     categories_selector,
@@ -34,6 +82,7 @@ from src.keyboards.task_editor import (
     task_edit_menu as task_edit_menu_markup,
     task_edit_priority as task_edit_priority_keyboard,
 )
+from src.middlewares import AuthRequiredMiddleware, MenuButton, callback_ack
 from src.presentation.task_card import build_task_keyboard, build_task_text
 from src.presentation.task_list import (
     GROUPS,
@@ -43,12 +92,18 @@ from src.presentation.task_list import (
     build_list_keyboard,
     group_tasks,
 )
+from src.routes.indexed_router import IndexedRouter
 from src.routes.states import TaskStates
 from src.services.categories_api import CategoriesAPI
+from src.services.message_render import renderer
+from src.services.render_coalescer import render_coalescer
 from src.services.tasks_api import TasksAPI
 from src.utils.dates import parse_due
 
-router = Router()
+router = IndexedRouter()
+router.message.middleware(AuthRequiredMiddleware())
+router.callback_query.middleware(AuthRequiredMiddleware())
+router.callback_query.middleware(callback_ack)
 
 DEFAULT_LIMIT = 10
 GROUP_LIMIT = 8
@@ -128,13 +183,6 @@ class EditStates(StatesGroup):
     waiting_value = State()
 
 
-async def _ensure_authenticated(message: Message) -> bool:
-    if not await redis_client.is_authenticated(message.from_user.id):
-        await message.answer("⚠️ Вы не авторизованы. Используйте /login")
-        return False
-    return True
-
-
 async def _load_profile(state: FSMContext) -> ListProfile:
     data = await state.get_data()
     raw = data.get("list_prof")
@@ -153,29 +201,23 @@ async def _store_profile(state: FSMContext, profile: ListProfile) -> None:
     await state.update_data(list_prof=asdict(profile))
 
 
-async def _respond(target: Message | CallbackQuery, text: str, kb: InlineKeyboardMarkup | None) -> None:
-    if isinstance(target, Message):
-        await target.answer(text, reply_markup=kb)
-        return
+def _schedule_render(
+    callback: CallbackQuery, state: FSMContext, render: Callable[[ListProfile], Awaitable[Any]]
+) -> None:
+    """Отложенная перерисовка: профиль читается из FSM в момент срабатывания, а не при нажатии."""
 
-    msg = target.message
-    try:
-        if (msg.text or "") == text:
-            await msg.edit_reply_markup(reply_markup=kb)
-        else:
-            await msg.edit_text(text, reply_markup=kb)
-    except TelegramBadRequest as exc:
-        if "message is not modified" not in str(exc).lower():
-            raise
+    async def fire() -> None:
+        await render(await _load_profile(state))
+
+    render_coalescer.schedule(callback.message, callback.from_user.id, fire)
 
 
-async def _render_list(target: Message | CallbackQuery, profile: ListProfile) -> None:
-    resp = await TasksAPI.list(target.from_user.id, profile.to_params())
-    if resp.status_code != 200:
-        await _respond(target, "❌ Не удалось загрузить задачи.", kb=None)
+async def _render_list(target: Message | CallbackQuery, profile: ListProfile, force: bool = False) -> None:
+    data, age = await TasksAPI.list_cached(target.from_user.id, profile.to_params(), force=force)
+    if data is None:
+        await renderer.respond(target, "❌ Не удалось загрузить задачи.", kb=None)
         return
 
-    data = resp.json() or {}
     tasks = data.get("tasks")
     if tasks is None and isinstance(data, list):
         tasks = data
@@ -189,7 +231,7 @@ async def _render_list(target: Message | CallbackQuery, profile: ListProfile) ->
 
     groups = group_tasks(tasks)
     profile_dict = asdict(profile)
-    header = build_header(profile_dict, total, page, pages)
+    header = build_header(profile_dict, total, page, pages, age=age if age >= settings.task_list_stale_hint else None)
     summary = build_group_summary(groups)
     if summary:
         hint = "Выберите задачу или воспользуйтесь кнопками ниже."
@@ -206,19 +248,19 @@ async def _render_list(target: Message | CallbackQuery, profile: ListProfile) ->
             "Пока задач нет. Нажмите «➕ Задача», чтобы добавить первую."
         )
     kb = build_list_keyboard(groups, profile_dict, has_prev, has_next)
-    await _respond(target, text, kb)
+    await renderer.respond(target, text, kb)
 
 
 async def _render_task_card(callback: CallbackQuery, task_id: int, task: Optional[Dict[str, Any]] = None) -> None:
     if task is None:
         resp = await TasksAPI.get(callback.from_user.id, task_id)
         if resp.status_code != 200:
-            await callback.message.edit_text("Задача не найдена", reply_markup=back_to_list_keyboard())
+            await renderer.respond(callback, "Задача не найдена", back_to_list_keyboard())
             await callback.answer()
             return
         task = resp.json()
 
-    await callback.message.edit_text(build_task_text(task), reply_markup=build_task_keyboard(task))
+    await renderer.respond(callback, build_task_text(task), build_task_keyboard(task))
     await callback.answer()
 
 
@@ -358,63 +400,59 @@ async def _finalize_task_creation(source: Message | CallbackQuery, state: FSMCon
 
 
 @router.message(Command("tasks"))
-async def tasks_entry(message: Message, state: FSMContext) -> None:
-    if not await _ensure_authenticated(message):
-        return
+async def tasks_entry(message: Message, state: FSMContext, force: bool = False) -> None:
     profile = await _load_profile(state)
     profile.reset_paging()
     await _store_profile(state, profile)
-    await _render_list(message, profile)
+    await _render_list(message, profile, force=force)
 
 
-@router.message(F.text == TASKS_BUTTON)
+@router.message(MenuButton(TASKS_BUTTON))
 async def tasks_from_menu(message: Message, state: FSMContext) -> None:
     await tasks_entry(message, state)
 
 
-@router.message(F.text == REFRESH_BUTTON)
+@router.message(MenuButton(REFRESH_BUTTON))
 async def tasks_refresh_button(message: Message, state: FSMContext) -> None:
-    await tasks_entry(message, state)
+    await tasks_entry(message, state, force=True)
 
 
-@router.message(F.text == NEW_TASK_BUTTON)
+@router.message(MenuButton(NEW_TASK_BUTTON))
 async def task_new_from_menu(message: Message, state: FSMContext) -> None:
-    if not await _ensure_authenticated(message):
-        return
     await _start_task_creation(message, state)
 
 
-@router.callback_query(F.data == "tl:refresh")
+@router.callback_query(ListRefresh, flags={"ack": True})
 async def tl_refresh(callback: CallbackQuery, state: FSMContext) -> None:
-    await _render_list(callback, await _load_profile(state))
+    await _render_list(callback, await _load_profile(state), force=True)
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:page:"))
-async def tl_page(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(ListPage)
+async def tl_page(callback: CallbackQuery, callback_data: ListPage, state: FSMContext) -> None:
     profile = await _load_profile(state)
-    if callback.data.endswith(":prev"):
+    if callback_data.direction == "prev":
         profile.skip = max(0, profile.skip - profile.limit)
     else:
         profile.skip += profile.limit
     await _store_profile(state, profile)
-    await _render_list(callback, profile)
     await callback.answer()
+    _schedule_render(callback, state, lambda profile: _render_list(callback, profile))
 
 
-@router.callback_query(F.data.startswith("tl:grp:"))
-async def tl_group_more(callback: CallbackQuery, state: FSMContext) -> None:
-    _, _, group, _ = callback.data.split(":")
+@router.callback_query(GroupMore)
+async def tl_group_more(callback: CallbackQuery, callback_data: GroupMore, state: FSMContext) -> None:
+    group = callback_data.group
     profile = await _load_profile(state)
     profile.grp_offsets[group] = profile.grp_offsets.get(group, 0) + profile.grp_limit
     await _store_profile(state, profile)
-    await _render_list(callback, profile)
     await callback.answer("Ещё…")
+    _schedule_render(callback, state, lambda profile: _render_list(callback, profile))
 
 
-@router.callback_query(F.data.startswith("tl:grp:info:"))
-async def tl_group_quick_filter(callback: CallbackQuery, state: FSMContext) -> None:
-    key = callback.data.split(":")[-1]
+@router.callback_query(GroupInfo)
+async def tl_group_quick_filter(callback: CallbackQuery, callback_data: GroupInfo, state: FSMContext) -> None:
+    key = callback_data.group
     profile = await _load_profile(state)
     changed = False
 
@@ -481,19 +519,18 @@ async def tl_group_quick_filter(callback: CallbackQuery, state: FSMContext) -> N
         await callback.answer("Здесь пока нечего переключать")
 
 
-@router.callback_query(F.data == "tl:back_to_list")
+@router.callback_query(BackToList, flags={"ack": True})
 async def tl_back(callback: CallbackQuery, state: FSMContext) -> None:
     await _render_list(callback, await _load_profile(state))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:open:"))
-async def tl_open(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[-1])
-    await _render_task_card(callback, task_id)
+@router.callback_query(TaskOpen, flags={"ack": True})
+async def tl_open(callback: CallbackQuery, callback_data: TaskOpen) -> None:
+    await _render_task_card(callback, callback_data.task_id)
 
 
-@router.callback_query(F.data == "tl:view:toggle")
+@router.callback_query(ViewToggle)
 async def tl_view_toggle(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     if profile.view == "archived":
@@ -510,19 +547,19 @@ async def tl_view_toggle(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Режим: Архив" if profile.view == "archived" else "Режим: Активные")
 
 
-@router.callback_query(F.data == "tl:filters")
+@router.callback_query(FiltersOpen)
 async def tl_filters_open(callback: CallbackQuery) -> None:
-    await callback.message.edit_text("Фильтры:", reply_markup=filters_menu())
+    await renderer.respond(callback, "Фильтры:", filters_menu())
     await callback.answer()
 
 
-@router.callback_query(F.data == "tl:back")
+@router.callback_query(FiltersBack, flags={"ack": True})
 async def tl_filters_back(callback: CallbackQuery, state: FSMContext) -> None:
     await _render_list(callback, await _load_profile(state))
     await callback.answer()
 
 
-@router.callback_query(F.data == "tl:reset")
+@router.callback_query(FiltersReset, flags={"ack": "Фильтры сброшены"})
 async def tl_filters_reset(callback: CallbackQuery, state: FSMContext) -> None:
     profile = ListProfile()
     await _store_profile(state, profile)
@@ -530,32 +567,29 @@ async def tl_filters_reset(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Фильтры сброшены")
 
 
-@router.callback_query(F.data == "tl:home")
+@router.callback_query(Home)
 async def tl_home(callback: CallbackQuery) -> None:
     await callback.message.answer("🏠 Главное меню доступно снизу.", reply_markup=main_menu_keyboard())
     await callback.answer()
 
 
-@router.callback_query(F.data == "task:new")
+@router.callback_query(TaskNew)
 async def task_new_inline(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await redis_client.is_authenticated(callback.from_user.id):
-        await callback.answer("⚠️ Сначала войдите через /login", show_alert=True)
-        return
     await _start_task_creation(callback, state)
     await callback.answer()
 
 
-@router.callback_query(F.data.in_({"tl:f:urgent", "tl:f:overdue", "tl:f:today"}))
-async def tl_flag_filters(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(QuickFilter, flags={"ack": "Применено"})
+async def tl_flag_filters(callback: CallbackQuery, callback_data: QuickFilter, state: FSMContext) -> None:
     from datetime import datetime, date
 
     profile = await _load_profile(state)
-    if callback.data.endswith("urgent"):
+    if callback_data.flag == "urgent":
         if set(profile.priority) == {"high", "urgent"}:
             profile.priority = []
         else:
             profile.priority = ["high", "urgent"]
-    elif callback.data.endswith("overdue"):
+    elif callback_data.flag == "overdue":
         profile.is_overdue = None if profile.is_overdue else True
     else:
         if profile.due_date_from and profile.due_date_to:
@@ -572,16 +606,16 @@ async def tl_flag_filters(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Применено")
 
 
-@router.callback_query(F.data == "tl:f:prio")
+@router.callback_query(PriorityFilterOpen)
 async def tl_prio_open(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
-    await callback.message.edit_text("Приоритет:", reply_markup=priorities_selector(profile.priority))
+    await renderer.respond(callback, "Приоритет:", priorities_selector(profile.priority))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:f:prio:toggle:"))
-async def tl_prio_toggle(callback: CallbackQuery, state: FSMContext) -> None:
-    key = callback.data.split(":")[-1]
+@router.callback_query(PriorityToggle)
+async def tl_prio_toggle(callback: CallbackQuery, callback_data: PriorityToggle, state: FSMContext) -> None:
+    key = callback_data.priority
     profile = await _load_profile(state)
     current = set(profile.priority)
     if key in current:
@@ -590,20 +624,22 @@ async def tl_prio_toggle(callback: CallbackQuery, state: FSMContext) -> None:
         current.add(key)
     profile.priority = sorted(current)
     await _store_profile(state, profile)
-    await callback.message.edit_text("Приоритет:", reply_markup=priorities_selector(profile.priority))
     await callback.answer()
+    _schedule_render(
+        callback, state, lambda profile: renderer.respond(callback, "Приоритет:", priorities_selector(profile.priority))
+    )
 
 
-@router.callback_query(F.data == "tl:f:prio:clear")
+@router.callback_query(PriorityClear)
 async def tl_prio_clear(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     profile.priority = []
     await _store_profile(state, profile)
-    await callback.message.edit_text("Приоритет:", reply_markup=priorities_selector(profile.priority))
+    await renderer.respond(callback, "Приоритет:", priorities_selector(profile.priority))
     await callback.answer("Очищено")
 
 
-@router.callback_query(F.data == "tl:f:prio:apply")
+@router.callback_query(PriorityApply, flags={"ack": "Применено"})
 async def tl_prio_apply(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     profile.reset_paging()
@@ -612,16 +648,16 @@ async def tl_prio_apply(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Применено")
 
 
-@router.callback_query(F.data == "tl:f:status")
+@router.callback_query(StatusFilterOpen)
 async def tl_status_open(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
-    await callback.message.edit_text("Статусы:", reply_markup=statuses_selector(profile.status))
+    await renderer.respond(callback, "Статусы:", statuses_selector(profile.status))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:f:st:toggle:"))
-async def tl_status_toggle(callback: CallbackQuery, state: FSMContext) -> None:
-    key = callback.data.split(":")[-1]
+@router.callback_query(StatusToggle)
+async def tl_status_toggle(callback: CallbackQuery, callback_data: StatusToggle, state: FSMContext) -> None:
+    key = callback_data.status
     profile = await _load_profile(state)
     current = set(profile.status)
     if key in current:
@@ -630,20 +666,22 @@ async def tl_status_toggle(callback: CallbackQuery, state: FSMContext) -> None:
         current.add(key)
     profile.status = sorted(current)
     await _store_profile(state, profile)
-    await callback.message.edit_text("Статусы:", reply_markup=statuses_selector(profile.status))
     await callback.answer()
+    _schedule_render(
+        callback, state, lambda profile: renderer.respond(callback, "Статусы:", statuses_selector(profile.status))
+    )
 
 
-@router.callback_query(F.data == "tl:f:st:clear")
+@router.callback_query(StatusClear)
 async def tl_status_clear(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     profile.status = []
     await _store_profile(state, profile)
-    await callback.message.edit_text("Статусы:", reply_markup=statuses_selector(profile.status))
+    await renderer.respond(callback, "Статусы:", statuses_selector(profile.status))
     await callback.answer("Очищено")
 
 
-@router.callback_query(F.data == "tl:f:st:apply")
+@router.callback_query(StatusApply, flags={"ack": "Применено"})
 async def tl_status_apply(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     profile.reset_paging()
@@ -652,57 +690,57 @@ async def tl_status_apply(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Применено")
 
 
-@router.callback_query(F.data == "tl:f:cat")
+@router.callback_query(CategoryFilterOpen, flags={"ack": True})
 async def tl_cat_open(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     cats = await CategoriesAPI.list(callback.from_user.id)
-    await callback.message.edit_text("Категория:", reply_markup=categories_selector(cats, page=profile.cat_page))
+    await renderer.respond(callback, "Категория:", categories_selector(cats, page=profile.cat_page))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:f:cat:page:"))
-async def tl_cat_page(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(CategoryFilterPage, flags={"ack": True})
+async def tl_cat_page(callback: CallbackQuery, callback_data: CategoryFilterPage, state: FSMContext) -> None:
     profile = await _load_profile(state)
-    page = int(callback.data.split(":")[-1])
+    page = callback_data.page
     profile.cat_page = page
     await _store_profile(state, profile)
     cats = await CategoriesAPI.list(callback.from_user.id)
-    await callback.message.edit_reply_markup(reply_markup=categories_selector(cats, page=page))
+    await renderer.edit_markup(callback.message, categories_selector(cats, page=page))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:f:cat:set:") | (F.data == "tl:f:cat:none"))
-async def tl_cat_apply(callback: CallbackQuery, state: FSMContext) -> None:
+@router.callback_query(CategoryFilterSet, CategoryFilterNone, flags={"ack": "Применено"})
+async def tl_cat_apply(
+    callback: CallbackQuery, callback_data: CategoryFilterSet | CategoryFilterNone, state: FSMContext
+) -> None:
     profile = await _load_profile(state)
-    if callback.data.endswith(":none") or callback.data.endswith("tl:f:cat:none"):
-        profile.category_id = None
-    else:
-        profile.category_id = int(callback.data.split(":")[-1])
+    profile.category_id = getattr(callback_data, "category_id", None)
     profile.reset_paging()
     await _store_profile(state, profile)
     await _render_list(callback, profile)
     await callback.answer("Применено")
 
 
-@router.callback_query(F.data == "tl:sort")
+@router.callback_query(SortOpen)
 async def tl_sort_open(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     arrow = "↑" if profile.sort_order == "asc" else "↓"
-    await callback.message.edit_text(
+    await renderer.respond(
+        callback,
         "Сортировка:\n"
         "1) Дедлайн\n"
         "2) Приоритет\n"
         "3) Обновлено\n"
         "4) Название\n\n"
         f"Текущая: {profile.sort_by} {arrow}",
-        reply_markup=sort_keyboard(),
+        sort_keyboard(),
     )
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("tl:sort:set:"))
-async def tl_sort_set(callback: CallbackQuery, state: FSMContext) -> None:
-    key = callback.data.split(":")[-1]
+@router.callback_query(SortSet, flags={"ack": "Сортировка применена"})
+async def tl_sort_set(callback: CallbackQuery, callback_data: SortSet, state: FSMContext) -> None:
+    key = callback_data.field
     profile = await _load_profile(state)
     profile.sort_by, profile.sort_order = key, "asc"
     profile.reset_paging()
@@ -711,7 +749,7 @@ async def tl_sort_set(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Сортировка применена")
 
 
-@router.callback_query(F.data == "tl:sort:dir")
+@router.callback_query(SortDirection, flags={"ack": "Направление изменено"})
 async def tl_sort_dir(callback: CallbackQuery, state: FSMContext) -> None:
     profile = await _load_profile(state)
     profile.sort_order = "desc" if profile.sort_order == "asc" else "asc"
@@ -721,10 +759,10 @@ async def tl_sort_dir(callback: CallbackQuery, state: FSMContext) -> None:
     await callback.answer("Направление изменено")
 
 
-@router.callback_query(F.data == "tl:search")
+@router.callback_query(SearchStart)
 async def tl_search_start(callback: CallbackQuery, state: FSMContext) -> None:
     await state.set_state(ListStates.search)
-    await callback.message.edit_text("Введите строку поиска (или «-» чтобы очистить):")
+    await renderer.edit(callback.message, "Введите строку поиска (или «-» чтобы очистить):", None)
     await callback.answer()
 
 
@@ -739,21 +777,21 @@ async def tl_search_apply(message: Message, state: FSMContext) -> None:
     await _render_list(message, profile)
 
 
-@router.callback_query(F.data.startswith("task_done:"))
-async def task_done(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[1])
+@router.callback_query(TaskDone, flags={"ack": True})
+async def task_done(callback: CallbackQuery, callback_data: TaskDone) -> None:
+    task_id = callback_data.task_id
     await _apply_patch(callback, task_id, {"status": "done"}, "Не удалось завершить")
 
 
-@router.callback_query(F.data.startswith("task_reopen:"))
-async def task_reopen(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[1])
+@router.callback_query(TaskReopen, flags={"ack": True})
+async def task_reopen(callback: CallbackQuery, callback_data: TaskReopen) -> None:
+    task_id = callback_data.task_id
     await _apply_patch(callback, task_id, {"status": "in_progress"}, "Не удалось вернуть в работу")
 
 
-@router.callback_query(F.data.startswith("task_archive:"))
-async def task_archive(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[1])
+@router.callback_query(TaskArchive, flags={"ack": True})
+async def task_archive(callback: CallbackQuery, callback_data: TaskArchive) -> None:
+    task_id = callback_data.task_id
     resp = await TasksAPI.archive(callback.from_user.id, task_id)
     if resp.status_code in (200, 204):
         task = None
@@ -767,9 +805,9 @@ async def task_archive(callback: CallbackQuery) -> None:
         await callback.answer("Не удалось архивировать", show_alert=True)
 
 
-@router.callback_query(F.data.startswith("task_restore:"))
-async def task_restore(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[1])
+@router.callback_query(TaskRestore, flags={"ack": True})
+async def task_restore(callback: CallbackQuery, callback_data: TaskRestore) -> None:
+    task_id = callback_data.task_id
     resp = await TasksAPI.restore(callback.from_user.id, task_id)
     if resp.status_code in (200, 204):
         task = None
@@ -783,84 +821,67 @@ async def task_restore(callback: CallbackQuery) -> None:
         await callback.answer("Не удалось восстановить", show_alert=True)
 
 
-@router.callback_query(F.data.startswith("task_delete:"))
-async def task_delete(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[1])
+@router.callback_query(TaskDelete, flags={"ack": True})
+async def task_delete(callback: CallbackQuery, callback_data: TaskDelete) -> None:
+    task_id = callback_data.task_id
     resp = await TasksAPI.delete(callback.from_user.id, task_id)
     if resp.status_code in (200, 204):
-        await callback.message.edit_text("🗑 Задача удалена", reply_markup=back_to_list_keyboard())
+        await renderer.respond(callback, "🗑 Задача удалена", back_to_list_keyboard())
         await callback.answer()
     else:
         await callback.answer("Не удалось удалить", show_alert=True)
 
 
-@router.callback_query(F.data.startswith("task_update:") | F.data.startswith("task:edit:menu:"))
-async def task_edit_menu(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[-1])
-    await callback.message.edit_text("Что изменить?", reply_markup=task_edit_menu_markup(task_id))
+@router.callback_query(TaskUpdate, TaskEditMenu)
+async def task_edit_menu(callback: CallbackQuery, callback_data: TaskUpdate | TaskEditMenu) -> None:
+    await renderer.respond(callback, "Что изменить?", task_edit_menu_markup(callback_data.task_id))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("task:edit:prio:set:"))
-async def task_edit_prio_set(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    priority = parts[4]
-    task_id = int(parts[5])
+@router.callback_query(TaskEditPrioritySet, flags={"ack": True})
+async def task_edit_prio_set(callback: CallbackQuery, callback_data: TaskEditPrioritySet) -> None:
+    priority = callback_data.priority
     if priority not in {"low", "medium", "high", "urgent"}:
         await callback.answer("Некорректный приоритет", show_alert=True)
         return
-    await _apply_patch(callback, task_id, {"priority": priority}, "Не удалось обновить приоритет")
+    await _apply_patch(callback, callback_data.task_id, {"priority": priority}, "Не удалось обновить приоритет")
 
 
-@router.callback_query(F.data.startswith("task:edit:prio:"))
-async def task_edit_prio_menu(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[-1])
-    await callback.message.edit_text("Выберите приоритет:", reply_markup=task_edit_priority_keyboard(task_id))
+@router.callback_query(TaskEditPriorityMenu)
+async def task_edit_prio_menu(callback: CallbackQuery, callback_data: TaskEditPriorityMenu) -> None:
+    await renderer.respond(callback, "Выберите приоритет:", task_edit_priority_keyboard(callback_data.task_id))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("task:edit:cat:set:"))
-async def task_edit_cat_set(callback: CallbackQuery) -> None:
-    parts = callback.data.split(":")
-    _, _, _, _, task_id_raw, value = parts
-    task_id = int(task_id_raw)
-    payload = {"category_id": None if value == "none" else int(value)}
-    await _apply_patch(callback, task_id, payload, "Не удалось обновить категорию")
+@router.callback_query(TaskEditCategorySet, flags={"ack": True})
+async def task_edit_cat_set(callback: CallbackQuery, callback_data: TaskEditCategorySet) -> None:
+    payload = {"category_id": callback_data.category_id}
+    await _apply_patch(callback, callback_data.task_id, payload, "Не удалось обновить категорию")
 
 
-@router.callback_query(F.data.startswith("task:edit:cat"))
-async def task_edit_cat_menu(callback: CallbackQuery) -> None:
-    task_id = int(callback.data.split(":")[-1])
+@router.callback_query(TaskEditCategoryMenu, flags={"ack": True})
+async def task_edit_cat_menu(callback: CallbackQuery, callback_data: TaskEditCategoryMenu) -> None:
+    task_id = callback_data.task_id
     cats = await CategoriesAPI.list(callback.from_user.id)
     if not cats:
-        await callback.message.edit_text(
-            "Категорий пока нет.",
-            reply_markup=task_edit_categories_keyboard(task_id, [], page=0),
-        )
+        await renderer.respond(callback, "Категорий пока нет.", task_edit_categories_keyboard(task_id, [], page=0))
     else:
-        await callback.message.edit_text(
-            "Выберите категорию:",
-            reply_markup=task_edit_categories_keyboard(task_id, cats, page=0),
-        )
+        await renderer.respond(callback, "Выберите категорию:", task_edit_categories_keyboard(task_id, cats, page=0))
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("task:edit:cat:page:"))
-async def task_edit_cat_page(callback: CallbackQuery) -> None:
-    _, _, _, _, task_id_raw, page_raw = callback.data.split(":")
-    task_id = int(task_id_raw)
-    page = int(page_raw)
+@router.callback_query(TaskEditCategoryPage, flags={"ack": True})
+async def task_edit_cat_page(callback: CallbackQuery, callback_data: TaskEditCategoryPage) -> None:
     cats = await CategoriesAPI.list(callback.from_user.id)
-    kb = task_edit_categories_keyboard(task_id, cats, page=page)
-    await callback.message.edit_reply_markup(reply_markup=kb)
+    kb = task_edit_categories_keyboard(callback_data.task_id, cats, page=callback_data.page)
+    await renderer.edit_markup(callback.message, kb)
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("task:edit:title:") | F.data.startswith("task:edit:desc:") | F.data.startswith("task:edit:due:"))
-async def task_edit_prompt(callback: CallbackQuery, state: FSMContext) -> None:
-    parts = callback.data.split(":")
-    field = parts[2]
-    task_id = int(parts[3])
+@router.callback_query(TaskEditField)
+async def task_edit_prompt(callback: CallbackQuery, callback_data: TaskEditField, state: FSMContext) -> None:
+    field = callback_data.field
+    task_id = callback_data.task_id
     await state.set_state(EditStates.waiting_value)
     await state.update_data(
         edit_task_id=task_id,
@@ -876,7 +897,7 @@ async def task_edit_prompt(callback: CallbackQuery, state: FSMContext) -> None:
         prompt = (
             "Введите новую дату (DD-MM-YYYY | 2025-10-15 | сегодня | завтра | +3 | «-» убрать):"
         )
-    await callback.message.edit_text(prompt)
+    await renderer.edit(callback.message, prompt, None)
     await callback.answer()
 
 
@@ -887,15 +908,6 @@ async def task_create_title(message: Message, state: FSMContext) -> None:
         await message.answer("Название не может быть пустым. Введите название задачи:", reply_markup=cancel_keyboard())
         return
 
-    if not await _ensure_authenticated(message):
-        await state.set_state(None)
-        return
-
-    if not await redis_client.is_authenticated(message.from_user.id):
-        await state.set_state(None)
-        await message.answer("⚠️ Сначала войдите через /login.", reply_markup=main_menu_keyboard())
-        return
-
     data = await state.get_data()
     new_task = data.get("new_task", {})
     new_task["title"] = title
@@ -910,10 +922,6 @@ async def task_create_title(message: Message, state: FSMContext) -> None:
 
 @router.message(TaskStates.create_description)
 async def task_create_description(message: Message, state: FSMContext) -> None:
-    if not await _ensure_authenticated(message):
-        await state.set_state(None)
-        return
-
     text = (message.text or "").strip()
     description = None if text in {"", "-"} else text
 
@@ -927,10 +935,6 @@ async def task_create_description(message: Message, state: FSMContext) -> None:
 
 @router.message(TaskStates.create_priority)
 async def task_create_priority(message: Message, state: FSMContext) -> None:
-    if not await _ensure_authenticated(message):
-        await state.set_state(None)
-        return
-
     raw = (message.text or "").strip().lower()
     priority: Optional[str]
     if raw in {"", "-"}:
@@ -952,28 +956,21 @@ async def task_create_priority(message: Message, state: FSMContext) -> None:
     await _prompt_category_step(message, state, message.from_user.id)
 
 
-@router.callback_query(F.data.startswith("task:create:prio:"))
-async def task_create_priority_callback(callback: CallbackQuery, state: FSMContext) -> None:
-    value = callback.data.split(":")[-1]
-    if not await redis_client.is_authenticated(callback.from_user.id):
-        await callback.answer("⚠️ Сначала войдите через /login", show_alert=True)
-        return
+@router.callback_query(CreatePriority)
+async def task_create_priority_callback(callback: CallbackQuery, callback_data: CreatePriority, state: FSMContext) -> None:
+    value = callback_data.value
 
     data = await state.get_data()
     new_task = data.get("new_task", {})
     new_task["priority"] = None if value == "skip" else value
     await state.update_data(new_task=new_task)
 
-    await callback.message.edit_reply_markup(reply_markup=None)
+    await renderer.edit_markup(callback.message, None)
     await _prompt_category_step(callback, state, callback.from_user.id)
 
 
 @router.message(TaskStates.create_category)
 async def task_create_category(message: Message, state: FSMContext) -> None:
-    if not await _ensure_authenticated(message):
-        await state.set_state(None)
-        return
-
     data = await state.get_data()
     categories: List[Dict] = data.get("create_categories") or []
     if not categories:
@@ -1006,9 +1003,9 @@ async def task_create_category(message: Message, state: FSMContext) -> None:
     await _prompt_due_step(message, state)
 
 
-@router.callback_query(F.data.startswith("task:create:cat:page:"))
-async def task_create_category_page(callback: CallbackQuery, state: FSMContext) -> None:
-    page = int(callback.data.split(":")[-1])
+@router.callback_query(CreateCategoryPage)
+async def task_create_category_page(callback: CallbackQuery, callback_data: CreateCategoryPage, state: FSMContext) -> None:
+    page = callback_data.page
     data = await state.get_data()
     categories: List[Dict] = data.get("create_categories") or []
     if not categories:
@@ -1016,53 +1013,37 @@ async def task_create_category_page(callback: CallbackQuery, state: FSMContext)
         await state.update_data(create_categories=categories)
 
     kb = creation_category_keyboard(categories, page=page)
-    await callback.message.edit_reply_markup(reply_markup=kb)
+    await renderer.edit_markup(callback.message, kb)
     await state.update_data(create_category_page=page)
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("task:create:cat:set:"))
-async def task_create_category_select(callback: CallbackQuery, state: FSMContext) -> None:
-    cat_id_raw = callback.data.split(":")[-1]
-    if not await redis_client.is_authenticated(callback.from_user.id):
-        await callback.answer("⚠️ Сначала войдите через /login", show_alert=True)
-        return
-
-    try:
-        cat_id = int(cat_id_raw)
-    except ValueError:
-        cat_id = cat_id_raw
+@router.callback_query(CreateCategorySet)
+async def task_create_category_select(callback: CallbackQuery, callback_data: CreateCategorySet, state: FSMContext) -> None:
+    cat_id = callback_data.category_id
 
     data = await state.get_data()
     new_task = data.get("new_task", {})
     new_task["category_id"] = cat_id
     await state.update_data(new_task=new_task, create_categories=None)
 
-    await callback.message.edit_reply_markup(reply_markup=None)
+    await renderer.edit_markup(callback.message, None)
     await _prompt_due_step(callback, state)
 
 
-@router.callback_query(F.data == "task:create:cat:none")
+@router.callback_query(CreateCategoryNone)
 async def task_create_category_skip(callback: CallbackQuery, state: FSMContext) -> None:
-    if not await redis_client.is_authenticated(callback.from_user.id):
-        await callback.answer("⚠️ Сначала войдите через /login", show_alert=True)
-        return
-
     data = await state.get_data()
     new_task = data.get("new_task", {})
     new_task["category_id"] = None
     await state.update_data(new_task=new_task, create_categories=None)
 
-    await callback.message.edit_reply_markup(reply_markup=None)
+    await renderer.edit_markup(callback.message, None)
     await _prompt_due_step(callback, state)
 
 
 @router.message(TaskStates.create_due_date)
 async def task_create_due_date(message: Message, state: FSMContext) -> None:
-    if not await _ensure_authenticated(message):
-        await state.set_state(None)
-        return
-
     text = (message.text or "").strip()
     due: Optional[str]
     if text in {"", "-"}:
@@ -1084,19 +1065,16 @@ async def task_create_due_date(message: Message, state: FSMContext) -> None:
     await _finalize_task_creation(message, state, message.from_user.id)
 
 
-@router.callback_query(F.data.startswith("task:create:due:"))
-async def task_create_due_callback(callback: CallbackQuery, state: FSMContext) -> None:
-    action = callback.data.split(":")[-1]
-    if not await redis_client.is_authenticated(callback.from_user.id):
-        await callback.answer("⚠️ Сначала войдите через /login", show_alert=True)
-        return
+@router.callback_query(CreateDue)
+async def task_create_due_callback(callback: CallbackQuery, callback_data: CreateDue, state: FSMContext) -> None:
+    action = callback_data.value
 
     data = await state.get_data()
     new_task = data.get("new_task", {})
 
     if action == "manual":
         await state.set_state(TaskStates.create_due_date)
-        await callback.message.edit_reply_markup(reply_markup=None)
+        await renderer.edit_markup(callback.message, None)
         await callback.message.answer(
             "Введите дату вручную (YYYY-MM-DD, DD.MM.YYYY, сегодня/завтра/+3) или «-», чтобы пропустить:",
             reply_markup=cancel_keyboard(),
@@ -1124,7 +1102,7 @@ async def task_create_due_callback(callback: CallbackQuery, state: FSMContext) -
         new_task["due_date"] = due_iso
 
     await state.update_data(new_task=new_task)
-    await callback.message.edit_reply_markup(reply_markup=None)
+    await renderer.edit_markup(callback.message, None)
     await _finalize_task_creation(callback, state, callback.from_user.id)
 
 @router.message(EditStates.waiting_value)
@@ -1179,6 +1157,7 @@ async def task_edit_apply(message: Message, state: FSMContext) -> None:
     edit_message_id = data.get("edit_message_id")
     if task and edit_chat_id and edit_message_id:
         try:
+            renderer.forget(edit_chat_id, edit_message_id)
             await message.bot.edit_message_text(
                 chat_id=edit_chat_id,
                 message_id=edit_message_id,
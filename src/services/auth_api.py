@@ -0,0 +1,87 @@
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.services.http_client import client
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AuthResult:
+    status: int
+    access: Optional[str] = None
+    refresh: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.access and self.refresh)
+
+
+def _tokens(status: int, resp: httpx.Response) -> AuthResult:
+    try:
+        body = resp.json() or {}
+    except ValueError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    return AuthResult(status, body.get("access_token"), body.get("refresh_token"))
+
+
+class AuthAPI:
+    """
+    Вход, регистрация и выход через общий пул BotHttpClient (base_url из настроек).
+    Латентность каждого шага пишется в гистограммы auth.login / auth.register / auth.logout.
+    """
+
+    @staticmethod
+    async def login(email: str, password: str) -> AuthResult:
+        with metrics.timer("auth.login"):
+            resp = await client.public_request("POST", "/auth/login", json={"email": email, "password": password})
+        if resp.status_code != 200:
+            return AuthResult(resp.status_code)
+        return _tokens(resp.status_code, resp)
+
+    @staticmethod
+    async def register_and_login(email: str, password: str, first_name: str, last_name: str) -> AuthResult:
+        """
+        Регистрация и сразу вход по тёплому соединению из пула.
+        Если API вернул токены уже в ответе на регистрацию, второй запрос не делается.
+        status в результате — код регистрации; ok=False при 201 значит «зарегистрирован, но не вошёл».
+        """
+        payload: Dict[str, Any] = {
+            "email": email,
+            "first_name": first_name,
+            "last_name": last_name,
+            "password": password,
+        }
+        with metrics.timer("auth.register_flow"):
+            with metrics.timer("auth.register"):
+                resp = await client.public_request("POST", "/auth/register", json=payload)
+            if resp.status_code != 201:
+                return AuthResult(resp.status_code)
+            result = _tokens(resp.status_code, resp)
+            if result.ok:
+                metrics.inc("auth.register.tokens_inline")
+                return result
+            login = await AuthAPI.login(email, password)
+            return AuthResult(resp.status_code, login.access, login.refresh)
+
+    @staticmethod
+    async def logout(access: Optional[str], refresh: Optional[str]) -> bool:
+        """Best-effort отзыв токенов на стороне API: локальный выход не зависит от его успеха."""
+        try:
+            with metrics.timer("auth.logout"):
+                resp = await client.public_request(
+                    "POST",
+                    "/auth/logout",
+                    json={"refresh_token": refresh} if refresh else None,
+                    headers={"Authorization": f"Bearer {access}"} if access else None,
+                )
+        except httpx.HTTPError as e:
+            logger.warning("Logout request failed: %s", e)
+            return False
+        return resp.status_code < 400
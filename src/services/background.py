@@ -0,0 +1,49 @@
+import asyncio
+import logging
+from typing import Any, Coroutine, Dict, Optional, Set
+
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """
+    Реестр фоновых задач бота: держит ссылки (asyncio хранит задачи только по
+    weakref), считает запущенные/упавшие/отменённые и при остановке даёт им
+    дозавершиться, а оставшиеся отменяет.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Set[asyncio.Task] = set()
+        metrics.register(f"background.{name}", self.stats)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": len(self._tasks)}
+
+    def spawn(self, coro: Coroutine[Any, Any, Any], name: Optional[str] = None) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        metrics.inc(f"background.{self.name}.started")
+        return task
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if task.cancelled():
+            metrics.inc(f"background.{self.name}.cancelled")
+        elif task.exception() is not None:
+            metrics.inc(f"background.{self.name}.failed")
+            logger.error("Background task %s failed: %r", task.get_name(), task.exception())
+
+    async def shutdown(self, timeout: float) -> None:
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            logger.warning("Cancelled %s background %s task(s) on shutdown", len(pending), self.name)
@@ -1,10 +1,27 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from src.database.redis_client import redis_client
 from src.services.http_client import client
+from src.services.task_list_cache import task_list_cache
+from src.utils.metrics import metrics
 
 
 class CategoriesAPI:
+    """
+    Категории пользователя с кэшем в Redis (список + индекс по id, TTL из настроек).
+    Мутации идут через этот класс и сбрасывают кэш после успешного ответа API.
+    """
+
     @staticmethod
-    async def list(user_id: int) -> List[Dict]:
+    async def list(user_id: int, use_cache: bool = True) -> List[Dict]:
+        if use_cache:
+            cached = await redis_client.get_user_categories(user_id)
+            if cached is not None:
+                metrics.inc("categories.cache.hit")
+                return cached
+            metrics.inc("categories.cache.miss")
+
+        # Поколение читается до запроса: мутация во время запроса отклонит запись в кэш.
+        generation = await redis_client.get_categories_generation(user_id)
         resp = await client.request(user_id, "GET", "/categories/")
         if resp.status_code != 200:
             return []
@@ -16,4 +33,42 @@ class CategoriesAPI:
             if name in {"uncategorized", "без категории"}:
                 continue
             cleaned.append(item)
+        if generation is not None:
+            await redis_client.set_user_categories(user_id, cleaned, generation)
         return cleaned
+
+    @staticmethod
+    async def get(user_id: int, category_id: int) -> Optional[Dict]:
+        cached, category = await redis_client.get_user_category(user_id, category_id)
+        if cached:
+            metrics.inc("categories.cache.hit")
+            return category
+        categories = await CategoriesAPI.list(user_id)
+        return next((c for c in categories if c.get("id") == category_id), None)
+
+    @staticmethod
+    async def create(user_id: int, name: str):
+        resp = await client.request(user_id, "POST", "/categories/", json={"name": name})
+        if resp.status_code in (200, 201):
+            await CategoriesAPI.invalidate(user_id)
+        return resp
+
+    @staticmethod
+    async def rename(user_id: int, category_id: int, name: str):
+        resp = await client.request(user_id, "PUT", f"/categories/{category_id}", json={"name": name})
+        if resp.status_code in (200, 201):
+            await CategoriesAPI.invalidate(user_id)
+        return resp
+
+    @staticmethod
+    async def delete(user_id: int, category_id: int):
+        resp = await client.request(user_id, "DELETE", f"/categories/{category_id}")
+        if resp.status_code in (200, 204):
+            await CategoriesAPI.invalidate(user_id)
+        return resp
+
+    @staticmethod
+    async def invalidate(user_id: int) -> None:
+        # Имена категорий попадают и в страницы списка задач.
+        await task_list_cache.invalidate(user_id)
+        await redis_client.delete_user_categories(user_id)
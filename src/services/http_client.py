@@ -1,96 +1,360 @@
+import asyncio
+import importlib.util
 import json
 import logging
+import time
 import uuid
-from enum import Enum
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 import httpx
 
 from src.config import settings
 from src.database.redis_client import redis_client
+from src.services.resilience import (
+    FAILURE_STATUSES,
+    RETRY_STATUSES,
+    ApiUnavailableError,
+    CircuitBreaker,
+    resilience,
+)
+from src.services.session import session_for
+from src.services.token_refresher import token_refresher
+from src.utils.json_codec import LazyBody, dumps, loads
+from src.utils.metrics import metrics
 
 API_URL = f"{settings.api_base_url}/api/v1"
 logger = logging.getLogger(__name__)
 
 MAX_LOG_BODY = 2000
+REMOTE_REFRESH_POLL = 0.1
+# Методы без побочных эффектов: одинаковые конкурентные запросы склеиваются.
+COALESCED_METHODS = frozenset({"GET", "HEAD"})
+# Заголовки, которые сохраняем вместе с телом для ответа из кэша валидаторов.
+VALIDATED_HEADERS = ("content-type", "etag", "last-modified")
+
+RequestKey = Tuple[int, str, str, str]
+# Ключ склейки: запрос и conditional — безусловный GET не должен получить ответ условного.
+CoalesceKey = Tuple[RequestKey, bool]
+
+
+class CachedResponse(httpx.Response):
+    """
+    Ответ с разделяемым телом: восстановленный из кэша валидаторов после
+    304 Not Modified или общий для склеенных одинаковых GET. Общие только
+    неизменяемые байты тела: json() каждый раз разбирает их заново, и каждый
+    получатель работает со своим объектом.
+    """
+
+    @classmethod
+    def share(cls, resp: httpx.Response) -> "CachedResponse":
+        if isinstance(resp, cls):
+            return resp
+        headers = {k: v for k, v in resp.headers.items() if k.lower() not in ("content-encoding", "content-length")}
+        return cls(resp.status_code, content=resp.content, headers=headers, request=resp.request)
+
+    def json(self, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().json(**kwargs)
+        return loads(self.content)
+
+
+class _Validated:
+    """Тело GET-ответа с его валидаторами (ETag / Last-Modified)."""
+
+    __slots__ = ("etag", "last_modified", "content", "headers")
+
+    def __init__(self, resp: httpx.Response):
+        self.etag = resp.headers.get("etag")
+        self.last_modified = resp.headers.get("last-modified")
+        self.content = resp.content
+        self.headers = {k: resp.headers[k] for k in VALIDATED_HEADERS if k in resp.headers}
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def as_response(self, not_modified: httpx.Response) -> CachedResponse:
+        headers = dict(self.headers)
+        headers.update({k: not_modified.headers[k] for k in ("etag", "last-modified") if k in not_modified.headers})
+        return CachedResponse(
+            200,
+            content=self.content,
+            headers=headers,
+            request=not_modified.request,
+        )
+
+
+class ValidatorCache:
+    """LRU-кэш валидаторов по (user_id, метод, путь, параметры)."""
+
+    def __init__(self, maxsize: int, max_body: int):
+        self.maxsize = maxsize
+        self.max_body = max_body
+        self._data: "OrderedDict[RequestKey, _Validated]" = OrderedDict()
+
+    def get(self, key: RequestKey) -> Optional[_Validated]:
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def store(self, key: RequestKey, resp: httpx.Response) -> None:
+        if self.maxsize <= 0:
+            return
+        if not (resp.headers.get("etag") or resp.headers.get("last-modified")) or len(resp.content) > self.max_body:
+            self._data.pop(key, None)
+            return
+        self._data[key] = _Validated(resp)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "bytes": sum(len(entry.content) for entry in self._data.values()),
+        }
 
 
 class BotHttpClient:
     """
     Обёртка над httpx с автообновлением access по refresh при 401 один раз.
     Добавлено подробное логгирование и нормализация JSON перед отправкой.
+
+    Держит один долгоживущий httpx.AsyncClient с пулом соединений на весь процесс:
+    start()/close() вызываются из on_startup/on_shutdown.
     """
 
-    def __init__(self, base_url: str = API_URL, timeout: float = 15.0):
+    def __init__(self, base_url: str = API_URL, timeout: float = settings.api_timeout):
         self.base_url = base_url
         self.timeout = httpx.Timeout(timeout)
+        self.limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        self.http2 = settings.http2_enabled
+        self._http: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._requests_total = 0
+        self._refreshes: Dict[int, "asyncio.Task[bool]"] = {}
+        self._coalesced: Dict[CoalesceKey, "asyncio.Task[httpx.Response]"] = {}
+        self._validators = ValidatorCache(settings.http_validator_cache_size, settings.http_validator_max_body)
+        metrics.register("http_pool", self.pool_stats)
+        metrics.register("http_validators", self._validators.stats)
+
+    # ----------------- lifecycle -----------------
+    async def start(self) -> None:
+        if self._http is not None:
+            return
+        self._open()
+        if settings.http_prewarm_connections > 0:
+            await self._prewarm(settings.http_prewarm_connections)
+
+    async def close(self) -> None:
+        if self._http is None:
+            return
+        http, self._http, self._transport = self._http, None, None
+        await http.aclose()
+        logger.info("HTTP client closed | stats=%s", self.pool_stats())
+
+    def _open(self) -> httpx.AsyncClient:
+        if self.http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+            self.http2 = False
+        self._transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            transport=self._transport,
+        )
+        logger.info(
+            "HTTP client started | base_url=%s | http2=%s | limits=%s",
+            self.base_url, self.http2, self.limits,
+        )
+        return self._http
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Общий клиент; создаётся лениво, если start() не вызывали (скрипты, REPL)."""
+        return self._http if self._http is not None else self._open()
 
-    def _to_jsonable(self, obj: Any) -> Any:
+    async def _prewarm(self, count: int) -> None:
+        """Открывает count соединений заранее, чтобы первые апдейты не платили за TCP/TLS."""
+        async def _touch() -> None:
+            try:
+                await self.http.request("HEAD", "/")
+            except httpx.HTTPError as e:
+                logger.warning("HTTP pre-warm failed: %s", e)
+
+        await asyncio.gather(*(_touch() for _ in range(count)))
+        logger.info("HTTP pool pre-warmed | stats=%s", self.pool_stats())
+
+    async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
         """
-        Делает объект сериализуемым для JSON:
-        - Enum -> value
-        - pydantic BaseModel -> model_dump()
-        - dataclass -> asdict
-        - set -> list
-        - dict/list/tuple -> рекурсивно
-        - всё остальное -> как есть
+        Запрос через breaker эндпоинта с адаптивным таймаутом.
+        GET повторяется с jitter при транспортных сбоях и 502/503/504;
+        разомкнутый breaker или исчерпанные попытки дают ApiUnavailableError.
         """
-        # Enum
-        if isinstance(obj, Enum):
-            return obj.value
+        breaker = resilience.breaker(method, path)
+        attempts = resilience.attempts(method)
+        attempt = 0
+        while True:
+            breaker.before_request()
+            last = attempt == attempts - 1
+            try:
+                resp = await self._send_once(method, path, breaker, **kwargs)
+            except httpx.TransportError as e:
+                if isinstance(e, httpx.TimeoutException):
+                    metrics.inc("api.timeout")
+                    breaker.record_timeout()
+                else:
+                    breaker.record_failure()
+                if last:
+                    raise ApiUnavailableError(breaker.endpoint) from e
+                logger.warning("API transport error, retrying | %s | attempt=%s | %s", breaker.endpoint, attempt + 1, e)
+            else:
+                if resp.status_code not in RETRY_STATUSES or last:
+                    return resp
+                logger.warning("API %s, retrying | %s | attempt=%s", resp.status_code, breaker.endpoint, attempt + 1)
+            metrics.inc("api.retry")
+            await asyncio.sleep(resilience.retry_delay(attempt))
+            attempt += 1
 
+    async def _send_once(self, method: str, path: str, breaker: CircuitBreaker, **kwargs: Any) -> httpx.Response:
+        self._in_flight += 1
+        self._requests_total += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        started = time.monotonic()
         try:
-            from pydantic import BaseModel  # type: ignore
-            if isinstance(obj, BaseModel):  # noqa
-                return self._to_jsonable(obj.model_dump())
-        except Exception:
-            pass
+            resp = await self.http.request(method, path, timeout=breaker.timeout, **kwargs)
+        except BaseException:
+            breaker.release()
+            raise
+        finally:
+            self._in_flight -= 1
+        if resp.status_code in FAILURE_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success(time.monotonic() - started)
+        return resp
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Снимок утилизации пула: соединения (активные/простаивающие) и запросы в полёте."""
+        stats: Dict[str, Any] = {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "requests_total": self._requests_total,
+        }
+        stats.update(self._connection_stats())
+        return stats
 
-        # dataclass
+    def _connection_stats(self) -> Dict[str, int]:
+        """
+        Соединения пула берутся из внутренностей httpcore (transport._pool) — публичного
+        API для этого нет. Если после обновления httpx/httpcore их не найти, поля
+        просто не попадают в снимок.
+        """
         try:
-            from dataclasses import is_dataclass, asdict
-            if is_dataclass(obj):
-                return self._to_jsonable(asdict(obj))
-        except Exception:
-            pass
+            connections = list(getattr(getattr(self._transport, "_pool", None), "connections", None) or [])
+            idle = sum(1 for conn in connections if conn.is_idle())
+        except (AttributeError, TypeError):
+            return {}
+        return {"connections": len(connections), "active": len(connections) - idle, "idle": idle}
+
+    @staticmethod
+    def _request_key(user_id: int, method: str, path: str, params: Optional[Dict[str, Any]]) -> RequestKey:
+        raw_params = json.dumps(params or {}, sort_keys=True, default=str, ensure_ascii=False)
+        return user_id, method.upper(), path, raw_params
+
+    def _revalidated(self, key: RequestKey, validated: Optional[_Validated], resp: httpx.Response) -> httpx.Response:
+        """304 превращает в 200 с телом из кэша; свежий 200 запоминает вместе с валидаторами."""
+        if resp.status_code == 304 and validated is not None:
+            metrics.inc("http.conditional.not_modified")
+            metrics.inc("http.conditional.bytes_saved", len(validated.content))
+            return validated.as_response(resp)
+        if resp.status_code == 200:
+            self._validators.store(key, resp)
+        return resp
 
-        # mapping
-        if isinstance(obj, dict):
-            return {k: self._to_jsonable(v) for k, v in obj.items()}
+    async def refresh_tokens(self, user_id: int, stale_access: Optional[str] = None) -> bool:
+        """
+        Single-flight обновление токенов пользователя.
+        Первый вызов запускает refresh, остальные конкурентные вызовы ждут его результат.
+        stale_access — access, с которым получили 401: если он уже заменён, refresh не нужен.
+        """
+        pending = self._refreshes.get(user_id)
+        if pending is not None:
+            metrics.inc("auth.refresh.coalesced")
+            return await asyncio.shield(pending)
+
+        task = asyncio.ensure_future(self._refresh_single_flight(user_id, stale_access))
+        self._refreshes[user_id] = task
 
-        # sequence
-        if isinstance(obj, (list, tuple)):
-            return [self._to_jsonable(v) for v in obj]
+        def _forget(done: "asyncio.Task[bool]") -> None:
+            if self._refreshes.get(user_id) is done:
+                del self._refreshes[user_id]
 
-        # set
-        if isinstance(obj, set):
-            return [self._to_jsonable(v) for v in obj]
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
 
-        return obj
+    async def _refresh_single_flight(self, user_id: int, stale_access: Optional[str]) -> bool:
+        if stale_access is not None:
+            current = await redis_client.get_user_access_token(user_id, use_cache=False)
+            if current and current != stale_access:
+                metrics.inc("auth.refresh.coalesced")
+                return True
+
+        lock = await redis_client.acquire_refresh_lock(user_id, settings.token_refresh_lock_ttl)
+        if lock is None:
+            metrics.inc("auth.refresh.remote_wait")
+            return await self._wait_remote_refresh(user_id, stale_access)
 
-    def _safe_body_for_log(self, data: Optional[Dict[str, Any]]) -> Any:
-        if data is None:
-            return None
         try:
-            norm = self._to_jsonable(data)
-            json.dumps(norm, ensure_ascii=False)
-            return norm
-        except Exception:
-            return "<unserializable>"
+            metrics.inc("auth.refresh.performed")
+            return await self._refresh_tokens(user_id)
+        finally:
+            await redis_client.release_refresh_lock(user_id, lock)
+
+    async def _wait_remote_refresh(self, user_id: int, stale_access: Optional[str]) -> bool:
+        """Refresh уже делает другая реплика: ждём смены access или снятия лока."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.token_refresh_lock_ttl
+        while loop.time() < deadline:
+            await asyncio.sleep(REMOTE_REFRESH_POLL)
+            current = await redis_client.get_user_access_token(user_id, use_cache=False)
+            if current and current != stale_access:
+                return True
+            if not await redis_client.is_refresh_locked(user_id):
+                break
+        current = await redis_client.get_user_access_token(user_id, use_cache=False)
+        return bool(current) and current != stale_access
 
     async def _refresh_tokens(self, user_id: int) -> bool:
-        refresh = await redis_client.get_user_refresh_token(user_id)
+        refresh = await redis_client.get_user_refresh_token(user_id, use_cache=False)
         if not refresh:
             logger.warning("No refresh token in redis for user_id=%s", user_id)
             return False
 
         req_id = str(uuid.uuid4())
         try:
-            async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout) as c:
-                logger.info(
-                    "API → POST /auth/refresh | req_id=%s | user_id=%s",
-                    req_id, user_id
-                )
-                resp = await c.post(
+            logger.info(
+                "API → POST /auth/refresh | req_id=%s | user_id=%s",
+                req_id, user_id
+            )
+            with metrics.timer("auth.refresh"):
+                resp = await self._send(
+                    "POST",
                     "/auth/refresh",
                     json={"refresh_token": refresh},
                     headers={"X-Request-ID": req_id, "X-User-ID": str(user_id)},
@@ -122,10 +386,27 @@ class BotHttpClient:
             )
             return False
 
-        await redis_client.set_user_tokens(user_id, new_access, new_refresh)
+        if not await redis_client.set_user_tokens(user_id, new_access, new_refresh):
+            # Другие реплики увидят новую пару только после восстановления Redis.
+            logger.warning("Refreshed tokens kept in memory until Redis is back | req_id=%s | user_id=%s", req_id, user_id)
         logger.info("Tokens refreshed successfully | req_id=%s | user_id=%s", req_id, user_id)
         return True
 
+    async def _access_token(self, user_id: int) -> Optional[str]:
+        """Access из сессии текущего апдейта (SessionMiddleware), иначе из Redis."""
+        session = session_for(user_id)
+        if session is not None:
+            return session.access
+        return await redis_client.get_user_access_token(user_id)
+
+    async def _reload_access_token(self, user_id: int) -> Optional[str]:
+        """Перечитывает токены после refresh и обновляет сессию апдейта."""
+        access, refresh = await redis_client.get_user_tokens(user_id)
+        session = session_for(user_id)
+        if session is not None:
+            session.access, session.refresh = access, refresh
+        return access
+
     async def request(
         self,
         user_id: int,
@@ -133,73 +414,162 @@ class BotHttpClient:
         path: str,
         json: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
+        conditional: bool = True,
+    ) -> httpx.Response:
+        """
+        conditional=False отключает условный GET (If-None-Match / If-Modified-Since):
+        запрос всегда получает полное тело от API.
+
+        Одинаковые (пользователь, метод, путь, параметры, conditional) GET/HEAD в полёте
+        склеиваются: все вызывающие ждут один запрос к API и получают общий CachedResponse.
+        """
+        if method.upper() not in COALESCED_METHODS:
+            return await self._request(user_id, method, path, json, params, conditional)
+
+        key = (self._request_key(user_id, method, path, params), conditional)
+        pending = self._coalesced.get(key)
+        if pending is not None:
+            metrics.inc("http.coalesced")
+            return await asyncio.shield(pending)
+
+        async def _shared() -> httpx.Response:
+            return CachedResponse.share(await self._request(user_id, method, path, json, params, conditional))
+
+        task = asyncio.ensure_future(_shared())
+        self._coalesced[key] = task
+
+        def _forget(done: "asyncio.Task[httpx.Response]") -> None:
+            if self._coalesced.get(key) is done:
+                del self._coalesced[key]
+
+        task.add_done_callback(_forget)
+        return await asyncio.shield(task)
+
+    async def _request(
+        self,
+        user_id: int,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]],
+        params: Optional[Dict[str, Any]],
+        conditional: bool,
     ) -> httpx.Response:
-        access = await redis_client.get_user_access_token(user_id)
+        access = await self._access_token(user_id)
+        token_refresher.touch(user_id, access)
+        if token_refresher.is_expiring(access):
+            # exp уже прошёл: обновляем до запроса, а не после лишнего 401
+            metrics.inc("auth.refresh.inline")
+            if await self.refresh_tokens(user_id, stale_access=access):
+                access = await self._reload_access_token(user_id)
         headers = {"Authorization": f"Bearer {access}"} if access else {}
 
         req_id = str(uuid.uuid4())
         headers["X-Request-ID"] = req_id
         headers["X-User-ID"] = str(user_id)
 
-        json_normalized = self._to_jsonable(json) if json is not None else None
-        body_for_log = self._safe_body_for_log(json_normalized)
-        # -----------------------------------------------------------------------
+        cache_key: Optional[RequestKey] = None
+        validated: Optional[_Validated] = None
+        if conditional and method.upper() == "GET":
+            cache_key = self._request_key(user_id, method, path, params)
+            validated = self._validators.get(cache_key)
+            if validated is not None:
+                metrics.inc("http.conditional.sent")
+                headers.update(validated.conditional_headers())
 
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout) as c:
-            logger.info(
-                "API → %s %s | req_id=%s | user_id=%s | params=%s | json=%s",
-                method.upper(), path, req_id, user_id, params, body_for_log
-            )
-            try:
-                resp = await c.request(method, path, json=json_normalized, params=params, headers=headers)
-            except httpx.HTTPError as e:
-                logger.exception(
-                    "API transport error | req_id=%s | user_id=%s | %s %s | error=%s",
-                    req_id, user_id, method.upper(), path, e
-                )
-                raise
+        # Тело кодируется один раз: эти же байты уходят в API (и при повторе после 401) и в лог.
+        content = dumps(json) if json is not None else None
+        if content is not None:
+            headers["Content-Type"] = "application/json"
 
-            if resp.status_code == 401:
-                logger.warning(
-                    "401 received, trying token refresh | req_id=%s | user_id=%s | %s %s",
-                    req_id, user_id, method.upper(), path
-                )
-                refreshed = await self._refresh_tokens(user_id)
-                if refreshed:
-                    access = await redis_client.get_user_access_token(user_id)
-                    headers["Authorization"] = f"Bearer {access}" if access else ""
-                    try:
-                        resp = await c.request(method, path, json=json_normalized, params=params, headers=headers)
-                    except httpx.HTTPError as e:
-                        logger.exception(
-                            "API transport error after refresh | req_id=%s | user_id=%s | %s %s | error=%s",
-                            req_id, user_id, method.upper(), path, e
-                        )
-                        raise
-                else:
-                    logger.error(
-                        "Token refresh failed, returning original 401 | req_id=%s | user_id=%s",
-                        req_id, user_id
-                    )
+        logger.info(
+            "API → %s %s | req_id=%s | user_id=%s | params=%s | json=%s",
+            method.upper(), path, req_id, user_id, params, LazyBody(content, MAX_LOG_BODY),
+            extra={"sample_key": req_id},
+        )
+        try:
+            resp = await self._send(method, path, content=content, params=params, headers=headers)
+        except ApiUnavailableError as e:
+            logger.warning(
+                "API unavailable | req_id=%s | user_id=%s | %s %s | retry_after=%.1fs",
+                req_id, user_id, method.upper(), path, e.retry_after
+            )
+            raise
+        except httpx.HTTPError as e:
+            logger.exception(
+                "API transport error | req_id=%s | user_id=%s | %s %s | error=%s",
+                req_id, user_id, method.upper(), path, e
+            )
+            raise
 
-            if resp.status_code >= 400:
-                resp_text = resp.text or ""
+        if resp.status_code == 401:
+            logger.warning(
+                "401 received, trying token refresh | req_id=%s | user_id=%s | %s %s",
+                req_id, user_id, method.upper(), path
+            )
+            refreshed = await self.refresh_tokens(user_id, stale_access=access)
+            if refreshed:
+                access = await self._reload_access_token(user_id)
+                headers["Authorization"] = f"Bearer {access}" if access else ""
                 try:
-                    resp_json = resp.json()
-                except Exception:
-                    resp_json = None
-                logger.error(
-                    "API ← %s %s %s | req_id=%s | user_id=%s | resp_json=%s | resp_text=%s",
-                    resp.status_code, method.upper(), path, req_id, user_id,
-                    resp_json, resp_text[:MAX_LOG_BODY]
-                )
+                    resp = await self._send(method, path, content=content, params=params, headers=headers)
+                except httpx.HTTPError as e:
+                    logger.exception(
+                        "API transport error after refresh | req_id=%s | user_id=%s | %s %s | error=%s",
+                        req_id, user_id, method.upper(), path, e
+                    )
+                    raise
             else:
-                logger.info(
-                    "API ← %s %s %s | req_id=%s | user_id=%s",
-                    resp.status_code, method.upper(), path, req_id, user_id
+                logger.error(
+                    "Token refresh failed, returning original 401 | req_id=%s | user_id=%s",
+                    req_id, user_id
                 )
 
-            return resp
+        if cache_key is not None:
+            resp = self._revalidated(cache_key, validated, resp)
+
+        self._log_response(resp, method, path, req_id, user_id)
+        return resp
+
+    async def public_request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """
+        Запрос без токенов пользователя (login/register/logout) через общий пул и breaker.
+        Тело запроса в лог не пишется: в нём пароли.
+        """
+        req_id = str(uuid.uuid4())
+        headers = {**(headers or {}), "X-Request-ID": req_id}
+        content = dumps(json) if json is not None else None
+        if content is not None:
+            headers["Content-Type"] = "application/json"
+
+        logger.info("API → %s %s | req_id=%s", method.upper(), path, req_id, extra={"sample_key": req_id})
+        resp = await self._send(method, path, content=content, headers=headers)
+        self._log_response(resp, method, path, req_id, None)
+        return resp
 
+    @staticmethod
+    def _log_response(resp: httpx.Response, method: str, path: str, req_id: str, user_id: Optional[int]) -> None:
+        if resp.status_code >= 400:
+            resp_text = resp.text or ""
+            try:
+                resp_json = resp.json()
+            except Exception:
+                resp_json = None
+            logger.error(
+                "API ← %s %s %s | req_id=%s | user_id=%s | resp_json=%s | resp_text=%s",
+                resp.status_code, method.upper(), path, req_id, user_id,
+                resp_json, resp_text[:MAX_LOG_BODY]
+            )
+        else:
+            logger.info(
+                "API ← %s %s %s | req_id=%s | user_id=%s",
+                resp.status_code, method.upper(), path, req_id, user_id,
+                extra={"sample_key": req_id},
+            )
 
 client = BotHttpClient()
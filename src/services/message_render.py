@@ -0,0 +1,154 @@
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional, Tuple, Union
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, MaybeInaccessibleMessage, Message
+
+from src.config import settings
+from src.services.render_coalescer import message_key, render_coalescer
+from src.utils.metrics import metrics
+
+MessageKey = Tuple[int, int]
+
+
+def _digest(*parts: Optional[str]) -> bytes:
+    """Стабильный (не зависящий от PYTHONHASHSEED) 8-байтовый отпечаток строк."""
+    h = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        h.update(b"\x00" if part is None else b"\x01" + part.encode())
+        h.update(b"\x1f")
+    return h.digest()
+
+
+def _markup_json(markup: Optional[InlineKeyboardMarkup]) -> Optional[str]:
+    return markup.model_dump_json(exclude_none=True) if markup is not None else None
+
+
+def _markup_digest(markup: Optional[InlineKeyboardMarkup]) -> bytes:
+    return _digest(_markup_json(markup))
+
+
+def _shown(message: MaybeInaccessibleMessage) -> bytes:
+    """Отпечаток сообщения, каким его видит Telegram: plain-текст и клавиатура."""
+    return _digest(getattr(message, "text", None), _markup_json(getattr(message, "reply_markup", None)))
+
+
+class _Rendered:
+    __slots__ = ("text", "markup", "shown")
+
+    def __init__(self, text: bytes, markup: bytes, shown: bytes):
+        self.text = text
+        self.markup = markup
+        self.shown = shown
+
+
+class MessageRenderer:
+    """
+    Показ экрана бота: новым сообщением в ответ на Message или правкой сообщения
+    с кнопками в ответ на CallbackQuery.
+
+    Для каждого (chat, message) помнит отпечатки последних отправленных текста и
+    клавиатуры и отпечаток результата. Если сообщение в callback совпадает с
+    отпечатком (его никто не правил в обход), то при неизменном экране правка не
+    отправляется вовсе, а при изменившейся только клавиатуре уходит
+    edit_reply_markup. Без записи — прежнее поведение: сравнение с текстом сообщения.
+    Правка отменяет ожидающую отложенную перерисовку этого сообщения (RenderCoalescer).
+    Все правки сообщений бота идут через edit/edit_markup; если сообщение всё же
+    правят в обход, после этого вызывают forget.
+    """
+
+    def __init__(self, size: int = settings.render_cache_size):
+        self.size = size
+        self._rendered: "OrderedDict[MessageKey, _Rendered]" = OrderedDict()
+
+    async def respond(
+        self, target: Union[Message, CallbackQuery], text: str, kb: Optional[InlineKeyboardMarkup]
+    ) -> None:
+        if isinstance(target, Message):
+            sent = await target.answer(text, reply_markup=kb)
+            self._remember(sent, _digest(text), _markup_digest(kb))
+            return
+        await self.edit(target.message, text, kb)
+
+    async def edit(self, message: MaybeInaccessibleMessage, text: str, kb: Optional[InlineKeyboardMarkup]) -> None:
+        render_coalescer.discard(message)
+        text_digest, markup_digest = _digest(text), _markup_digest(kb)
+        last = self._last(message)
+        if last is not None:
+            same_text, same_markup = last.text == text_digest, last.markup == markup_digest
+        else:
+            same_text = (getattr(message, "text", None) or "") == text
+            same_markup = same_text and _markup_digest(getattr(message, "reply_markup", None)) == markup_digest
+
+        if same_text and same_markup:
+            metrics.inc("render.edit.skipped")
+            return
+        if same_text:
+            metrics.inc("render.edit.markup_only")
+            await self._apply(message, text_digest, markup_digest, lambda: message.edit_reply_markup(reply_markup=kb))
+        else:
+            metrics.inc("render.edit.full")
+            await self._apply(message, text_digest, markup_digest, lambda: message.edit_text(text, reply_markup=kb))
+
+    async def edit_markup(self, message: MaybeInaccessibleMessage, kb: Optional[InlineKeyboardMarkup]) -> None:
+        """Меняет только клавиатуру сообщения (None — убирает её), текст остаётся прежним."""
+        render_coalescer.discard(message)
+        markup_digest = _markup_digest(kb)
+        last = self._last(message)
+        if last is not None:
+            text_digest, same_markup = last.text, last.markup == markup_digest
+        else:
+            text_digest = _digest(getattr(message, "text", None) or "")
+            same_markup = _markup_digest(getattr(message, "reply_markup", None)) == markup_digest
+
+        if same_markup:
+            metrics.inc("render.edit.skipped")
+            return
+        metrics.inc("render.edit.markup_only")
+        await self._apply(message, text_digest, markup_digest, lambda: message.edit_reply_markup(reply_markup=kb))
+
+    def forget(self, chat_id: int, message_id: int) -> None:
+        """Сообщение правят в обход edit: запись о нём больше не верна, отложенная перерисовка не нужна."""
+        key = (chat_id, message_id)
+        self._rendered.pop(key, None)
+        render_coalescer.discard_key(key)
+
+    def _last(self, message: MaybeInaccessibleMessage) -> Optional[_Rendered]:
+        """Запись о сообщении, если его с тех пор никто не правил в обход."""
+        last = self._rendered.get(message_key(message))
+        if last is not None and last.shown == _shown(message):
+            return last
+        return None
+
+    async def _apply(
+        self,
+        message: MaybeInaccessibleMessage,
+        text_digest: bytes,
+        markup_digest: bytes,
+        send: Callable[[], Awaitable[Any]],
+    ) -> None:
+        try:
+            result = await send()
+        except TelegramBadRequest as exc:
+            if "message is not modified" not in str(exc).lower():
+                raise
+            metrics.inc("render.edit.not_modified")
+            if isinstance(message, Message):
+                self._remember(message, text_digest, markup_digest)
+            return
+        if isinstance(result, Message):
+            self._remember(result, text_digest, markup_digest)
+
+    def _remember(self, message: Message, text_digest: bytes, markup_digest: bytes) -> None:
+        if not self.size:
+            return
+        key = message_key(message)
+        self._rendered[key] = _Rendered(text_digest, markup_digest, _shown(message))
+        self._rendered.move_to_end(key)
+        while len(self._rendered) > self.size:
+            self._rendered.popitem(last=False)
+
+
+# Global instance
+renderer = MessageRenderer()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from aiogram.types import MaybeInaccessibleMessage
+
+from src.config import settings
+from src.services.background import BackgroundTasks
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Render = Callable[[], Awaitable[Any]]
+LaneRunner = Callable[[Optional[int], Render], Awaitable[Any]]
+MessageKey = Tuple[int, int]
+
+render_tasks = BackgroundTasks("renders")
+
+# Сообщение, которое сейчас перерисовывает отложенный render (задача _run).
+_firing: ContextVar[Optional[MessageKey]] = ContextVar("render_firing", default=None)
+
+
+def message_key(message: MaybeInaccessibleMessage) -> MessageKey:
+    return message.chat.id, message.message_id
+
+
+async def _run_now(key: Optional[int], render: Render) -> Any:
+    return await render()
+
+
+class _Slot:
+    __slots__ = ("render", "user_id", "first", "due", "discarded")
+
+    def __init__(self, render: Render, user_id: Optional[int], now: float, due: float):
+        self.render = render
+        self.user_id = user_id
+        self.first = now
+        self.due = due
+        self.discarded = False
+
+
+class RenderCoalescer:
+    """
+    Отложенная перерисовка сообщения «последний выигрывает».
+
+    schedule() откладывает render на render_debounce_ms; новый вызов для того же
+    сообщения заменяет ожидающий render и сдвигает срок, но не дальше
+    render_max_delay_ms от первого нажатия. Render выполняется в полосе
+    пользователя (bind — обычно UpdateSchedulerMiddleware.run), так что не
+    пересекается с его апдейтами; устаревший (за которым уже ждёт новый) или
+    отброшенный правкой сообщения (discard) не выполняется.
+    """
+
+    def __init__(self, window: Optional[float] = None, max_delay: Optional[float] = None):
+        self.window = window if window is not None else settings.render_debounce_ms / 1000
+        self.max_delay = max_delay if max_delay is not None else settings.render_max_delay_ms / 1000
+        self._lane: LaneRunner = _run_now
+        # Ещё в окне ожидания.
+        self._pending: Dict[MessageKey, _Slot] = {}
+        # Последний запланированный и ещё не выполненный render сообщения (в окне или в очереди полосы).
+        self._latest: Dict[MessageKey, _Slot] = {}
+        metrics.register("render_coalescer", lambda: {"pending": len(self._pending), "scheduled": len(self._latest)})
+
+    def bind(self, lane: LaneRunner) -> None:
+        """lane(user_id, render) выполняет render в полосе пользователя."""
+        self._lane = lane
+
+    def schedule(self, message: MaybeInaccessibleMessage, user_id: Optional[int], render: Render) -> None:
+        """
+        render вызывается без аргументов в момент срабатывания — данные для экрана
+        (профиль из FSM и т. п.) он должен читать сам, а не брать из замыкания.
+        """
+        key = message_key(message)
+        now = time.monotonic()
+        slot = self._pending.get(key)
+        if slot is not None:
+            metrics.inc("render.superseded")
+            slot.render = render
+            slot.due = min(now + self.window, slot.first + self.max_delay)
+            return
+        slot = self._pending[key] = self._latest[key] = _Slot(render, user_id, now, now + self.window)
+        render_tasks.spawn(self._run(key, slot), name=f"render-{key[0]}-{key[1]}")
+
+    def discard(self, message: MaybeInaccessibleMessage) -> None:
+        """
+        Сообщение правят в обход отложенной перерисовки: ожидающий render не
+        выполняется. Правки самого render (он вызывает MessageRenderer) не в счёт.
+        """
+        self.discard_key(message_key(message))
+
+    def discard_key(self, key: MessageKey) -> None:
+        if _firing.get() == key:
+            return
+        self._pending.pop(key, None)
+        slot = self._latest.pop(key, None)
+        if slot is not None:
+            slot.discarded = True
+            metrics.inc("render.discarded")
+
+    async def _run(self, key: MessageKey, slot: _Slot) -> None:
+        while True:
+            delay = slot.due - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        if self._pending.get(key) is not slot:  # отброшен правкой сообщения
+            return
+        del self._pending[key]
+        try:
+            await self._lane(slot.user_id, lambda: self._fire(key, slot))
+        except Exception as e:
+            logger.error("Deferred render failed | chat=%s | message=%s | %s", key[0], key[1], e)
+        finally:
+            if self._latest.get(key) is slot:
+                del self._latest[key]
+
+    async def _fire(self, key: MessageKey, slot: _Slot) -> None:
+        # Проверяем уже в полосе: пока ждали её, сообщение могли перерисовать или отправить новый render.
+        if slot.discarded:
+            return
+        if self._latest.get(key) is not slot:
+            metrics.inc("render.superseded")
+            return
+        metrics.inc("render.executed")
+        token = _firing.set(key)
+        try:
+            await slot.render()
+        finally:
+            _firing.reset(token)
+
+
+# Global instance
+render_coalescer = RenderCoalescer()
@@ -0,0 +1,203 @@
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+import httpx
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Статусы, которые говорят о перегрузке/падении API, а не об ошибке запроса.
+FAILURE_STATUSES = frozenset({500, 502, 503, 504})
+# Ретраим только то, что могло не дойти до бизнес-логики API.
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Меньше стольких замеров перцентиль не считаем — работает базовый таймаут.
+MIN_LATENCY_SAMPLES = 20
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class ApiUnavailableError(httpx.HTTPError):
+    """
+    API недоступно: breaker разомкнут или исчерпаны попытки.
+    Наследуется от httpx.HTTPError, чтобы существующие обработчики транспортных
+    ошибок продолжали работать; роутер ошибок отвечает пользователю «сервис занят».
+    """
+
+    def __init__(self, endpoint: str, retry_after: float = 0.0):
+        super().__init__(f"Task Manager API unavailable: {endpoint}")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Breaker одного эндпоинта с адаптивным таймаутом.
+
+    closed — запросы идут, подряд идущие сбои считаются; после failure_threshold
+    breaker размыкается (open) на open_seconds и сразу отказывает.
+    half_open — по истечении open_seconds пропускается один пробный запрос:
+    успех замыкает breaker, сбой снова размыкает.
+
+    Таймаут — перцентиль латентности ответов, умноженный на multiplier
+    и зажатый в [min_timeout, max_timeout]. Истёкший таймаут идёт в выборку
+    как латентность не меньше таймаута и сразу удваивает его, чтобы замедлившееся
+    API не упиралось в слишком короткий таймаут; пробный запрос half-open
+    получает max_timeout.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        failure_threshold: int = settings.api_breaker_failures,
+        open_seconds: float = settings.api_breaker_open_seconds,
+        min_timeout: float = settings.api_timeout_min,
+        max_timeout: float = settings.api_timeout,
+        percentile: float = settings.api_timeout_percentile,
+        multiplier: float = settings.api_timeout_multiplier,
+        window: int = settings.api_latency_window,
+    ):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._timeout = max_timeout
+
+    # ----------------- admission -----------------
+    def before_request(self) -> None:
+        """Пропускает запрос или бросает ApiUnavailableError без похода в сеть."""
+        if self.state == CLOSED:
+            return
+        if self.state == OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                metrics.inc("api.breaker.rejected")
+                raise ApiUnavailableError(self.endpoint, retry_after=remaining)
+            self.state = HALF_OPEN
+            self._probing = False
+        if self._probing:
+            metrics.inc("api.breaker.rejected")
+            raise ApiUnavailableError(self.endpoint, retry_after=1.0)
+        self._probing = True
+
+    # ----------------- outcomes -----------------
+    def record_success(self, latency: float) -> None:
+        self._latencies.append(latency)
+        self._recompute_timeout()
+        self._failures = 0
+        if self.state != CLOSED:
+            logger.info("Circuit closed | endpoint=%s", self.endpoint)
+        self.state = CLOSED
+        self._probing = False
+
+    def record_timeout(self) -> None:
+        """Ответ не уложился в таймаут: расширяем его и считаем сбой."""
+        expired = self._timeout if self.state != HALF_OPEN else self.max_timeout
+        self._latencies.append(expired)
+        self._recompute_timeout()
+        self._timeout = min(self.max_timeout, max(self._timeout, expired * 2))
+        self.record_failure()
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """Запрос не дал вердикта (отменён, ошибка клиента) — освобождаем пробу half-open."""
+        self._probing = False
+
+    @property
+    def timeout(self) -> float:
+        # Проба half-open решает, замкнуть ли breaker, — ей даём максимальный таймаут.
+        return self.max_timeout if self.state == HALF_OPEN else self._timeout
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self._failures,
+            "timeout": round(self._timeout, 3),
+            "p50": round(self._quantile(0.5), 3) if self._latencies else None,
+            "p99": round(self._quantile(0.99), 3) if self._latencies else None,
+            "samples": len(self._latencies),
+        }
+
+    # ----------------- internals -----------------
+    def _open(self) -> None:
+        if self.state != OPEN:
+            metrics.inc("api.breaker.opened")
+            logger.warning(
+                "Circuit opened | endpoint=%s | failures=%s | for=%ss",
+                self.endpoint, self._failures, self.open_seconds,
+            )
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+    def _quantile(self, q: float) -> float:
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def _recompute_timeout(self) -> None:
+        if len(self._latencies) < MIN_LATENCY_SAMPLES:
+            return
+        adaptive = self._quantile(self.percentile) * self.multiplier
+        self._timeout = min(self.max_timeout, max(self.min_timeout, adaptive))
+
+
+class Resilience:
+    """Реестр breaker'ов по эндпоинтам ("GET /tasks/{id}") и политика ретраев."""
+
+    def __init__(
+        self,
+        retry_attempts: int = settings.api_retry_attempts,
+        backoff: float = settings.api_retry_backoff,
+        backoff_max: float = settings.api_retry_backoff_max,
+    ):
+        self.retry_attempts = retry_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        metrics.register("api_endpoints", self.stats)
+
+    @staticmethod
+    def endpoint(method: str, path: str) -> str:
+        return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', path)}"
+
+    def breaker(self, method: str, path: str) -> CircuitBreaker:
+        endpoint = self.endpoint(method, path)
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            breaker = self._breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+    def attempts(self, method: str) -> int:
+        return 1 + self.retry_attempts if method.upper() == "GET" else 1
+
+    def retry_delay(self, attempt: int) -> float:
+        """Full jitter: случайная пауза в [0, min(max, base * 2^attempt)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {endpoint: breaker.stats() for endpoint, breaker in self._breakers.items()}
+
+
+# Global instance
+resilience = Resilience()
@@ -0,0 +1,28 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class UserSession:
+    """Токены пользователя, прочитанные один раз на апдейт."""
+
+    user_id: int
+    access: Optional[str] = None
+    refresh: Optional[str] = None
+
+    @property
+    def authenticated(self) -> bool:
+        """Авторизован, если есть refresh-токен (как и в RedisClient.is_authenticated)."""
+        return bool(self.refresh)
+
+
+# Сессия текущего апдейта: её выставляет SessionMiddleware, читает BotHttpClient.
+current_session: ContextVar[Optional[UserSession]] = ContextVar("current_session", default=None)
+
+
+def session_for(user_id: int) -> Optional[UserSession]:
+    session = current_session.get()
+    if session is not None and session.user_id == user_id:
+        return session
+    return None
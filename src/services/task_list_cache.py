@@ -0,0 +1,161 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.config import settings
+from src.database.redis_client import redis_client
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Optional[Any]]]
+Slot = Tuple[int, str]
+
+INVALIDATION_SCOPE = "task_list"
+
+
+@dataclass
+class _Page:
+    data: Any
+    fetched_at: float
+
+
+class TaskListCache:
+    """
+    In-process stale-while-revalidate кэш страниц списка задач.
+
+    Ключ — (user_id, хэш параметров запроса). Свежая страница (моложе fresh_ttl)
+    отдаётся как есть; устаревшая — тоже отдаётся сразу, а в фоне запускается
+    перезагрузка. Страницы старше max_age не отдаются: ждём API.
+    Загрузки одного ключа склеиваются; invalidate() снимает их с учёта,
+    поэтому ответ, начатый до мутации, в кэш уже не попадёт. Инвалидация
+    рассылается и другим репликам через pub/sub Redis.
+
+    Каждый вызов fetch получает свою копию данных: страница в кэше и результат
+    склеенной загрузки общие, а вызывающий код свободно меняет полученное.
+    """
+
+    def __init__(
+        self,
+        max_users: int = settings.task_list_cache_users,
+        max_pages: int = settings.task_list_cache_pages,
+        fresh_ttl: float = settings.task_list_fresh_ttl,
+        max_age: float = settings.task_list_max_age,
+    ):
+        self.max_users = max_users
+        self.max_pages = max_pages
+        self.fresh_ttl = fresh_ttl
+        self.max_age = max_age
+        self._users: "OrderedDict[int, OrderedDict[str, _Page]]" = OrderedDict()
+        self._inflight: Dict[Slot, asyncio.Task] = {}
+        metrics.register("task_list_cache", self.stats)
+        redis_client.add_invalidation_listener(INVALIDATION_SCOPE, self._drop)
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        raw = json.dumps(params, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    async def fetch(
+        self,
+        user_id: int,
+        params: Dict[str, Any],
+        loader: Loader,
+        force: bool = False,
+    ) -> Tuple[Optional[Any], float]:
+        """
+        Возвращает (data, age): age — возраст отданных данных в секундах.
+        data=None — API не ответил успешно. force=True — всегда идём в API.
+        """
+        key = self.key(params)
+        page = None if force else self._get(user_id, key)
+        if page is not None:
+            age = time.monotonic() - page.fetched_at
+            if age <= self.max_age:
+                metrics.inc("tasks.list_cache.hit")
+                if age > self.fresh_ttl and (user_id, key) not in self._inflight:
+                    metrics.inc("tasks.list_cache.revalidate")
+                    self._load(user_id, key, loader)
+                return copy.deepcopy(page.data), age
+
+        metrics.inc("tasks.list_cache.miss")
+        data = await asyncio.shield(self._load(user_id, key, loader, replace=force))
+        return copy.deepcopy(data), 0.0
+
+    async def invalidate(self, user_id: int) -> None:
+        self._drop(user_id)
+        await redis_client.publish_invalidation(INVALIDATION_SCOPE, user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": len(self._users),
+            "pages": sum(len(pages) for pages in self._users.values()),
+            "inflight": len(self._inflight),
+        }
+
+    # ----------------- internals -----------------
+    def _drop(self, user_id: Optional[int]) -> None:
+        """Сброс в этом процессе; user_id=None — всех пользователей."""
+        if user_id is None:
+            self._users.clear()
+            self._inflight.clear()
+            return
+        self._users.pop(user_id, None)
+        for slot in [s for s in self._inflight if s[0] == user_id]:
+            del self._inflight[slot]
+
+    def _get(self, user_id: int, key: str) -> Optional[_Page]:
+        pages = self._users.get(user_id)
+        if pages is None or key not in pages:
+            return None
+        self._users.move_to_end(user_id)
+        pages.move_to_end(key)
+        return pages[key]
+
+    def _put(self, user_id: int, key: str, data: Any) -> None:
+        pages = self._users.get(user_id)
+        if pages is None:
+            pages = self._users[user_id] = OrderedDict()
+        self._users.move_to_end(user_id)
+        pages[key] = _Page(data, time.monotonic())
+        pages.move_to_end(key)
+        while len(pages) > self.max_pages:
+            pages.popitem(last=False)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def _load(self, user_id: int, key: str, loader: Loader, replace: bool = False) -> asyncio.Task:
+        slot = (user_id, key)
+        task = self._inflight.get(slot)
+        if task is None or replace:
+            task = asyncio.create_task(self._run(slot, loader))
+            task.add_done_callback(self._log_failure)
+            self._inflight[slot] = task
+        return task
+
+    async def _run(self, slot: Slot, loader: Loader) -> Optional[Any]:
+        task = asyncio.current_task()
+        try:
+            data = await loader()
+        finally:
+            current = self._inflight.get(slot) is task
+            if current:
+                del self._inflight[slot]
+        if current and data is not None:
+            self._put(slot[0], slot[1], data)
+        return data
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Task list load failed | %s", task.exception())
+
+
+# Global instance
+task_list_cache = TaskListCache()
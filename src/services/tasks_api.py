@@ -1,32 +1,58 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from src.services.http_client import client
+from src.services.task_list_cache import task_list_cache
 
 
 class TasksAPI:
+    """
+    Мутации сбрасывают кэш списков пользователя при любом исходе — и при ошибке,
+    и при таймауте или обрыве соединения: сервер мог успеть применить запись.
+    """
+
     @staticmethod
     async def list(user_id: int, params: Optional[Dict[str, Any]] = None):
         return await client.request(user_id, "GET", "/tasks/", params=params or {})
 
+    @staticmethod
+    async def list_cached(
+        user_id: int, params: Dict[str, Any], force: bool = False
+    ) -> Tuple[Optional[Any], float]:
+        """Разобранная страница списка и её возраст в секундах; None — API ответил ошибкой."""
+        async def load() -> Optional[Any]:
+            resp = await TasksAPI.list(user_id, params)
+            if resp.status_code != 200:
+                return None
+            return resp.json() or {}
+
+        return await task_list_cache.fetch(user_id, params, load, force=force)
+
     @staticmethod
     async def get(user_id: int, task_id: int):
         return await client.request(user_id, "GET", f"/tasks/{task_id}")
 
     @staticmethod
     async def create(user_id: int, payload: Dict[str, Any]):
-        return await client.request(user_id, "POST", "/tasks/", json=payload)
+        return await TasksAPI._mutate(user_id, "POST", "/tasks/", json=payload)
 
     @staticmethod
     async def patch(user_id: int, task_id: int, payload: Dict[str, Any]):
-        return await client.request(user_id, "PATCH", f"/tasks/{task_id}", json=payload)
+        return await TasksAPI._mutate(user_id, "PATCH", f"/tasks/{task_id}", json=payload)
 
     @staticmethod
     async def delete(user_id: int, task_id: int):
-        return await client.request(user_id, "DELETE", f"/tasks/{task_id}")
+        return await TasksAPI._mutate(user_id, "DELETE", f"/tasks/{task_id}")
 
     @staticmethod
     async def archive(user_id: int, task_id: int):
-        return await client.request(user_id, "POST", f"/tasks/{task_id}/archive")
+        return await TasksAPI._mutate(user_id, "POST", f"/tasks/{task_id}/archive")
 
     @staticmethod
     async def restore(user_id: int, task_id: int):
-        return await client.request(user_id, "POST", f"/tasks/{task_id}/restore")
+        return await TasksAPI._mutate(user_id, "POST", f"/tasks/{task_id}/restore")
+
+    @staticmethod
+    async def _mutate(user_id: int, method: str, path: str, **kwargs: Any):
+        try:
+            return await client.request(user_id, method, path, **kwargs)
+        finally:
+            await task_list_cache.invalidate(user_id)
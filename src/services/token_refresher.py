@@ -0,0 +1,145 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config import settings
+from src.database.redis_client import redis_client
+from src.utils.jwt import decode_exp
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Access, которому осталось жить меньше этого, считаем уже протухшим.
+EXPIRY_SKEW = 5.0
+
+RefreshFn = Callable[..., Awaitable[bool]]
+
+
+class TokenRefreshScheduler:
+    """
+    Фоновое упреждающее обновление access-токенов.
+
+    Для каждого пользователя по claim exp вычисляется момент refresh (exp - margin),
+    моменты лежат в min-heap. Фоновая задача спит до ближайшего и обновляет токен,
+    если пользователь был активен за последние active_window секунд.
+    Неактуальные записи кучи отбрасываются лениво (сверяются с self._due).
+    """
+
+    def __init__(
+        self,
+        margin: float = settings.token_refresh_margin,
+        active_window: float = settings.token_refresh_active_window,
+    ):
+        self.margin = margin
+        self.active_window = active_window
+        self._heap: List[Tuple[float, int]] = []
+        self._due: Dict[int, Tuple[float, str]] = {}
+        self._last_seen: Dict[int, float] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._refresh: Optional[RefreshFn] = None
+        metrics.register("token_refresher", self.stats)
+
+    # ----------------- lifecycle -----------------
+    def start(self, refresh: RefreshFn) -> None:
+        if self._task is not None:
+            return
+        self._refresh = refresh
+        redis_client.add_token_listener(self.track)
+        self._task = asyncio.create_task(self._run(), name="token-refresher")
+        logger.info("Token refresh scheduler started | margin=%ss | active_window=%ss",
+                    self.margin, self.active_window)
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._task, *self._inflight) if t is not None]
+        self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+
+    # ----------------- tracking -----------------
+    def track(self, user_id: int, access: Optional[str]) -> None:
+        """Запомнить срок жизни access пользователя (None — токены удалены)."""
+        exp = decode_exp(access)
+        if exp is None:
+            self._due.pop(user_id, None)
+            self._last_seen.pop(user_id, None)
+            return
+        refresh_at = exp - self.margin
+        current = self._due.get(user_id)
+        if current is not None and current[1] == access:
+            return
+        self._due[user_id] = (refresh_at, access)
+        heapq.heappush(self._heap, (refresh_at, user_id))
+        if self._heap[0] == (refresh_at, user_id):
+            self._wakeup.set()
+
+    def touch(self, user_id: int, access: Optional[str]) -> None:
+        """Отметить активность пользователя на горячем пути запроса."""
+        if decode_exp(access) is None:
+            return
+        self._last_seen[user_id] = time.time()
+        self.track(user_id, access)
+
+    @staticmethod
+    def is_expiring(access: Optional[str]) -> bool:
+        exp = decode_exp(access)
+        return exp is not None and exp - time.time() <= EXPIRY_SKEW
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked": len(self._due),
+            "heap": len(self._heap),
+            "active_users": len(self._last_seen),
+            "inflight": len(self._inflight),
+        }
+
+    # ----------------- loop -----------------
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            timeout = self._process_due()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _process_due(self) -> Optional[float]:
+        """Запускает refresh для наступивших записей; возвращает, сколько спать до следующей."""
+        now = time.time()
+        while self._heap:
+            refresh_at, user_id = self._heap[0]
+            entry = self._due.get(user_id)
+            if entry is None or entry[0] != refresh_at:
+                heapq.heappop(self._heap)
+                continue
+            if refresh_at > now:
+                return refresh_at - now
+
+            heapq.heappop(self._heap)
+            del self._due[user_id]
+            last_seen = self._last_seen.get(user_id, 0.0)
+            if now - last_seen > self.active_window:
+                self._last_seen.pop(user_id, None)
+                metrics.inc("auth.prerefresh.skipped_inactive")
+                continue
+            task = asyncio.create_task(self._refresh_user(user_id, entry[1]))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+        return None
+
+    async def _refresh_user(self, user_id: int, access: str) -> None:
+        try:
+            ok = await self._refresh(user_id, stale_access=access)
+        except Exception as e:
+            logger.exception("Pre-refresh failed | user_id=%s | %s", user_id, e)
+            ok = False
+        metrics.inc("auth.prerefresh.performed" if ok else "auth.prerefresh.failed")
+
+
+# Global instance
+token_refresher = TokenRefreshScheduler()
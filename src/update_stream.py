@@ -0,0 +1,496 @@
+import asyncio
+import json
+import logging
+import math
+import signal
+import socket
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.types import TelegramObject
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Продлеваем аренду партиции, только если она всё ещё наша.
+_RENEW_LEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Сколько ждать дообработки текущих апдейтов при остановке воркера.
+SHUTDOWN_WAIT = 10.0
+# Поле записи с ключом очерёдности (id пользователя или чата).
+KEY_FIELD = "key"
+
+
+def _stream_key(partition: int) -> str:
+    return f"{settings.update_stream_prefix}:{partition}"
+
+
+def _lease_key(partition: int) -> str:
+    return f"{settings.update_stream_prefix}:{partition}:owner"
+
+
+def _workers_key() -> str:
+    return f"{settings.update_stream_prefix}:workers"
+
+
+def _dead_letter_key() -> str:
+    return f"{settings.update_stream_prefix}:dead"
+
+
+def partition_for(key: int, partitions: int = settings.update_stream_partitions) -> int:
+    return key % partitions
+
+
+class StreamPublishMiddleware(BaseMiddleware):
+    """
+    Outer update-middleware ингестора: кладёт сырой апдейт в партицию стрима
+    по id пользователя (или чата) и не обрабатывает его локально.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        key = user.id if user is not None else (chat.id if chat is not None else 0)
+        payload = event.model_dump_json(exclude_unset=True)
+        await self.redis.xadd(
+            _stream_key(partition_for(key)),
+            {"update": payload, KEY_FIELD: str(key)},
+            maxlen=settings.update_stream_maxlen,
+            approximate=True,
+        )
+        metrics.inc("updates.stream.published")
+        return None
+
+
+def create_ingest_dispatcher(redis: Redis) -> Dispatcher:
+    """Dispatcher ингестора: без роутеров, только публикация в стрим."""
+    dp = Dispatcher()
+    dp.update.outer_middleware(StreamPublishMiddleware(redis))
+    return dp
+
+
+class _UserChains:
+    """
+    Записи одной партиции, разложенные по ключам: записи одного пользователя
+    выполняются цепочкой по очереди, разных — параллельно, но не больше limit
+    одновременно в партиции. Подтверждаются записи по мере выполнения; порядок
+    подтверждений не важен — необработанное остаётся в pending.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._tails: Dict[str, asyncio.Task] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def free(self) -> int:
+        return max(0, self.limit - len(self._tasks))
+
+    def submit(self, key: str, run: Callable[[], Awaitable[None]]) -> None:
+        task = asyncio.create_task(self._after(self._tails.get(key), run))
+        self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(lambda done: self._done(key, done))
+
+    async def wait_free(self) -> None:
+        while self._tasks and not self.free:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+
+    async def join(self) -> None:
+        if self._tasks:
+            await asyncio.wait(self._tasks)
+
+    async def cancel(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _after(previous: Optional[asyncio.Task], run: Callable[[], Awaitable[None]]) -> None:
+        if previous is not None:
+            await asyncio.wait({previous})
+        await run()
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Update stream entry failed: %s", task.exception())
+
+
+class UpdateStreamWorker:
+    """
+    Воркер обработки апдейтов из Redis Streams.
+
+    Стрим разбит на партиции по пользователю. Каждую партицию в один момент
+    времени обрабатывает ровно один воркер: он держит аренду (SET NX PX с
+    продлением) и читает её через consumer group. Внутри партиции записи одного
+    пользователя (поле key) выполняются по очереди — переходы FSM не
+    переупорядочиваются, — а разных пользователей параллельно, до
+    update_stream_batch записей сразу: медленный пользователь не задерживает
+    соседей по партиции. Партиции делятся поровну
+    между живыми воркерами (heartbeat в ZSET) и перебалансируются каждые
+    update_stream_lease_ms / 3. Аренды продлевает отдельная задача, так что
+    перебалансировка и дообработка партиций их не задерживают.
+
+    Забрав партицию, воркер сначала перехватывает (XAUTOCLAIM) и дообрабатывает
+    неподтверждённые записи прежнего владельца, простоявшие не меньше срока аренды,
+    и только когда чужих pending не останется, читает новые. Апдейт, на котором
+    упал хендлер, переносится в стрим {prefix}:dead и только затем подтверждается.
+    Отдаваемые при перебалансировке партиции дообрабатываются параллельно и в фоне:
+    флаг остановки проверяется между записями, начатый апдейт не прерывается,
+    а непрочитанный остаток пачки остаётся в pending и достаётся новому владельцу
+    через XAUTOCLAIM. Аренда отпускается, когда партиция закончит текущий апдейт.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, redis: Redis, consumer: Optional[str] = None):
+        self.dp = dp
+        self.bot = bot
+        self.redis = redis
+        self.consumer = consumer or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.partitions = settings.update_stream_partitions
+        self.group = settings.update_stream_group
+        self._token = uuid.uuid4().hex
+        self._owned: Dict[int, asyncio.Task] = {}
+        # Отдаваемые партиции: задача _drain, которая дождётся consumer и отпустит аренду.
+        self._draining: Dict[int, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+        self._lag: Dict[str, Any] = {}
+        metrics.register("update_stream", self.stats)
+
+    # ----------------- lifecycle -----------------
+    async def run(self) -> None:
+        logger.info("Update stream worker started | consumer=%s | partitions=%s", self.consumer, self.partitions)
+        tick = settings.update_stream_lease_ms / 3000
+        renewer = asyncio.create_task(self._renew_leases(tick), name="update-stream-leases")
+        try:
+            while not self._stopping.is_set():
+                try:
+                    alive = await self._heartbeat()
+                    await self._rebalance(alive)
+                    await self._collect_lag()
+                except Exception as e:
+                    logger.error("Update stream rebalance error: %s", e)
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=tick)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._shutdown(renewer)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "consumer": self.consumer,
+            "owned": sorted(self._owned),
+            "draining": sorted(self._draining),
+            "lag": self._lag,
+        }
+
+    async def _shutdown(self, renewer: asyncio.Task) -> None:
+        # Аренды продлеваются, пока партиции дообрабатывают начатое.
+        partitions = [*self._owned, *self._draining]
+        tasks = [*self._owned.values(), *self._draining.values()]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=SHUTDOWN_WAIT)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        renewer.cancel()
+        await asyncio.gather(renewer, return_exceptions=True)
+        for partition in partitions:
+            await self._release(partition)
+        try:
+            await self.redis.zrem(_workers_key(), self.consumer)
+        except Exception as e:
+            logger.warning("Failed to deregister worker %s: %s", self.consumer, e)
+        logger.info("Update stream worker stopped | consumer=%s", self.consumer)
+
+    # ----------------- ownership -----------------
+    async def _heartbeat(self) -> int:
+        now = time.time()
+        key = _workers_key()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(key, {self.consumer: now})
+            pipe.zremrangebyscore(key, "-inf", now - settings.update_stream_lease_ms / 1000)
+            pipe.zcard(key)
+            *_, alive = await pipe.execute()
+        return alive
+
+    async def _rebalance(self, alive: int) -> None:
+        target = math.ceil(self.partitions / max(1, alive))
+
+        for partition, task in list(self._owned.items()):
+            if task.done():
+                self._owned.pop(partition)
+                if not task.cancelled() and task.exception() is not None:
+                    logger.error("Partition %s consumer failed: %s", partition, task.exception())
+                await self._release(partition)
+
+        # Лишние партиции отдаём — их подберут воркеры, у которых меньше доли.
+        while len(self._owned) > target:
+            partition = max(self._owned)
+            consumer = self._owned.pop(partition)
+            self._draining[partition] = asyncio.create_task(
+                self._drain(partition, consumer), name=f"update-stream-drain-{partition}"
+            )
+
+        for partition in range(self.partitions):
+            if len(self._owned) >= target:
+                break
+            if partition in self._owned or partition in self._draining:
+                continue
+            acquired = await self.redis.set(
+                _lease_key(partition), self._token, nx=True, px=settings.update_stream_lease_ms
+            )
+            if acquired:
+                self._owned[partition] = asyncio.create_task(
+                    self._consume(partition), name=f"update-stream-{partition}"
+                )
+                logger.info("Acquired partition %s | consumer=%s", partition, self.consumer)
+
+    async def _drain(self, partition: int, consumer: asyncio.Task) -> None:
+        """
+        Даёт партиции дообработать текущий апдейт и только потом отпускает аренду.
+        Хендлер не отменяем: запись осталась бы неподтверждённой, и новый владелец
+        повторил бы её побочные эффекты. Аренда тем временем продлевается.
+        """
+        try:
+            _, pending = await asyncio.wait({consumer}, timeout=SHUTDOWN_WAIT)
+            if pending:
+                logger.warning("Partition %s is still finishing an update after %ss", partition, SHUTDOWN_WAIT)
+                await asyncio.wait({consumer})
+        except asyncio.CancelledError:
+            consumer.cancel()
+            raise
+        finally:
+            self._draining.pop(partition, None)
+        await self._release(partition)
+
+    async def _renew_leases(self, tick: float) -> None:
+        """Продлевает аренды своих и отдаваемых партиций одним пайплайном раз в tick."""
+        while True:
+            await asyncio.sleep(tick)
+            partitions = [*self._owned, *self._draining]
+            if not partitions:
+                continue
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for partition in partitions:
+                        pipe.eval(_RENEW_LEASE_LUA, 1, _lease_key(partition), self._token, settings.update_stream_lease_ms)
+                    renewed = await pipe.execute()
+            except Exception as e:
+                logger.error("Update stream lease renewal error: %s", e)
+                continue
+            for partition, ok in zip(partitions, renewed):
+                if ok:
+                    continue
+                # Партицию уже читает другой воркер — останавливаемся сразу, без дообработки.
+                logger.warning("Lost lease on partition %s", partition)
+                consumer = self._owned.pop(partition, None)
+                if consumer is not None:
+                    consumer.cancel()
+                drain = self._draining.get(partition)
+                if drain is not None:
+                    drain.cancel()
+
+    async def _release(self, partition: int) -> None:
+        try:
+            await self.redis.eval(_RELEASE_LEASE_LUA, 1, _lease_key(partition), self._token)
+        except Exception as e:
+            logger.warning("Failed to release partition %s: %s", partition, e)
+
+    # ----------------- consumption -----------------
+    async def _ensure_group(self, stream: str) -> None:
+        try:
+            await self.redis.xgroup_create(stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _released(self, partition: int) -> bool:
+        """Партицию пора отдать: новые записи не начинаем, необработанные остаются в pending."""
+        return self._stopping.is_set() or partition in self._draining
+
+    async def _consume(self, partition: int) -> None:
+        stream = _stream_key(partition)
+        chains = _UserChains(settings.update_stream_batch)
+        try:
+            await self._ensure_group(stream)
+            await self._reclaim(stream, partition, chains)
+            while not self._released(partition):
+                await chains.wait_free()
+                try:
+                    response = await self.redis.xreadgroup(
+                        self.group,
+                        self.consumer,
+                        {stream: ">"},
+                        count=chains.free,
+                        block=settings.update_stream_block_ms,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error("XREADGROUP failed | stream=%s | %s", stream, e)
+                    await asyncio.sleep(1.0)
+                    continue
+                for entry_id, fields in (response[0][1] if response else []):
+                    self._submit(chains, partition, stream, entry_id, fields)
+            # Начатые записи дообрабатываем; ещё не начатые пропустят сами (_released).
+            await chains.join()
+        except asyncio.CancelledError:
+            await chains.cancel()
+            raise
+
+    def _submit(self, chains: _UserChains, partition: int, stream: str, entry_id: str, fields: Dict[str, str]) -> None:
+        async def run() -> None:
+            # Проверка между записями цепочки: при передаче партиции остаток остаётся в pending.
+            if not self._released(partition):
+                await self._process(stream, entry_id, fields)
+
+        chains.submit(fields.get(KEY_FIELD, ""), run)
+
+    async def _reclaim(self, stream: str, partition: int, chains: _UserChains) -> None:
+        """
+        Забирает неподтверждённые записи прежних владельцев партиции и обрабатывает
+        их до новых. Перехватываем только записи, простоявшие не меньше срока аренды:
+        прежний владелец мог получить их перед самой потерей аренды и всё ещё
+        выполнять. Пока у других consumer остаются pending, новые записи не читаем —
+        иначе свежий апдейт пользователя обогнал бы его же более ранний.
+        """
+        while not self._released(partition):
+            start = "0-0"
+            while True:
+                start, entries, *_ = await self.redis.xautoclaim(
+                    stream, self.group, self.consumer, min_idle_time=settings.update_stream_lease_ms,
+                    start_id=start, count=settings.update_stream_batch,
+                )
+                for entry_id, fields in entries:
+                    if self._released(partition):
+                        return
+                    if fields is None:  # запись уже вытеснена MAXLEN
+                        continue
+                    metrics.inc("updates.stream.reclaimed")
+                    await chains.wait_free()
+                    self._submit(chains, partition, stream, entry_id, fields)
+                if start == "0-0":
+                    break
+            if not await self._foreign_pending(stream):
+                break
+            await asyncio.sleep(settings.update_stream_block_ms / 1000)
+        await self._forget_idle_consumers(stream)
+
+    async def _foreign_pending(self, stream: str) -> bool:
+        summary = await self.redis.xpending(stream, self.group)
+        return any(
+            consumer["name"] != self.consumer and int(consumer["pending"])
+            for consumer in summary.get("consumers") or []
+        )
+
+    async def _forget_idle_consumers(self, stream: str) -> None:
+        """У каждого запуска воркера своё имя consumer — пустые старые удаляем из группы."""
+        try:
+            consumers = await self.redis.xinfo_consumers(stream, self.group)
+            for consumer in consumers:
+                if (
+                    consumer["name"] != self.consumer
+                    and consumer["pending"] == 0
+                    and consumer["idle"] > settings.update_stream_lease_ms
+                ):
+                    await self.redis.xgroup_delconsumer(stream, self.group, consumer["name"])
+        except ResponseError as e:
+            logger.warning("Consumer cleanup failed | stream=%s | %s", stream, e)
+
+    async def _process(self, stream: str, entry_id: str, fields: Dict[str, str]) -> None:
+        try:
+            produced_ms = int(str(entry_id).split("-", 1)[0])
+            metrics.observe("updates.stream.delay", max(0.0, time.time() - produced_ms / 1000))
+            update = json.loads(fields["update"])
+            await self.dp.feed_raw_update(self.bot, update)
+            metrics.inc("updates.stream.processed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            metrics.inc("updates.stream.failed")
+            logger.exception("Update processing failed | stream=%s | id=%s | %s", stream, entry_id, e)
+            if not await self._dead_letter(stream, entry_id, fields, e):
+                return
+        await self.redis.xack(stream, self.group, entry_id)
+
+    async def _dead_letter(self, stream: str, entry_id: str, fields: Dict[str, str], error: Exception) -> bool:
+        """
+        Переносит сбойный апдейт в стрим {prefix}:dead: оставленный в pending, он
+        вечно возвращался бы через reclaim, а просто подтверждённый — терялся бы.
+        Если перенести не удалось, запись остаётся неподтверждённой.
+        """
+        try:
+            await self.redis.xadd(
+                _dead_letter_key(),
+                {**fields, "stream": stream, "id": entry_id, "error": repr(error)[:500]},
+                maxlen=settings.update_stream_maxlen,
+                approximate=True,
+            )
+        except Exception as e:
+            logger.error("Failed to dead-letter update | stream=%s | id=%s | %s", stream, entry_id, e)
+            return False
+        metrics.inc("updates.stream.dead_lettered")
+        return True
+
+    async def _collect_lag(self) -> None:
+        """lag — ещё не прочитанные группой записи (Redis 7+), pending — прочитанные, но не подтверждённые."""
+        lag: Dict[str, Any] = {}
+        for partition in range(self.partitions):
+            stream = _stream_key(partition)
+            try:
+                groups = await self.redis.xinfo_groups(stream)
+            except ResponseError:
+                continue
+            for group in groups:
+                if group.get("name") == self.group:
+                    lag[str(partition)] = {"lag": group.get("lag"), "pending": group.get("pending")}
+        self._lag = lag
+
+
+async def run_worker(dp: Dispatcher, bot: Bot, redis: Redis) -> None:
+    """Воркер до SIGINT/SIGTERM."""
+    worker = UpdateStreamWorker(dp, bot, redis)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:  # Windows
+            pass
+    await worker.run()
+
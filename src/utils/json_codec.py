@@ -0,0 +1,91 @@
+import json
+import uuid
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime, time
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson — необязательное ускорение
+    orjson = None
+
+Converter = Callable[[Any], Any]
+
+# Конвертеры по базовому типу; подбираются по MRO и кэшируются на конкретный класс.
+_CONVERTERS: Dict[type, Converter] = {
+    Enum: lambda obj: obj.value,
+    BaseModel: lambda obj: obj.model_dump(mode="json"),
+    set: list,
+    frozenset: list,
+    datetime: lambda obj: obj.isoformat(),
+    date: lambda obj: obj.isoformat(),
+    time: lambda obj: obj.isoformat(),
+    uuid.UUID: str,
+}
+
+
+def _dataclass_to_dict(obj: Any) -> Dict[str, Any]:
+    # В отличие от asdict — без глубокого копирования: вложенные значения энкодер обойдёт сам.
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
+@lru_cache(maxsize=256)
+def _converter(cls: type) -> Optional[Converter]:
+    for base in cls.__mro__:
+        converter = _CONVERTERS.get(base)
+        if converter is not None:
+            return converter
+    if is_dataclass(cls):
+        return _dataclass_to_dict
+    return None
+
+
+def _default(obj: Any) -> Any:
+    """Вызывается энкодером только для типов, которые он не знает сам."""
+    converter = _converter(type(obj))
+    if converter is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return converter(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Сериализует тело запроса одним проходом энкодера, без предварительного обхода:
+    Enum -> value, pydantic -> model_dump, dataclass -> dict, set -> list, даты -> ISO.
+    С установленным orjson — через него, иначе stdlib json.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(content: bytes) -> Any:
+    """Разбирает тело ответа: с установленным orjson — через него, иначе stdlib json."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class LazyBody:
+    """
+    Тело для лога: строка собирается только если запись действительно пишется
+    (logging форматирует %s-аргументы лениво).
+    """
+
+    __slots__ = ("content", "limit")
+
+    def __init__(self, content: Optional[bytes], limit: int):
+        self.content = content
+        self.limit = limit
+
+    def __str__(self) -> str:
+        if self.content is None:
+            return "None"
+        text = self.content[: self.limit * 4].decode("utf-8", errors="replace")
+        return text if len(text) <= self.limit else text[: self.limit] + "…"
+
+    __repr__ = __str__
@@ -0,0 +1,27 @@
+import base64
+import json
+from functools import lru_cache
+from typing import Optional
+
+
+@lru_cache(maxsize=4096)
+def decode_exp(token: Optional[str]) -> Optional[float]:
+    """
+    Достаёт claim exp (unix time) из JWT без проверки подписи.
+    Подпись проверяет API, боту нужно только знать, когда токен протухнет.
+    Возвращает None, если токен не JWT или exp отсутствует.
+    """
+    if not token:
+        return None
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1]
+    try:
+        raw = base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        exp = json.loads(raw).get("exp")
+    except Exception:
+        return None
+    if isinstance(exp, (int, float)) and not isinstance(exp, bool):
+        return float(exp)
+    return None
@@ -0,0 +1,146 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import zlib
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config import settings
+from src.utils.metrics import metrics
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+# Служебные поля LogRecord; всё остальное из extra попадает в JSON как есть.
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listeners: List[QueueListener] = []
+# Трейсбек в текст — в потоке вызова, пока фреймы исключения ещё те самые.
+_EXC_FORMATTER = logging.Formatter()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Одна JSON-запись на строку: время (UTC), уровень, логгер, сообщение, extra, трейсбек."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Сэмплирует записи ниже WARNING, помеченные extra={"sample_key": ...}, по долям из
+    настроек для каждого логгера. Решение детерминировано по ключу: строки
+    «API →» и «API ←» одного req_id сохраняются или отбрасываются вместе.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name, 1.0)
+        if rate >= 1.0:
+            return True
+        if zlib.crc32(str(key).encode()) % 10000 < rate * 10000:
+            return True
+        metrics.inc("logs.sampled_out")
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Кладёт запись в очередь, не дожидаясь диска: JSON и запись в файл/консоль
+    выполняются в потоке QueueListener, а не в потоке event loop.
+
+    Очередь одна (порядок строк сохраняется) и не ограничена, но записи ниже WARNING
+    отбрасываются, когда в ней уже limit записей; WARNING и выше не теряются никогда.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]", limit: int):
+        super().__init__(log_queue)
+        self.limit = limit
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Как QueueHandler.prepare, но без форматирования: %-подстановку и трейсбек
+        # фиксируем сразу — args и фреймы ссылаются на объекты, которые меняются дальше.
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXC_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self.limit:
+            metrics.inc("logs.dropped")
+            return
+        self.queue.put_nowait(record)
+
+
+def _file_handler(log_file: Path) -> logging.Handler:
+    if settings.log_rotation == "time":
+        handler: logging.Handler = TimedRotatingFileHandler(
+            log_file, when=settings.log_rotate_when, backupCount=settings.log_backup_count, encoding="utf-8"
+        )
+    else:
+        handler = RotatingFileHandler(
+            log_file, maxBytes=settings.log_max_bytes, backupCount=settings.log_backup_count, encoding="utf-8"
+        )
+    handler.setFormatter(JsonLinesFormatter())
+    return handler
+
+
+def setup_logging(log_dir: Path, level: Optional[int] = None) -> None:
+    """
+    Пайплайн логов: QueueHandler на root-логгере -> QueueListener (отдельный поток)
+    -> консоль (текст) и файл bot.log (JSON lines с ротацией по размеру или времени).
+    """
+    if _listeners:
+        return
+    level = level if level is not None else getattr(logging, settings.log_level, logging.INFO)
+    log_dir.mkdir(exist_ok=True)
+
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = (console, _file_handler(log_dir / "bot.log"))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    queue_handler = NonBlockingQueueHandler(log_queue, settings.log_queue_size)
+    queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    metrics.register("logging", lambda: {"queued": log_queue.qsize()})
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописывает всё, что осталось в очередях, и останавливает потоки записи."""
+    while _listeners:
+        _listeners.pop().stop()
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+Collector = Callable[[], Dict[str, Any]]
+
+# Границы бакетов латентности, секунды.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Гистограмма с фиксированными бакетами; перцентили — по верхней границе бакета."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b:g}" for b in self.buckets] + ["+Inf"]
+        # inf — не JSON: перцентиль за последним бакетом подписываем как сам бакет.
+        percentiles = {f"p{round(q * 100)}": self.quantile(q) for q in (0.5, 0.95, 0.99)}
+        return {
+            "count": self.count,
+            "avg": round(self.sum / self.count, 4) if self.count else None,
+            **{name: "+Inf" if value == float("inf") else value for name, value in percentiles.items()},
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class Metrics:
+    """
+    In-process метрики бота:
+    - счётчики (inc) для событий вроде коалесценции refresh;
+    - гистограммы (observe/timer) для латентностей;
+    - коллекторы — функции, отдающие снимок состояния компонента (пулы, кэши).
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, int] = defaultdict(int)
+        self._collectors: Dict[str, Collector] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: int = 1) -> None:
+        self._counters[name] += value
+
+    def get(self, name: str) -> int:
+        return self._counters.get(name, 0)
+
+    def observe(self, name: str, value: float) -> None:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = Histogram()
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Пишет длительность блока (в том числе завершившегося ошибкой) в гистограмму name."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def register(self, name: str, collector: Collector) -> None:
+        self._collectors[name] = collector
+
+    def snapshot(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "counters": dict(self._counters),
+            "histograms": {name: h.snapshot() for name, h in self._histograms.items()},
+        }
+        for name, collector in self._collectors.items():
+            try:
+                data[name] = collector()
+            except Exception as e:
+                data[name] = {"error": str(e)}
+        return data
+
+    async def log_periodically(self, interval: float) -> None:
+        """Пишет снимок в лог раз в interval секунд — когда снять его через /metrics нельзя (polling)."""
+        while True:
+            await asyncio.sleep(interval)
+            logger.info("Metrics: %s", self.snapshot())
+
+
+# Global instance
+metrics = Metrics()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import signal
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+from src.config import settings
+from src.database.redis_client import redis_client
+from src.utils.json_codec import dumps
+from src.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+async def healthz(request: web.Request) -> web.Response:
+    """
+    Проба для балансировщика: процесс жив и принимает апдейты.
+    Недоступный Redis не выводит реплику из ротации — бот работает в degraded mode.
+    """
+    body: Dict[str, Any] = {"status": "ok", "mode": "webhook", "redis": redis_client.health()}
+    return web.json_response(body)
+
+
+async def metrics_view(request: web.Request) -> web.Response:
+    """Снимок in-process метрик реплики: счётчики, гистограммы, состояние пулов и кэшей."""
+    return web.Response(body=dumps(metrics.snapshot()), content_type="application/json")
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot, handle_in_background: bool = True) -> web.Application:
+    """
+    Публичное aiohttp-приложение: только POST webhook_path. Он проверяет
+    X-Telegram-Bot-Api-Secret-Token, сразу отвечает 200 и обрабатывает апдейт
+    в фоне тем же Dispatcher.
+    handle_in_background=False — ответ только после обработки (ингестору: после записи в стрим).
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=handle_in_background,
+        secret_token=settings.webhook_secret,
+    ).register(app, path=settings.webhook_path)
+    return app
+
+
+def create_internal_app() -> web.Application:
+    """
+    Служебное приложение без авторизации: health-проба и метрики реплики. Слушает
+    отдельный адрес (webhook_internal_host/port), который не публикуется наружу.
+    """
+    app = web.Application()
+    app.router.add_get(settings.webhook_health_path, healthz)
+    app.router.add_get(settings.webhook_metrics_path, metrics_view)
+    return app
+
+
+async def run_webhook(
+    dp: Dispatcher,
+    bot: Bot,
+    allowed_updates: Optional[List[str]] = None,
+    handle_in_background: bool = True,
+) -> None:
+    """
+    Поднимает публичный и служебный HTTP-серверы, регистрирует webhook и ждёт SIGINT/SIGTERM.
+    allowed_updates по умолчанию берутся из роутеров dp (ингестору их передают явно).
+    """
+    if not settings.webhook_url or not settings.webhook_secret:
+        raise ValueError("WEBHOOK_URL and WEBHOOK_SECRET are required when BOT_MODE=webhook")
+
+    runners: List[web.AppRunner] = []
+    for app, host, port in (
+        (create_webhook_app(dp, bot, handle_in_background), settings.webhook_host, settings.webhook_port),
+        (create_internal_app(), settings.webhook_internal_host, settings.webhook_internal_port),
+    ):
+        runner = web.AppRunner(app)
+        await runner.setup()
+        runners.append(runner)
+        await web.TCPSite(runner, host=host, port=port).start()
+
+    url = settings.webhook_url.rstrip("/") + settings.webhook_path
+    # Реплики за балансировщиком выставляют один и тот же URL — вызов идемпотентен.
+    await bot.set_webhook(
+        url,
+        secret_token=settings.webhook_secret,
+        allowed_updates=allowed_updates if allowed_updates is not None else dp.resolve_used_update_types(),
+        max_connections=settings.webhook_max_connections,
+    )
+    logger.info(
+        "Webhook server started | listen=%s:%s | internal=%s:%s | url=%s",
+        settings.webhook_host, settings.webhook_port,
+        settings.webhook_internal_host, settings.webhook_internal_port, url,
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        logger.info("Stopping webhook server...")
+        await _release_webhook(bot, url)
+        for runner in reversed(runners):
+            await runner.cleanup()
+
+
+async def _release_webhook(bot: Bot, url: str) -> None:
+    """
+    Снимает webhook, только если так настроено (одна реплика): остальные реплики
+    выставляют его лишь при старте и без него перестали бы получать апдейты.
+    """
+    if not settings.webhook_delete_on_shutdown:
+        logger.info("Webhook left registered for other replicas | url=%s", url)
+        return
+    try:
+        await bot.delete_webhook()
+        logger.info("Webhook deleted | url=%s", url)
+    except Exception as e:
+        logger.error("Failed to delete webhook | url=%s | error=%s", url, e)
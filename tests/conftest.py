@@ -0,0 +1,4 @@
+import os
+
+# Settings требуют BOT_TOKEN; тестам хватает фиктивного.
+os.environ.setdefault("BOT_TOKEN", "123456:ABCdefGhIJKlmnoPQRsTUVwxyZ12345678")
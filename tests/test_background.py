@@ -0,0 +1,33 @@
+"""Реестр фоновых задач: учёт упавших и при остановке — дозавершение успевающих и отмена остальных."""
+import asyncio
+
+from src.services.background import BackgroundTasks
+from src.utils.metrics import metrics
+
+
+def test_shutdown_waits_then_cancels():
+    tasks = BackgroundTasks("test_shutdown")
+    finished = []
+
+    async def work(delay: float, name: str):
+        await asyncio.sleep(delay)
+        finished.append(name)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        tasks.spawn(work(0.01, "fast"))
+        slow = tasks.spawn(work(10, "slow"))
+        tasks.spawn(fail())
+        await tasks.shutdown(timeout=0.1)
+        return slow, tasks.stats()
+
+    slow, stats = asyncio.run(scenario())
+
+    assert finished == ["fast"]
+    assert slow.cancelled()
+    assert stats == {"running": 0}
+    assert metrics.get("background.test_shutdown.started") == 3
+    assert metrics.get("background.test_shutdown.failed") == 1
+    assert metrics.get("background.test_shutdown.cancelled") == 1
@@ -0,0 +1,169 @@
+"""
+Ранний ответ на нажатие: подтверждение до очереди в полосу пользователя,
+ограничение фонового продолжения по времени, передача его ошибок в errors-роутеры
+и answer() уже подтверждённого нажатия.
+"""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.filters import ExceptionTypeFilter
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+from aiogram.types import CallbackQuery, Chat, ErrorEvent, Message, Update, User
+
+from src.config import settings
+from src.keyboards.callbacks import CallbackSchema
+from src.middlewares import callback_ack, callback_tasks, setup_middlewares
+from src.middlewares.callback_ack import FAILED_TEXT
+from src.routes.indexed_router import IndexedRouter
+from src.utils.metrics import metrics
+
+TOKEN = "123456:ABCdefGhIJKlmnoPQRsTUVwxyZ12345678"
+USER_ID = 7
+
+
+@dataclass(frozen=True)
+class Ping(CallbackSchema, pattern="ping:{n}"):
+    n: int
+
+
+class RecordingSession(BaseSession):
+    """Сессия Bot API без сети: запоминает вызовы и на всё отвечает True."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: List[Any] = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls.append(method)
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+    def sent(self, method_type) -> List[Any]:
+        return [call for call in self.calls if isinstance(call, method_type)]
+
+
+def press(n: int) -> Update:
+    chat = Chat(id=USER_ID, type="private")
+    return Update(
+        update_id=n,
+        callback_query=CallbackQuery(
+            id=str(n),
+            from_user=User(id=USER_ID, is_bot=False, first_name="u"),
+            chat_instance="c",
+            data=Ping(n=n).pack(),
+            message=Message(message_id=1, date=datetime.now(), chat=chat, text="list"),
+        ),
+    )
+
+
+def make_dispatcher(handler, ack: Any = "ok") -> Dispatcher:
+    router = IndexedRouter()
+    router.callback_query.middleware(callback_ack)
+    router.callback_query.register(handler, Ping, flags={"ack": ack})
+    dp = Dispatcher()
+    dp.include_router(router)
+    setup_middlewares(dp)
+    return dp
+
+
+def run(scenario) -> RecordingSession:
+    """scenario(bot, session); затем ждёт фоновые продолжения нажатий."""
+    session = RecordingSession()
+
+    async def main():
+        await scenario(Bot(TOKEN, session=session), session)
+        await callback_tasks.shutdown(timeout=2)
+
+    asyncio.run(main())
+    return session
+
+
+def feed(dp: Dispatcher, n: int = 1):
+    return lambda bot, session: dp.feed_update(bot, press(n))
+
+
+def test_press_is_acked_before_the_lane_frees_up():
+    release = asyncio.Event()
+    handled = []
+
+    async def ping(callback: CallbackQuery, callback_data: Ping):
+        handled.append(callback_data.n)
+        if callback_data.n == 1:
+            await release.wait()
+
+    dp = make_dispatcher(ping)
+    acked_while_busy = []
+
+    async def scenario(bot: Bot, session: RecordingSession):
+        first = asyncio.create_task(dp.feed_update(bot, press(1)))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(dp.feed_update(bot, press(2)))
+        await asyncio.sleep(0.01)
+        # Продолжение первого нажатия держит полосу, второе уже подтверждено, но ждёт.
+        acked_while_busy.extend(call.callback_query_id for call in session.sent(AnswerCallbackQuery))
+        acked_while_busy.append(list(handled))
+        release.set()
+        await asyncio.gather(first, second)
+
+    session = run(scenario)
+
+    assert acked_while_busy == ["1", "2", [1]]
+    assert handled == [1, 2]
+    assert [call.text for call in session.sent(AnswerCallbackQuery)] == ["ok", "ok"]
+
+
+def test_slow_continuation_is_cut_by_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "callback_task_timeout", 0.05)
+    finished = []
+
+    async def ping(callback: CallbackQuery, callback_data: Ping):
+        await asyncio.sleep(1)
+        finished.append(callback_data.n)
+
+    failed = metrics.get("callbacks.background.failed")
+    session = run(feed(make_dispatcher(ping)))
+
+    assert finished == []
+    assert [(call.chat_id, call.text) for call in session.sent(SendMessage)] == [(USER_ID, FAILED_TEXT)]
+    assert metrics.get("callbacks.background.failed") == failed + 1
+
+
+def test_continuation_errors_reach_errors_router():
+    caught = []
+
+    async def ping(callback: CallbackQuery, callback_data: Ping):
+        raise RuntimeError("api failed")
+
+    dp = make_dispatcher(ping)
+
+    @dp.errors(ExceptionTypeFilter(RuntimeError))
+    async def on_error(event: ErrorEvent):
+        caught.append((event.update.update_id, str(event.exception)))
+
+    session = run(feed(dp))
+
+    assert caught == [(1, "api failed")]
+    assert session.sent(SendMessage) == []
+
+
+def test_answer_after_ack_turns_alert_into_message():
+    async def ping(callback: CallbackQuery, callback_data: Ping):
+        await callback.answer("ok")
+        await callback.answer("Другой тост")
+        await callback.answer("Задача не найдена", show_alert=True)
+
+    dropped = metrics.get("callbacks.toast_dropped")
+    session = run(feed(make_dispatcher(ping)))
+
+    assert [call.text for call in session.sent(AnswerCallbackQuery)] == ["ok"]
+    assert [(call.chat_id, call.text) for call in session.sent(SendMessage)] == [(USER_ID, "Задача не найдена")]
+    assert metrics.get("callbacks.toast_dropped") == dropped + 1
@@ -0,0 +1,70 @@
+"""
+Кэш категорий: список, загруженный из API до мутации, не перезаписывает
+инвалидацию, случившуюся, пока запрос был в полёте.
+"""
+import asyncio
+
+import httpx
+from fakeredis import aioredis
+
+from src.database.redis_client import RedisClient
+from src.services import categories_api
+from src.services.categories_api import CategoriesAPI
+from src.services.http_client import BotHttpClient
+
+USER_ID = 42
+
+
+def make_redis() -> RedisClient:
+    client = RedisClient()
+    client.redis = aioredis.FakeRedis(decode_responses=True)
+    client._up.set()
+    return client
+
+
+def test_fill_started_before_invalidation_is_rejected(monkeypatch):
+    redis = make_redis()
+    names = ["work"]
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        listed = [{"id": i, "name": name} for i, name in enumerate(names, 1)]
+        if len(names) == 1:
+            # Пока ответ «в пути», пользователь создал категорию на другой реплике.
+            names.append("home")
+            await redis.delete_user_categories(USER_ID)
+        return httpx.Response(200, json=listed)
+
+    api = BotHttpClient(base_url="http://api.test/api/v1")
+    api._http = httpx.AsyncClient(base_url=api.base_url, transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(categories_api, "redis_client", redis)
+    monkeypatch.setattr(categories_api, "client", api)
+
+    async def scenario():
+        stale = await CategoriesAPI.list(USER_ID)
+        cached_after_stale = await redis.get_user_categories(USER_ID)
+        fresh = await CategoriesAPI.list(USER_ID)
+        cached_after_fresh = await redis.get_user_categories(USER_ID)
+        await api.close()
+        return stale, cached_after_stale, fresh, cached_after_fresh
+
+    stale, cached_after_stale, fresh, cached_after_fresh = asyncio.run(scenario())
+
+    assert [c["name"] for c in stale] == ["work"]
+    assert cached_after_stale is None
+    assert [c["name"] for c in fresh] == ["work", "home"]
+    assert cached_after_fresh == fresh
+
+
+def test_index_by_id_is_filled_with_the_list():
+    redis = make_redis()
+
+    async def scenario():
+        generation = await redis.get_categories_generation(USER_ID)
+        stored = await redis.set_user_categories(USER_ID, [{"id": 3, "name": "work"}], generation)
+        return stored, await redis.get_user_category(USER_ID, 3), await redis.get_user_category(USER_ID, 4)
+
+    stored, known, missing = asyncio.run(scenario())
+
+    assert stored is True
+    assert known == (True, {"id": 3, "name": "work"})
+    assert missing == (True, None)
@@ -0,0 +1,142 @@
+"""
+Условные GET против API-заглушки на httpx.MockTransport: 304 отдаёт тело из
+кэша валидаторов, а после записи новый ETag приводит к полному ответу.
+"""
+import asyncio
+import json
+from typing import List
+
+import httpx
+
+from src.services.http_client import BotHttpClient
+from src.utils.metrics import metrics
+
+USER_ID = 42
+
+
+class StubTasksAPI:
+    """Одна задача с версией: ETag меняется при каждом PATCH."""
+
+    def __init__(self):
+        self.title = "first"
+        self.version = 1
+        self.requests: List[httpx.Request] = []
+
+    @property
+    def etag(self) -> str:
+        return f'"v{self.version}"'
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.method == "PATCH":
+            self.title = json.loads(request.content)["title"]
+            self.version += 1
+            return httpx.Response(200, json={"id": 1, "title": self.title})
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304, headers={"etag": self.etag})
+        return httpx.Response(200, json={"id": 1, "title": self.title}, headers={"etag": self.etag})
+
+
+def make_client(api: StubTasksAPI) -> BotHttpClient:
+    client = BotHttpClient(base_url="http://api.test/api/v1")
+    client._http = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(api.handle))
+    return client
+
+
+def test_not_modified_reuses_cached_body():
+    api = StubTasksAPI()
+    client = make_client(api)
+    not_modified = metrics.get("http.conditional.not_modified")
+
+    async def scenario():
+        first = await client.request(USER_ID, "GET", "/tasks/1")
+        second = await client.request(USER_ID, "GET", "/tasks/1")
+        await client.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert "if-none-match" not in api.requests[0].headers
+    assert api.requests[1].headers["if-none-match"] == '"v1"'
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"id": 1, "title": "first"}
+    assert metrics.get("http.conditional.not_modified") == not_modified + 1
+
+
+def test_write_invalidates_cached_body():
+    api = StubTasksAPI()
+    client = make_client(api)
+
+    async def scenario():
+        await client.request(USER_ID, "GET", "/tasks/1")
+        await client.request(USER_ID, "PATCH", "/tasks/1", json={"title": "second"})
+        after_write = await client.request(USER_ID, "GET", "/tasks/1")
+        cached = await client.request(USER_ID, "GET", "/tasks/1")
+        await client.close()
+        return after_write, cached
+
+    after_write, cached = asyncio.run(scenario())
+
+    # Запрос после записи ушёл со старым ETag и получил полное новое тело.
+    assert api.requests[2].headers["if-none-match"] == '"v1"'
+    assert after_write.json() == {"id": 1, "title": "second"}
+    # Дальше в кэше уже новая версия.
+    assert api.requests[3].headers["if-none-match"] == '"v2"'
+    assert cached.json() == {"id": 1, "title": "second"}
+
+
+def test_unconditional_request_skips_validators():
+    api = StubTasksAPI()
+    client = make_client(api)
+
+    async def scenario():
+        await client.request(USER_ID, "GET", "/tasks/1")
+        resp = await client.request(USER_ID, "GET", "/tasks/1", conditional=False)
+        await client.close()
+        return resp
+
+    resp = asyncio.run(scenario())
+
+    assert "if-none-match" not in api.requests[1].headers
+    assert resp.json() == {"id": 1, "title": "first"}
+
+
+def test_unconditional_request_does_not_join_conditional_one():
+    api = StubTasksAPI()
+    client = make_client(api)
+
+    async def scenario():
+        await client.request(USER_ID, "GET", "/tasks/1")
+        # Обычный и принудительный GET одновременно: второй не должен получить ответ первого.
+        revalidated, forced = await asyncio.gather(
+            client.request(USER_ID, "GET", "/tasks/1"),
+            client.request(USER_ID, "GET", "/tasks/1", conditional=False),
+        )
+        await client.close()
+        return revalidated, forced
+
+    revalidated, forced = asyncio.run(scenario())
+
+    sent = [request.headers.get("if-none-match") for request in api.requests[1:]]
+    assert sorted(sent, key=str) == ['"v1"', None]
+    assert revalidated.json() == forced.json() == {"id": 1, "title": "first"}
+
+
+def test_coalesced_callers_get_their_own_body():
+    api = StubTasksAPI()
+    client = make_client(api)
+
+    async def scenario():
+        first, second = await asyncio.gather(
+            client.request(USER_ID, "GET", "/tasks/1"),
+            client.request(USER_ID, "GET", "/tasks/1"),
+        )
+        await client.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert len(api.requests) == 1
+    body = first.json()
+    body["title"] = "changed by caller"
+    assert second.json() == first.json() == {"id": 1, "title": "first"}
@@ -0,0 +1,97 @@
+"""
+CallbackTrie и IndexedRouter: литеральный сегмент раньше поля, хендлеры с
+несколькими схемами, строки, которые схема не разбирает, и обычная семантика
+aiogram (фильтры, SkipHandler) для отобранных кандидатов.
+"""
+import asyncio
+
+from aiogram import Router
+from aiogram.dispatcher.event.bases import UNHANDLED, SkipHandler
+from aiogram.types import CallbackQuery, User
+
+from src.keyboards.callbacks import (
+    CategoryFilterNone,
+    CategoryFilterSet,
+    GroupInfo,
+    GroupMore,
+    PriorityFilterOpen,
+    QuickFilter,
+    TaskEditCategorySet,
+    TaskOpen,
+)
+from src.routes.indexed_router import CallbackTrie, IndexedRouter
+
+
+def trie_of(*schemas) -> CallbackTrie:
+    """Индекс, где «хендлер» схемы — её имя."""
+    trie = CallbackTrie()
+    for schema in schemas:
+        trie.add(schema, schema.__name__)
+    return trie
+
+
+def test_literal_segment_wins_over_field():
+    trie = trie_of(GroupMore, GroupInfo, QuickFilter, PriorityFilterOpen)
+
+    # tl:grp:info:more подходит обеим схемам групп: литерал info проверяется раньше поля.
+    assert [(h, d) for h, d in trie.resolve("tl:grp:info:more")] == [
+        ("GroupInfo", GroupInfo("more")),
+        ("GroupMore", GroupMore("info")),
+    ]
+    assert [h for h, _ in trie.resolve("tl:f:prio")] == ["PriorityFilterOpen"]
+    assert [d for _, d in trie.resolve("tl:f:urgent")] == [QuickFilter("urgent")]
+
+
+def test_strings_the_schema_does_not_parse_have_no_candidates():
+    trie = trie_of(TaskOpen, QuickFilter, TaskEditCategorySet)
+
+    assert list(trie.resolve("tl:open:abc")) == []
+    assert list(trie.resolve("tl:open:1:2")) == []
+    assert list(trie.resolve("tl:f:weekly")) == []
+    assert [d for _, d in trie.resolve("task:edit:cat:set:5:none")] == [TaskEditCategorySet(5, None)]
+
+
+def callback(data: str) -> CallbackQuery:
+    return CallbackQuery(id="1", from_user=User(id=1, is_bot=False, first_name="u"), chat_instance="c", data=data)
+
+
+def dispatch(router: Router, data: str):
+    return asyncio.run(router.propagate_event("callback_query", callback(data)))
+
+
+def test_handler_with_several_schemas_gets_the_matching_one():
+    router = IndexedRouter()
+
+    @router.callback_query(CategoryFilterSet, CategoryFilterNone)
+    async def apply(callback: CallbackQuery, callback_data):
+        return callback_data
+
+    assert dispatch(router, "tl:f:cat:set:5") == CategoryFilterSet(5)
+    assert dispatch(router, "tl:f:cat:none") == CategoryFilterNone()
+    assert dispatch(router, "tl:f:cat:set:x") is UNHANDLED
+
+
+def test_candidates_keep_aiogram_semantics():
+    router = IndexedRouter()
+    calls = []
+
+    @router.callback_query(GroupInfo)
+    async def info(callback: CallbackQuery, callback_data: GroupInfo):
+        calls.append("info")
+        raise SkipHandler()
+
+    @router.callback_query(GroupMore, lambda c: c.data != "tl:grp:done:more")
+    async def more(callback: CallbackQuery, callback_data: GroupMore):
+        calls.append("more")
+        return callback_data.group
+
+    @router.callback_query()
+    async def fallback(callback: CallbackQuery):
+        calls.append("fallback")
+        return "fallback"
+
+    assert dispatch(router, "tl:grp:info:more") == "info"
+    assert dispatch(router, "tl:grp:done:more") == "fallback"
+    assert calls == ["info", "more", "fallback"]
+    # Вне trigger observer отдаёт все хендлеры — по ним aiogram собирает allowed_updates.
+    assert len(router.callback_query.handlers) == 3
@@ -0,0 +1,53 @@
+"""Очередь логов: запись фиксируется в момент вызова, при переполнении теряются только записи ниже WARNING."""
+import logging
+import queue
+
+from src.utils.log_setup import NonBlockingQueueHandler
+from src.utils.metrics import metrics
+
+
+def make_logger(limit: int):
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    logger = logging.getLogger(f"test.log_setup.{limit}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [NonBlockingQueueHandler(log_queue, limit)]
+    return logger, log_queue
+
+
+def drain(log_queue: "queue.Queue[logging.LogRecord]"):
+    records = []
+    while not log_queue.empty():
+        records.append(log_queue.get_nowait())
+    return records
+
+
+def test_message_is_rendered_when_logged():
+    logger, log_queue = make_logger(limit=10)
+    payload = {"title": "first"}
+
+    logger.info("payload=%s", payload)
+    payload["title"] = "changed after logging"
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+
+    info, error = drain(log_queue)
+    assert info.getMessage() == "payload={'title': 'first'}"
+    assert info.args is None
+    assert error.exc_info is None
+    assert "ValueError: boom" in error.exc_text
+
+
+def test_overflow_drops_only_records_below_warning():
+    logger, log_queue = make_logger(limit=2)
+    dropped = metrics.get("logs.dropped")
+
+    for i in range(3):
+        logger.info("info %s", i)
+    logger.warning("warning")
+    logger.error("error")
+
+    assert [r.getMessage() for r in drain(log_queue)] == ["info 0", "info 1", "warning", "error"]
+    assert metrics.get("logs.dropped") == dropped + 1
@@ -0,0 +1,102 @@
+"""
+MessageRenderer: правки только клавиатуры, пропуск неизменённого экрана по
+стабильному отпечатку и forget после правки в обход.
+"""
+import asyncio
+import re
+from datetime import datetime
+from typing import Any, List
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText
+from aiogram.types import Chat, InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from src.services import message_render
+from src.services.message_render import MessageRenderer
+from src.services.render_coalescer import RenderCoalescer
+
+TOKEN = "123456:ABCdefGhIJKlmnoPQRsTUVwxyZ12345678"
+CHAT_ID = 7
+
+
+class EditingSession(BaseSession):
+    """Сессия Bot API без сети: правки возвращают изменённое сообщение, как Telegram (текст без разметки)."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: List[Any] = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls.append(method)
+        text = re.sub(r"<[^>]+>", "", getattr(method, "text", None) or "list")
+        return Message(
+            message_id=method.message_id, date=datetime.now(), chat=Chat(id=CHAT_ID, type="private"),
+            text=text, reply_markup=method.reply_markup,
+        ).as_(bot)
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+def keyboard(label: str) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup(inline_keyboard=[[InlineKeyboardButton(text=label, callback_data=label)]])
+
+
+def message(bot: Bot, text: str = "list", markup: InlineKeyboardMarkup = None) -> Message:
+    return Message(
+        message_id=1, date=datetime.now(), chat=Chat(id=CHAT_ID, type="private"), text=text, reply_markup=markup
+    ).as_(bot)
+
+
+def test_edits_skip_unchanged_screen_and_markup():
+    session = EditingSession()
+
+    async def scenario():
+        bot = Bot(TOKEN, session=session)
+        renderer = MessageRenderer(size=10)
+        shown = message(bot)
+        await renderer.edit(shown, "<b>Задачи</b>", keyboard("a"))
+        # Telegram вернул сообщение без разметки; callback следующего нажатия несёт его же.
+        shown = message(bot, "Задачи", keyboard("a"))
+        await renderer.edit(shown, "<b>Задачи</b>", keyboard("a"))
+        await renderer.edit_markup(shown, keyboard("a"))
+        await renderer.edit_markup(shown, keyboard("b"))
+        await renderer.edit_markup(message(bot, "Задачи", keyboard("b")), None)
+
+    asyncio.run(scenario())
+
+    assert [type(call) for call in session.calls] == [EditMessageText, EditMessageReplyMarkup, EditMessageReplyMarkup]
+    assert session.calls[2].reply_markup is None
+
+
+def test_forget_drops_record_and_pending_render(monkeypatch):
+    coalescer = RenderCoalescer(window=0.01, max_delay=0.05)
+    monkeypatch.setattr(message_render, "render_coalescer", coalescer)
+    session = EditingSession()
+    rendered = []
+
+    async def scenario():
+        bot = Bot(TOKEN, session=session)
+        renderer = MessageRenderer(size=10)
+        await renderer.edit(message(bot), "card", None)
+
+        async def render():
+            rendered.append("deferred")
+
+        coalescer.schedule(message(bot), CHAT_ID, render)
+        renderer.forget(CHAT_ID, 1)
+        await asyncio.sleep(0.05)
+        return dict(renderer._rendered)
+
+    assert asyncio.run(scenario()) == {}
+    assert rendered == []
+
+
+def test_fingerprint_does_not_depend_on_hash_seed():
+    # hash() строк меняется от процесса к процессу (PYTHONHASHSEED), отпечаток — нет.
+    shown = Message(message_id=1, date=datetime(2025, 1, 1), chat=Chat(id=1, type="private"), text="list")
+    assert message_render._shown(shown).hex() == "19b0743c1e653dd2"
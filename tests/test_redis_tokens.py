@@ -0,0 +1,111 @@
+"""
+Токены в Redis на fakeredis: перенос legacy-ключей в хэш (в том числе проигрыш
+compare-and-set параллельной записи) и сброс записей degraded mode после восстановления.
+"""
+import asyncio
+
+from fakeredis import aioredis
+
+from src.database.redis_client import RedisClient
+from src.utils.metrics import metrics
+
+USER_ID = 42
+
+
+def make_client() -> RedisClient:
+    """Клиент на fakeredis, Redis «доступен»; фоновые задачи connect() не запускаются."""
+    client = RedisClient()
+    client.redis = aioredis.FakeRedis(decode_responses=True)
+    client._up.set()
+    return client
+
+
+async def put_legacy(client: RedisClient, user_id: int, access: str, refresh: str) -> None:
+    await client.redis.set(client._key_access(user_id), access)
+    await client.redis.set(client._key_refresh(user_id), refresh)
+
+
+def test_read_migrates_legacy_pair():
+    client = make_client()
+
+    async def scenario():
+        await put_legacy(client, USER_ID, "old-access", "old-refresh")
+        tokens = await client.get_user_tokens(USER_ID)
+        stored = await client.redis.hgetall(client._key_tokens(USER_ID))
+        legacy = await client.redis.exists(client._key_access(USER_ID), client._key_refresh(USER_ID))
+        return tokens, stored, legacy
+
+    tokens, stored, legacy = asyncio.run(scenario())
+
+    assert tokens == ("old-access", "old-refresh")
+    assert stored == {"access": "old-access", "refresh": "old-refresh"}
+    assert legacy == 0
+
+
+def test_migration_loses_to_concurrent_write():
+    client = make_client()
+    read_legacy = client.redis.mget
+    skipped = metrics.get("redis.tokens.migration_skipped")
+
+    async def mget_then_login(*keys):
+        # Между чтением legacy-пары и переносом пользователь успел войти заново.
+        values = await read_legacy(*keys)
+        await client.set_user_tokens(USER_ID, "new-access", "new-refresh")
+        return values
+
+    async def scenario():
+        await put_legacy(client, USER_ID, "old-access", "old-refresh")
+        client.redis.mget = mget_then_login
+        tokens = await client.get_user_tokens(USER_ID, use_cache=False)
+        stored = await client.redis.hgetall(client._key_tokens(USER_ID))
+        return tokens, stored
+
+    tokens, stored = asyncio.run(scenario())
+
+    assert tokens == ("new-access", "new-refresh")
+    assert stored == {"access": "new-access", "refresh": "new-refresh"}
+    assert metrics.get("redis.tokens.migration_skipped") == skipped + 1
+
+
+def test_background_migration_moves_every_legacy_pair():
+    client = make_client()
+
+    async def scenario():
+        for user_id in range(1, 6):
+            await put_legacy(client, user_id, f"a{user_id}", f"r{user_id}")
+        migrated = await client.migrate_legacy_tokens()
+        pairs = [await client.redis.hmget(client._key_tokens(u), "access", "refresh") for u in range(1, 6)]
+        return migrated, pairs, await client.redis.keys("*_token")
+
+    migrated, pairs, legacy_keys = asyncio.run(scenario())
+
+    assert migrated == 5
+    assert pairs == [[f"a{u}", f"r{u}"] for u in range(1, 6)]
+    assert legacy_keys == []
+
+
+def test_degraded_writes_flush_after_reconnect():
+    client = make_client()
+
+    async def scenario():
+        await client.set_user_tokens(7, "stale-access", "stale-refresh")
+        client._up.clear()
+        stored_while_down = await client.set_user_tokens(USER_ID, "access", "refresh")
+        deleted_while_down = await client.delete_user_tokens(7)
+        seen_while_down = await client.get_user_tokens(USER_ID, use_cache=False)
+        pending = dict(client._dirty)
+
+        client._up.set()
+        await client._flush_fallback()
+        stored = await client.redis.hgetall(client._key_tokens(USER_ID))
+        deleted = await client.redis.exists(client._key_tokens(7))
+        return stored_while_down, deleted_while_down, seen_while_down, pending, stored, deleted
+
+    stored_while_down, deleted_while_down, seen_while_down, pending, stored, deleted = asyncio.run(scenario())
+
+    assert stored_while_down is False and deleted_while_down is False
+    assert seen_while_down == ("access", "refresh")
+    assert pending == {USER_ID: ("access", "refresh"), 7: (None, None)}
+    assert stored == {"access": "access", "refresh": "refresh"}
+    assert deleted == 0
+    assert client._dirty == {}
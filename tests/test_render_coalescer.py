@@ -0,0 +1,136 @@
+"""
+Отложенная перерисовка: выполняется в полосе пользователя, читает профиль из FSM
+в момент срабатывания и отбрасывается любой правкой сообщения.
+"""
+import asyncio
+from datetime import datetime
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from src.middlewares import UpdateSchedulerMiddleware
+from src.routes import tasks
+from src.services import message_render
+from src.services.message_render import MessageRenderer
+from src.services.render_coalescer import RenderCoalescer
+from src.utils.metrics import metrics
+
+USER_ID = 7
+WINDOW = 0.01
+
+
+def message(text: str = "list") -> Message:
+    return Message(message_id=1, date=datetime.now(), chat=Chat(id=USER_ID, type="private"), text=text)
+
+
+def make_coalescer() -> RenderCoalescer:
+    return RenderCoalescer(window=WINDOW, max_delay=WINDOW * 5)
+
+
+async def settle() -> None:
+    await asyncio.sleep(WINDOW * 5)
+
+
+def test_render_waits_for_the_users_lane():
+    events = []
+
+    async def scenario():
+        scheduler = UpdateSchedulerMiddleware(concurrency=4)
+        coalescer = make_coalescer()
+        coalescer.bind(scheduler.run)
+        release = asyncio.Event()
+
+        async def handler(event, data):
+            events.append("update started")
+            await release.wait()
+            events.append("update finished")
+
+        async def render():
+            events.append("render")
+
+        user = User(id=USER_ID, is_bot=False, first_name="u")
+        update = asyncio.create_task(scheduler(handler, None, {"event_from_user": user}))
+        await asyncio.sleep(0)
+        coalescer.schedule(message(), USER_ID, render)
+        await settle()
+        blocked = list(events)
+        release.set()
+        await update
+        await settle()
+        return blocked
+
+    assert asyncio.run(scenario()) == ["update started"]
+    assert events == ["update started", "update finished", "render"]
+
+
+def test_profile_is_read_when_render_fires(monkeypatch):
+    coalescer = make_coalescer()
+    monkeypatch.setattr(tasks, "render_coalescer", coalescer)
+    seen = []
+
+    async def scenario():
+        state = FSMContext(MemoryStorage(), StorageKey(bot_id=1, chat_id=USER_ID, user_id=USER_ID))
+        callback = CallbackQuery(
+            id="1", from_user=User(id=USER_ID, is_bot=False, first_name="u"), chat_instance="c", message=message()
+        )
+
+        async def render(profile: tasks.ListProfile) -> None:
+            seen.append(profile.priority)
+
+        profile = tasks.ListProfile(priority=["high"])
+        await tasks._store_profile(state, profile)
+        tasks._schedule_render(callback, state, render)
+        # Следующий апдейт успел изменить профиль, пока render ждал.
+        profile.priority = ["high", "low"]
+        await tasks._store_profile(state, profile)
+        await settle()
+
+    asyncio.run(scenario())
+
+    assert seen == [["high", "low"]]
+
+
+def test_any_edit_discards_pending_render(monkeypatch):
+    coalescer = make_coalescer()
+    monkeypatch.setattr(message_render, "render_coalescer", coalescer)
+    rendered = []
+    discarded = metrics.get("render.discarded")
+
+    async def scenario():
+        async def render():
+            rendered.append("deferred")
+
+        coalescer.schedule(message(), USER_ID, render)
+        # Экран совпадает с показанным — правка не уходит, но отложенный render уже не нужен.
+        await MessageRenderer().edit(message("list"), "list", None)
+        await settle()
+
+    asyncio.run(scenario())
+
+    assert rendered == []
+    assert metrics.get("render.discarded") == discarded + 1
+
+
+def test_renders_own_edit_keeps_the_next_render():
+    coalescer = make_coalescer()
+    rendered = []
+
+    async def scenario():
+        async def second():
+            rendered.append("second")
+
+        async def first():
+            # Новое нажатие пришло, пока первый render рисует; его правка не отменяет второй.
+            coalescer.schedule(message(), USER_ID, second)
+            coalescer.discard(message())
+            rendered.append("first")
+
+        coalescer.schedule(message(), USER_ID, first)
+        await settle()
+        await settle()
+
+    asyncio.run(scenario())
+
+    assert rendered == ["first", "second"]
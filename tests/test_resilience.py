@@ -0,0 +1,155 @@
+"""
+CircuitBreaker: переходы closed/open/half_open, retry_after отказов и адаптивный
+таймаут (границы, удвоение после истечения) — замедлившееся API не запирает эндпоинт.
+"""
+import time
+
+import pytest
+
+from src.services.resilience import CLOSED, HALF_OPEN, MIN_LATENCY_SAMPLES, OPEN, ApiUnavailableError, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        failure_threshold=3, open_seconds=0.0,
+        min_timeout=1.0, max_timeout=15.0, percentile=0.99, multiplier=3.0, window=200,
+    )
+    options.update(overrides)
+    return CircuitBreaker("GET /tasks/", **options)
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+
+def test_timeout_widens_after_expiry():
+    breaker = make_breaker()
+    for _ in range(50):
+        breaker.record_success(0.1)
+    assert breaker.timeout == 1.0
+
+    # API замедлилось до 1.3 с: первый запрос обрывается по таймауту...
+    breaker.record_timeout()
+    assert breaker.timeout >= 2.0
+    # ...следующий укладывается, и таймаут уже учитывает новую латентность.
+    breaker.record_success(1.3)
+    assert breaker.timeout >= 3 * 1.3 - 1e-9
+
+
+def test_half_open_probe_gets_max_timeout():
+    breaker = make_breaker()
+    for _ in range(50):
+        breaker.record_success(0.1)
+    for _ in range(3):
+        breaker.record_timeout()
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
+    assert breaker.timeout == 15.0
+    breaker.record_success(1.3)
+    assert breaker.timeout >= 3 * 1.3 - 1e-9
+
+
+def test_open_breaker_rejects_with_remaining_time(clock):
+    breaker = make_breaker(open_seconds=30.0)
+    open_breaker(breaker)
+    assert breaker.state == OPEN
+
+    clock.now += 10
+    with pytest.raises(ApiUnavailableError) as error:
+        breaker.before_request()
+    assert error.value.retry_after == pytest.approx(20.0)
+    assert error.value.endpoint == "GET /tasks/"
+
+
+def test_half_open_lets_one_probe_through_and_success_closes(clock):
+    breaker = make_breaker(open_seconds=30.0)
+    open_breaker(breaker)
+    clock.now += 30
+
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ApiUnavailableError) as error:
+        breaker.before_request()
+    assert error.value.retry_after == 1.0
+
+    breaker.record_success(0.2)
+    assert breaker.state == CLOSED
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == CLOSED  # счётчик сбоев обнулён успехом
+
+
+def test_half_open_failure_reopens_for_full_period(clock):
+    breaker = make_breaker(open_seconds=30.0)
+    open_breaker(breaker)
+    clock.now += 31
+    breaker.before_request()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(ApiUnavailableError) as error:
+        breaker.before_request()
+    assert error.value.retry_after == pytest.approx(30.0)
+
+
+def test_released_probe_frees_half_open_slot(clock):
+    breaker = make_breaker(open_seconds=30.0)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.before_request()
+    breaker.release()
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
+
+
+def test_timeout_doubles_after_each_expiry_up_to_max():
+    breaker = make_breaker(failure_threshold=100)
+    for _ in range(50):
+        breaker.record_success(0.1)
+
+    timeouts = [breaker.timeout]
+    for _ in range(5):
+        breaker.record_timeout()
+        timeouts.append(breaker.timeout)
+
+    assert timeouts[0] == 1.0
+    for before, after in zip(timeouts, timeouts[1:]):
+        assert after >= min(15.0, before * 2)
+        assert after <= 15.0
+    assert timeouts[-1] == 15.0
+
+
+def test_adaptive_timeout_is_percentile_times_multiplier_within_bounds():
+    breaker = make_breaker()
+    for _ in range(MIN_LATENCY_SAMPLES - 1):
+        breaker.record_success(0.5)
+    assert breaker.timeout == 15.0  # мало замеров — базовый таймаут
+
+    breaker.record_success(0.5)
+    assert breaker.timeout == pytest.approx(1.5)
+
+    fast = make_breaker()
+    for _ in range(50):
+        fast.record_success(0.01)
+    assert fast.timeout == 1.0
+
+    slow = make_breaker()
+    for _ in range(50):
+        slow.record_success(10.0)
+    assert slow.timeout == 15.0
@@ -0,0 +1,167 @@
+"""
+Планировщик апдейтов: полоса пользователя, общий лимит параллельности,
+удержание полосы фоновым продолжением и загрузка состояния FSM внутри полосы.
+"""
+import asyncio
+from datetime import datetime
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Chat, Message, Update, User
+
+from src.middlewares import UpdateSchedulerMiddleware, setup_middlewares
+
+TOKEN = "123456:ABCdefGhIJKlmnoPQRsTUVwxyZ12345678"
+
+
+def user(user_id: int) -> User:
+    return User(id=user_id, is_bot=False, first_name="u")
+
+
+def recorder(events, gates=None):
+    """Хендлер, который отмечает начало и конец и ждёт свой gate, если он задан."""
+
+    async def handler(event, data):
+        events.append(("start", event))
+        if gates and event in gates:
+            await gates[event].wait()
+        events.append(("end", event))
+
+    return handler
+
+
+async def dispatch(scheduler: UpdateSchedulerMiddleware, handler, event, user_id: int):
+    return await scheduler(handler, event, {"event_from_user": user(user_id)})
+
+
+def test_same_user_is_serialized_and_users_run_concurrently():
+    events = []
+
+    async def scenario():
+        scheduler = UpdateSchedulerMiddleware(concurrency=4)
+        gates = {"a1": asyncio.Event()}
+        handler = recorder(events, gates)
+        tasks = [
+            asyncio.create_task(dispatch(scheduler, handler, "a1", 1)),
+            asyncio.create_task(dispatch(scheduler, handler, "a2", 1)),
+            asyncio.create_task(dispatch(scheduler, handler, "b1", 2)),
+        ]
+        await asyncio.sleep(0.01)
+        blocked, stats = list(events), scheduler.stats()
+        gates["a1"].set()
+        await asyncio.gather(*tasks)
+        return blocked, stats, scheduler.stats()
+
+    blocked, stats, idle = asyncio.run(scenario())
+
+    assert blocked == [("start", "a1"), ("start", "b1"), ("end", "b1")]
+    assert stats["queued"] == 1 and stats["running"] == 1
+    assert events[3:] == [("end", "a1"), ("start", "a2"), ("end", "a2")]
+    assert idle["lanes"] == 0 and idle["running"] == 0
+
+
+def test_concurrency_limit_is_shared_between_users():
+    events = []
+
+    async def scenario():
+        scheduler = UpdateSchedulerMiddleware(concurrency=1)
+        gates = {"a1": asyncio.Event()}
+        handler = recorder(events, gates)
+        tasks = [
+            asyncio.create_task(dispatch(scheduler, handler, "a1", 1)),
+            asyncio.create_task(dispatch(scheduler, handler, "b1", 2)),
+        ]
+        await asyncio.sleep(0.01)
+        blocked = list(events)
+        gates["a1"].set()
+        await asyncio.gather(*tasks)
+        return blocked
+
+    assert asyncio.run(scenario()) == [("start", "a1")]
+    assert events[1:] == [("end", "a1"), ("start", "b1"), ("end", "b1")]
+
+
+def test_handed_off_continuation_keeps_the_lane():
+    events = []
+
+    async def scenario():
+        scheduler = UpdateSchedulerMiddleware(concurrency=4)
+        finish = asyncio.Event()
+
+        async def continuation():
+            await finish.wait()
+            events.append(("end", "continuation"))
+
+        async def acked(event, data):
+            # Как CallbackAckMiddleware: хендлер вернулся, продолжение работает в фоне.
+            data["update_ticket"].hand_off(asyncio.create_task(continuation()))
+            events.append(("returned", event))
+
+        first = await dispatch(scheduler, acked, "a1", 1)
+        second = asyncio.create_task(dispatch(scheduler, recorder(events), "a2", 1))
+        await asyncio.sleep(0.01)
+        blocked = list(events)
+        finish.set()
+        await second
+        return first, blocked, scheduler.stats()
+
+    first, blocked, idle = asyncio.run(scenario())
+
+    assert first is None
+    assert blocked == [("returned", "a1")]
+    assert events[1:] == [("end", "continuation"), ("start", "a2"), ("end", "a2")]
+    assert idle["lanes"] == 0 and idle["running"] == 0
+
+
+class Form(StatesGroup):
+    title = State()
+
+
+def message_update(update_id: int, user_id: int) -> Update:
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.now(),
+            chat=Chat(id=user_id, type="private"),
+            from_user=user(user_id),
+            text="text",
+        ),
+    )
+
+
+def test_fsm_state_is_loaded_inside_the_lane():
+    handled = []
+    router = Router()
+
+    @router.message(StateFilter(None))
+    async def start(message: Message, state: FSMContext):
+        # Переход занимает время: второй апдейт уже пришёл и ждёт в полосе.
+        await asyncio.sleep(0.01)
+        await state.set_state(Form.title)
+        handled.append(("start", message.message_id))
+
+    @router.message(Form.title)
+    async def title(message: Message, state: FSMContext):
+        await state.clear()
+        handled.append(("title", message.message_id))
+
+    async def scenario():
+        dp = Dispatcher()
+        dp.include_router(router)
+        setup_middlewares(dp)
+        bot = Bot(TOKEN)
+        try:
+            await asyncio.gather(
+                dp.feed_update(bot, message_update(1, 7)),
+                dp.feed_update(bot, message_update(2, 7)),
+            )
+        finally:
+            await bot.session.close()
+
+    asyncio.run(scenario())
+
+    # raw_state второго апдейта прочитан после перехода первого, а не до очереди в полосу.
+    assert handled == [("start", 1), ("title", 2)]
@@ -0,0 +1,137 @@
+"""
+SendLimiter._grant на подменённых часах: глобальный бюджет и бюджет чата,
+отдельный бюджет правок (INTERACTIVE) и пауза чата после retry_after.
+"""
+import asyncio
+import time
+
+import pytest
+
+from src.bot_session import SendLimiter, SendPriority, _Waiter
+from src.config import settings
+
+INTERACTIVE, NORMAL = SendPriority.INTERACTIVE, SendPriority.NORMAL
+GROUP = -100
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def make_limiter(monkeypatch, global_rate: float = 10.0) -> SendLimiter:
+    for name, value in dict(
+        tg_global_rate=global_rate, tg_chat_rate=1.0, tg_group_rate=0.5, tg_chat_burst=2,
+        tg_chat_edit_rate=5.0, tg_chat_edit_burst=4,
+    ).items():
+        monkeypatch.setattr(settings, name, value)
+    return SendLimiter()
+
+
+def enqueue(limiter: SendLimiter, loop, chat_id, priority: SendPriority = NORMAL) -> "asyncio.Future[None]":
+    future = loop.create_future()
+    limiter._queues[priority].append(_Waiter(chat_id, future))
+    return future
+
+
+def granted(futures) -> list:
+    return [future.done() for future in futures]
+
+
+def test_chat_budget_does_not_hold_other_chats(monkeypatch, clock, loop):
+    limiter = make_limiter(monkeypatch)
+    first = [enqueue(limiter, loop, 1) for _ in range(3)]
+    other = enqueue(limiter, loop, 2)
+
+    assert limiter._grant() == pytest.approx(1.0)
+    assert granted(first) == [True, True, False]
+    assert other.done()
+
+    clock.now += 1.0
+    assert limiter._grant() is None
+    assert first[2].done()
+
+
+def test_global_budget_keeps_queue_order(monkeypatch, clock, loop):
+    limiter = make_limiter(monkeypatch, global_rate=2.0)
+    futures = [enqueue(limiter, loop, chat) for chat in (1, 2, 3, 4)]
+
+    assert limiter._grant() == pytest.approx(0.5)
+    assert granted(futures) == [True, True, False, False]
+
+    clock.now += 0.5
+    limiter._grant()
+    assert granted(futures) == [True, True, True, False]
+
+
+def test_interactive_is_served_first(monkeypatch, clock, loop):
+    limiter = make_limiter(monkeypatch, global_rate=1.0)
+    send = enqueue(limiter, loop, 1, NORMAL)
+    edit = enqueue(limiter, loop, 2, INTERACTIVE)
+
+    limiter._grant()
+
+    assert edit.done() and not send.done()
+
+
+def test_edits_use_their_own_budget_in_private_chats(monkeypatch, clock, loop):
+    limiter = make_limiter(monkeypatch)
+    sends = [enqueue(limiter, loop, 1, NORMAL) for _ in range(3)]
+    edits = [enqueue(limiter, loop, 1, INTERACTIVE) for _ in range(5)]
+    group_edits = [enqueue(limiter, loop, GROUP, INTERACTIVE) for _ in range(3)]
+
+    # Правки не ждут за исчерпанным бюджетом отправок; в группе бюджет у них общий.
+    assert limiter._grant() == pytest.approx(0.2)
+    assert granted(sends) == [True, True, False]
+    assert granted(edits) == [True, True, True, True, False]
+    assert granted(group_edits) == [True, True, False]
+
+    clock.now += 0.2
+    limiter._grant()
+    assert edits[4].done() and not sends[2].done()
+
+
+def test_retry_after_pauses_sends_and_edits_of_the_chat(monkeypatch, clock, loop):
+    limiter = make_limiter(monkeypatch)
+    limiter.pause(1, 5.0)
+    send = enqueue(limiter, loop, 1, NORMAL)
+    edit = enqueue(limiter, loop, 1, INTERACTIVE)
+    other = enqueue(limiter, loop, 2, NORMAL)
+
+    assert limiter._grant() == pytest.approx(5.0)
+    assert not send.done() and not edit.done()
+    assert other.done()
+
+    clock.now += 5.0
+    assert limiter._grant() is None
+    assert send.done() and edit.done()
+
+
+def test_global_retry_after_pauses_every_chat(monkeypatch, clock, loop):
+    limiter = make_limiter(monkeypatch)
+    limiter.pause(None, 3.0)
+    futures = [enqueue(limiter, loop, chat, INTERACTIVE) for chat in (1, 2)]
+
+    assert limiter._grant() == pytest.approx(3.0)
+    assert granted(futures) == [False, False]
+
+    clock.now += 3.0
+    limiter._grant()
+    assert granted(futures) == [True, True]
@@ -0,0 +1,53 @@
+"""Кэш страниц списка задач: изоляция отданных данных и сброс после неудачной мутации."""
+import asyncio
+
+import httpx
+import pytest
+
+from src.services import tasks_api
+from src.services.http_client import BotHttpClient
+from src.services.task_list_cache import TaskListCache
+from src.services.tasks_api import TasksAPI
+
+USER_ID = 42
+PARAMS = {"page": 1}
+
+
+def test_callers_get_independent_copies():
+    cache = TaskListCache()
+
+    async def load():
+        return {"items": [{"id": 1, "title": "first"}]}
+
+    async def scenario():
+        first, _ = await cache.fetch(USER_ID, PARAMS, load)
+        first["items"].clear()
+        second, _ = await cache.fetch(USER_ID, PARAMS, load)
+        return second
+
+    assert asyncio.run(scenario()) == {"items": [{"id": 1, "title": "first"}]}
+
+
+def test_failed_mutation_still_invalidates(monkeypatch):
+    cache = TaskListCache()
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        # Запись могла дойти до сервера, но ответ потерялся.
+        raise httpx.ReadError("connection reset", request=request)
+
+    api = BotHttpClient(base_url="http://api.test/api/v1")
+    api._http = httpx.AsyncClient(base_url=api.base_url, transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(tasks_api, "client", api)
+    monkeypatch.setattr(tasks_api, "task_list_cache", cache)
+
+    async def load():
+        return {"items": []}
+
+    async def scenario():
+        await cache.fetch(USER_ID, PARAMS, load)
+        with pytest.raises(Exception):
+            await TasksAPI.patch(USER_ID, 1, {"title": "second"})
+        await api.close()
+        return cache.stats()
+
+    assert asyncio.run(scenario())["pages"] == 0
@@ -0,0 +1,171 @@
+"""
+Воркер стрима апдейтов на fakeredis: очерёдность записей одного пользователя,
+аренда и перебалансировка партиций, перехват pending прежнего владельца и
+перенос сбойных апдейтов в dead-letter стрим.
+"""
+import asyncio
+import time
+
+from fakeredis import aioredis
+
+from src.config import settings
+from src.update_stream import KEY_FIELD, UpdateStreamWorker, _UserChains, _dead_letter_key, _lease_key, _stream_key
+from src.utils.metrics import metrics
+
+
+def make_redis():
+    return aioredis.FakeRedis(decode_responses=True)
+
+
+def idle_worker(redis, consumer: str) -> UpdateStreamWorker:
+    """Воркер, партиции которого ничего не читают, а только ждут, пока их отдадут."""
+    worker = UpdateStreamWorker(None, None, redis, consumer=consumer)
+
+    async def consume(partition: int) -> None:
+        while not worker._released(partition):
+            await asyncio.sleep(0.01)
+
+    worker._consume = consume
+    return worker
+
+
+def test_chains_keep_user_order_and_run_users_concurrently():
+    events = []
+
+    async def scenario():
+        chains = _UserChains(limit=8)
+        gate = asyncio.Event()
+
+        def job(key: str, n: int, wait: asyncio.Event = None, fail: bool = False):
+            async def run() -> None:
+                events.append(("start", key, n))
+                if wait is not None:
+                    await wait.wait()
+                events.append(("end", key, n))
+                if fail:
+                    raise RuntimeError("handler failed")
+            return run
+
+        chains.submit("a", job("a", 1, wait=gate, fail=True))
+        chains.submit("a", job("a", 2))
+        chains.submit("b", job("b", 1))
+        await asyncio.sleep(0.01)
+        blocked = list(events)
+        gate.set()
+        await chains.join()
+        return blocked
+
+    blocked = asyncio.run(scenario())
+
+    # Пока первая запись пользователя a выполняется, вторая ждёт, а пользователь b — нет.
+    assert blocked == [("start", "a", 1), ("start", "b", 1), ("end", "b", 1)]
+    # Сбой записи не рвёт цепочку: следующая выполняется после неё.
+    assert events[3:] == [("end", "a", 1), ("start", "a", 2), ("end", "a", 2)]
+
+
+def test_partitions_are_leased_and_rebalanced(monkeypatch):
+    monkeypatch.setattr(settings, "update_stream_partitions", 4)
+    redis = make_redis()
+
+    async def scenario():
+        first, second = idle_worker(redis, "first"), idle_worker(redis, "second")
+        await first._rebalance(await first._heartbeat())
+        alone = sorted(first._owned)
+
+        # Все аренды у first: second ничего не берёт, пока тот не отдаст лишнее.
+        await second._rebalance(await second._heartbeat())
+        before_handoff = sorted(second._owned)
+
+        await first._rebalance(await first._heartbeat())
+        draining = sorted(first._draining)
+        await asyncio.gather(*first._draining.values())
+        await second._rebalance(await second._heartbeat())
+
+        leases = [await redis.get(_lease_key(p)) for p in range(4)]
+        owned = sorted(first._owned), sorted(second._owned)
+        for worker in (first, second):
+            worker.stop()
+            await asyncio.gather(*worker._owned.values())
+        return alone, before_handoff, draining, owned, leases, (first._token, second._token)
+
+    alone, before_handoff, draining, owned, leases, tokens = asyncio.run(scenario())
+
+    assert alone == [0, 1, 2, 3]
+    assert before_handoff == []
+    assert draining == [2, 3]
+    assert owned == ([0, 1], [2, 3])
+    assert leases == [tokens[0], tokens[0], tokens[1], tokens[1]]
+
+
+def test_reclaim_waits_for_lease_ttl_and_keeps_order(monkeypatch):
+    monkeypatch.setattr(settings, "update_stream_lease_ms", 200)
+    monkeypatch.setattr(settings, "update_stream_block_ms", 20)
+    redis = make_redis()
+    stream = _stream_key(0)
+    seen = []
+
+    async def scenario():
+        await redis.xgroup_create(stream, settings.update_stream_group, id="0", mkstream=True)
+        await redis.xadd(stream, {"update": "first", KEY_FIELD: "7"})
+        # Прежний владелец получил запись и, возможно, ещё её выполняет.
+        await redis.xreadgroup(settings.update_stream_group, "previous", {stream: ">"}, count=10)
+        await redis.xadd(stream, {"update": "second", KEY_FIELD: "7"})
+
+        worker = UpdateStreamWorker(None, None, redis, consumer="next")
+        started = time.monotonic()
+
+        async def process(stream: str, entry_id: str, fields):
+            seen.append((fields["update"], time.monotonic() - started))
+            await redis.xack(stream, settings.update_stream_group, entry_id)
+
+        worker._process = process
+        consumer = asyncio.create_task(worker._consume(0))
+        while len(seen) < 2:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await asyncio.wait_for(consumer, timeout=1)
+        return await redis.xpending(stream, settings.update_stream_group)
+
+    pending = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert [update for update, _ in seen] == ["first", "second"]
+    assert seen[0][1] >= 0.15
+    assert pending["pending"] == 0
+
+
+def test_failed_update_moves_to_dead_letter_stream():
+    redis = make_redis()
+    stream = _stream_key(0)
+
+    class FailingDispatcher:
+        async def feed_raw_update(self, bot, update):
+            raise RuntimeError("handler failed")
+
+    async def scenario():
+        await redis.xgroup_create(stream, settings.update_stream_group, id="0", mkstream=True)
+        worker = UpdateStreamWorker(FailingDispatcher(), None, redis, consumer="worker")
+        await redis.xadd(stream, {"update": "{}", KEY_FIELD: "7"})
+        await redis.xadd(stream, {"update": "{}", KEY_FIELD: "8"})
+        response = await redis.xreadgroup(settings.update_stream_group, "worker", {stream: ">"}, count=10)
+        (first_id, first), (second_id, second) = response[0][1]
+
+        await worker._process(stream, first_id, first)
+
+        async def unavailable(*args, **kwargs):
+            raise ConnectionError("redis is down")
+
+        redis.xadd = unavailable
+        await worker._process(stream, second_id, second)
+
+        pending = await redis.xpending(stream, settings.update_stream_group)
+        dead = await redis.xrange(_dead_letter_key())
+        return first_id, second_id, pending, dead
+
+    dead_lettered = metrics.get("updates.stream.dead_lettered")
+    first_id, second_id, pending, dead = asyncio.run(scenario())
+
+    assert [fields["id"] for _, fields in dead] == [first_id]
+    assert dead[0][1]["stream"] == stream and "handler failed" in dead[0][1]["error"]
+    # Не перенесённый в dead-letter апдейт остаётся неподтверждённым.
+    assert pending["pending"] == 1 and pending["min"] == second_id
+    assert metrics.get("updates.stream.dead_lettered") == dead_lettered + 1
@@ -0,0 +1,33 @@
+"""Публичный webhook-сервер отдаёт только webhook; health и метрики — на служебном."""
+import asyncio
+
+from aiogram import Bot, Dispatcher
+from aiohttp.test_utils import TestClient, TestServer
+
+from src.config import settings
+from src.webhook import create_internal_app, create_webhook_app
+
+
+async def get_status(app, path: str) -> int:
+    async with TestClient(TestServer(app)) as client:
+        resp = await client.get(path)
+        return resp.status
+
+
+def test_health_and_metrics_are_not_public():
+    async def scenario():
+        bot = Bot(settings.bot_token)
+        public = create_webhook_app(Dispatcher(), bot)
+        statuses = [await get_status(public, path) for path in (settings.webhook_health_path, settings.webhook_metrics_path)]
+        await bot.session.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == [404, 404]
+
+
+def test_internal_app_serves_health_and_metrics():
+    async def scenario():
+        internal = create_internal_app()
+        return [await get_status(internal, path) for path in (settings.webhook_health_path, settings.webhook_metrics_path)]
+
+    assert asyncio.run(scenario()) == [200, 200]